@@ -1,50 +1,17 @@
 import serial
 import RPi.GPIO as GPIO
-
-class LINFrame:
-    def __init__(self, id, data):
-        self.id = id & 0x3F
-        self.data = data[:8]
-        self.pid = self._calculate_pid()
-        self.checksum = self._calculate_checksum()
-
-    def _calculate_pid(self):
-        id_bits = [self.id >> i & 1 for i in range(6)]
-        p0 = id_bits[0] ^ id_bits[1] ^ id_bits[2] ^ id_bits[4]
-        p1 = ~(id_bits[1] ^ id_bits[3] ^ id_bits[4] ^ id_bits[5]) & 1
-        return (self.id | (p0 << 6) | (p1 << 7)) & 0xFF
-
-    def _calculate_checksum(self):
-        sum = self.pid
-        for byte in self.data:
-            sum += byte
-            if sum > 0xFF:
-                sum = (sum & 0xFF) + 1
-        return (~sum) & 0xFF
-
-    @staticmethod
-    def from_bytes(buffer):
-        if len(buffer) < 5:
-            return None
-        if buffer[0] != 0x00 or buffer[1] != 0x55:
-            return None
-            
-        pid = buffer[2]
-        id = pid & 0x3F
-        data = buffer[3:-1]
-        checksum = buffer[-1]
-        
-        frame = LINFrame(id, data)
-        if frame.pid != pid or frame.checksum != checksum:
-            return None
-        return frame
+import os
+import sys
+# lin_protocol is the library in Final/web/LinLib_py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'web', 'LinLib_py'))
+from lin_protocol import LINFrameParser
 
 class LINSlave:
     def __init__(self):
         self.LIN_MSG_ID = 0x01
         self.LED_PIN = 23
         self.serial = None
-        self.lin_buffer = bytearray()
+        self.parser = LINFrameParser(data_length=1)
         self._initialize_lin()
         self._initialize_gpio()
 
@@ -70,23 +37,12 @@ class LINSlave:
 
     def process_frame(self):
         if self.serial and self.serial.in_waiting:
-            byte = self.serial.read(1)
-            if byte:
-                self.lin_buffer.append(byte[0])
-                if len(self.lin_buffer) >= 5:
-                    if self.lin_buffer[0] == 0x00 and self.lin_buffer[1] == 0x55:
-                        frame = LINFrame.from_bytes(self.lin_buffer)
-                        if frame and frame.id == self.LIN_MSG_ID:
-                            state = frame.data[0] if len(frame.data) > 0 else 0x00
-                            GPIO.output(self.LED_PIN, GPIO.HIGH if state == 0x01 else GPIO.LOW)
-                            print(f"Received LIN frame: LED {'ON' if state == 0x01 else 'OFF'}")
-                            self.lin_buffer = bytearray()
-                        else:
-                            self.lin_buffer = bytearray()
-                    else:
-                        self.lin_buffer = bytearray()
-                elif len(self.lin_buffer) > 10:
-                    self.lin_buffer = bytearray()
+            chunk = self.serial.read(self.serial.in_waiting)
+            for frame_id, data in self.parser.feed(chunk):
+                if frame_id == self.LIN_MSG_ID:
+                    state = data[0] if len(data) > 0 else 0x00
+                    GPIO.output(self.LED_PIN, GPIO.HIGH if state == 0x01 else GPIO.LOW)
+                    print(f"Received LIN frame: LED {'ON' if state == 0x01 else 'OFF'}")
 
     def shutdown(self):
         if self.serial:
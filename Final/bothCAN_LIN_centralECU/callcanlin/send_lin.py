@@ -1,5 +1,10 @@
 import serial
 import time
+import os
+import sys
+# lin_protocol is the library in Final/web/LinLib_py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'web', 'LinLib_py'))
+from lin_protocol.codec import calculate_pid, enhanced_checksum
 
 class LINFrame:
     def __init__(self, id, data):
@@ -9,18 +14,10 @@ class LINFrame:
         self.checksum = self._calculate_checksum()
 
     def _calculate_pid(self):
-        id_bits = [self.id >> i & 1 for i in range(6)]
-        p0 = id_bits[0] ^ id_bits[1] ^ id_bits[2] ^ id_bits[4]
-        p1 = ~(id_bits[1] ^ id_bits[3] ^ id_bits[4] ^ id_bits[5]) & 1
-        return (self.id | (p0 << 6) | (p1 << 7)) & 0xFF
+        return calculate_pid(self.id)
 
     def _calculate_checksum(self):
-        sum = self.pid
-        for byte in self.data:
-            sum += byte
-            if sum > 0xFF:
-                sum = (sum & 0xFF) + 1
-        return (~sum) & 0xFF
+        return enhanced_checksum(self.pid, self.data)
 
     def to_bytes(self):
         break_field = b'\x00'
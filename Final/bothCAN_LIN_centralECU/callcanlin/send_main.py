@@ -1,7 +1,10 @@
 import os
-import time
+import sys
 from send_can import CANMaster
 from send_lin import LINMaster
+# Modules shared between the scripts live in Final/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from file_watcher import FileWatcher
 
 class SendMain:
     def __init__(self):
@@ -39,6 +42,7 @@ class SendMain:
 
     def monitor(self):
         print(f"Monitoring {self.input_file}...")
+        watcher = FileWatcher(self.input_file)
         try:
             while True:
                 if self.file_changed():
@@ -56,9 +60,11 @@ class SendMain:
                             self.lin_master.send_frame(led_state)
                         else:
                             print(f"Unknown protocol: {protocol}")
-                time.sleep(0.5)
+                watcher.wait()  # Wake up when input.txt is written
         except KeyboardInterrupt:
             self.shutdown()
+        finally:
+            watcher.close()
 
     def shutdown(self):
         if self.can_master:
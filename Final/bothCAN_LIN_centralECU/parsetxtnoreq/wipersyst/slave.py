@@ -4,6 +4,13 @@ import os
 import RPi.GPIO as GPIO
 import time
 import threading
+import sys
+# Modules shared between the scripts live in Final/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'common'))
+from led_animator import LEDAnimator, sweep_timeline
+# lin_protocol is the library in Final/web/LinLib_py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'web', 'LinLib_py'))
+from lin_protocol.codec import calculate_pid, enhanced_checksum
 
 FRONT_LEDS = [23, 24, 25]  # Right to left
 BACK_LEDS = [16, 20, 21]   # Right to left
@@ -18,18 +25,10 @@ class LINFrame:
         self.checksum = self._calculate_checksum()
 
     def _calculate_pid(self):
-        id_bits = [self.id >> i & 1 for i in range(6)]
-        p0 = id_bits[0] ^ id_bits[1] ^ id_bits[2] ^ id_bits[4]
-        p1 = ~(id_bits[1] ^ id_bits[3] ^ id_bits[4] ^ id_bits[5]) & 1
-        return (self.id | (p0 << 6) | (p1 << 7)) & 0xFF
+        return calculate_pid(self.id)
 
     def _calculate_checksum(self):
-        sum = self.pid
-        for byte in self.data:
-            sum += byte
-            if sum > 0xFF:
-                sum = (sum & 0xFF) + 1
-        return (~sum) & 0xFF
+        return enhanced_checksum(self.pid, self.data)
 
     @staticmethod
     def from_bytes(buffer):
@@ -89,46 +88,21 @@ class Slave:
 
         self.lin_buffer = []
         self.running = True
-        self.stop_event = threading.Event()
-        self.active_threads = []
+        # One scheduler thread drives both wipers, a new command preempts the running one
+        self.animator = LEDAnimator(GPIO)
         self.operation_lock = threading.Lock()
         self.last_byte_time = time.time()
 
-    def wiper_sweep(self, leds, speed, stop_event):
+    def activate_wiper(self, channel, leds, speed, cycles):
         delay = {1: 0.3, 2: 0.2, 3: 0.1}[speed]
-        for led in leds:
-            if stop_event.is_set():
-                return False
-            GPIO.output(led, GPIO.HIGH)
-            time.sleep(delay)
-        for led in reversed(leds):
-            if stop_event.is_set():
-                return False
-            GPIO.output(led, GPIO.LOW)
-            time.sleep(delay)
-        return True
-
-    def activate_wiper(self, leds, speed, cycles):
-        count = 0
-        try:
-            while (cycles == 0 or count < cycles) and not self.stop_event.is_set():
-                if not self.wiper_sweep(leds, speed, self.stop_event):
-                    break
-                if cycles > 0:
-                    count += 1
-        finally:
-            for led in leds:
-                GPIO.output(led, GPIO.LOW)
+        timeline, duration = sweep_timeline(leds, delay)
+        self.animator.start(channel, timeline, duration, cycles=cycles)
 
     def stop_wipers(self):
         with self.operation_lock:
-            self.stop_event.set()
-            for t in self.active_threads:
-                t.join(timeout=0.1)
+            self.animator.cancel_all()
             for pin in FRONT_LEDS + BACK_LEDS:
                 GPIO.output(pin, GPIO.LOW)
-            self.stop_event.clear()
-            self.active_threads = []
             print("Wipers stopped")
 
     def process_frame(self, data, protocol):
@@ -148,22 +122,10 @@ class Slave:
 
         self.stop_wipers()
         if wiper_status in [1, 3]:
-            thread = threading.Thread(
-                target=self.activate_wiper,
-                args=(FRONT_LEDS, speed, cycles),
-                daemon=True
-            )
-            self.active_threads.append(thread)
-            thread.start()
+            self.activate_wiper('front', FRONT_LEDS, speed, cycles)
             print(f"Started front wiper: cycles={cycles}, speed={speed}")
         if wiper_status in [2, 3]:
-            thread = threading.Thread(
-                target=self.activate_wiper,
-                args=(BACK_LEDS, speed, cycles),
-                daemon=True
-            )
-            self.active_threads.append(thread)
-            thread.start()
+            self.activate_wiper('back', BACK_LEDS, speed, cycles)
             print(f"Started back wiper: cycles={cycles}, speed={speed}")
 
     def monitor(self):
@@ -205,6 +167,7 @@ class Slave:
     def shutdown(self):
         self.running = False
         self.stop_wipers()
+        self.animator.close()
         if self.can_bus:
             self.can_bus.shutdown()
             os.system('sudo /sbin/ip link set can0 down')
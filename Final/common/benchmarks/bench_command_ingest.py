@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark command ingest: the old find({"status": "pending"}) + one
+update_one per command against CommandIngest (tailing the (status, _id)
+index, one write per batch).
+
+A collection holding HISTORY completed commands gets BURST new pending
+commands, then both paths drain it. Uses mongomock unless a server URL
+is given (a replica set URL also exercises the change stream).
+Run from the Final/common directory:
+    python3 benchmarks/bench_command_ingest.py
+    python3 benchmarks/bench_command_ingest.py --url mongodb://localhost:27017/
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from command_ingest import CommandIngest
+
+HISTORY = 5000
+BURST = 200
+
+def make_collection(url, name):
+    if url:
+        from pymongo import MongoClient
+        collection = MongoClient(url).bench_command_ingest[name]
+        collection.drop()
+    else:
+        import mongomock
+        collection = mongomock.MongoClient().bench_command_ingest[name]
+    collection.insert_many([{'wiperType': 'front', 'speed': 'normal', 'cycles': 1,
+                             'status': 'completed', 'timestamp': datetime.utcnow()}
+                            for _ in range(HISTORY)])
+    return collection
+
+def add_burst(collection):
+    collection.insert_many([{'wiperType': 'both', 'speed': 'fast', 'cycles': 2,
+                             'status': 'pending', 'timestamp': datetime.utcnow()}
+                            for _ in range(BURST)])
+
+def old_poll(collection):
+    writes = 0
+    for command in collection.find({"status": "pending"}):
+        collection.update_one({"_id": command["_id"]}, {"$set": {"status": "completed"}})
+        writes += 1
+    return writes
+
+def run_old(url):
+    collection = make_collection(url, 'old')
+    old_poll(collection)
+    add_burst(collection)
+    start = time.perf_counter()
+    writes = old_poll(collection)
+    elapsed = time.perf_counter() - start
+    # An idle poll still reads the collection
+    start = time.perf_counter()
+    old_poll(collection)
+    idle = time.perf_counter() - start
+    return elapsed, writes, idle, None
+
+def run_ingest(url):
+    collection = make_collection(url, 'ingest')
+    ingest = CommandIngest(collection)
+    ingest.fetch()
+    add_burst(collection)
+    start = time.perf_counter()
+    while True:
+        commands = ingest.fetch()
+        if not commands:
+            break
+        ingest.complete(commands)
+    elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    ingest.fetch()
+    idle = time.perf_counter() - start
+    stats = ingest.stats()
+    ingest.close()
+    return elapsed, stats['writes'], idle, stats
+
+def report(name, elapsed, writes, idle, stats):
+    print(f"{name:22s} drain {elapsed * 1e3:8.1f} ms  writes {writes:4d}  idle poll {idle * 1e3:7.2f} ms")
+    if stats:
+        print(f"{'':22s} {stats}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--url', help="MongoDB URL (default: mongomock)")
+    args = parser.parse_args()
+    print(f"{HISTORY} completed commands in the collection, {BURST} new pending ones\n")
+    report("find + update_one", *run_old(args.url))
+    report("CommandIngest", *run_ingest(args.url))
+
+if __name__ == "__main__":
+    main()
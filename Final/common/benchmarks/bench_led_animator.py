@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark wiper preemption: thread-per-wiper (slave7.py before the
+animator) against the LEDAnimator timer wheel.
+
+Sends COMMANDS wiper commands in a row, each one stopping the previous,
+and measures how long the stop takes, how many threads were created and
+the CPU time used. GPIO is a no-op stand-in, no Pi needed.
+
+Run from the Final/common directory:
+    python3 benchmarks/bench_led_animator.py
+"""
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from led_animator import LEDAnimator, sweep_timeline
+
+FRONT_LEDS = [23, 24, 25]
+BACK_LEDS = [16, 20, 21]
+COMMANDS = 50
+DELAY = 0.3  # Per LED step, fast speed
+
+class NullGPIO:
+    def output(self, pin, level):
+        pass
+
+GPIO = NullGPIO()
+
+class ThreadWipers:
+    """The old stop_event + thread per wiper + 50 ms sleep slices"""
+    def __init__(self):
+        self.stop_event = threading.Event()
+        self.active_threads = []
+        self.threads_created = 0
+
+    def _activate_single_wiper(self, leds):
+        while not self.stop_event.is_set():
+            for level, order in ((1, leds), (0, list(reversed(leds)))):
+                for led in order:
+                    if self.stop_event.is_set():
+                        return
+                    GPIO.output(led, level)
+                    start_time = time.time()
+                    while time.time() - start_time < DELAY:
+                        if self.stop_event.is_set():
+                            break
+                        time.sleep(0.05)
+
+    def stop(self):
+        self.stop_event.set()
+        for t in self.active_threads:
+            t.join(timeout=0.1)
+        self.stop_event.clear()
+        self.active_threads = []
+
+    def start(self):
+        self.active_threads = [threading.Thread(target=self._activate_single_wiper, args=(leds,))
+                               for leds in (FRONT_LEDS, BACK_LEDS)]
+        self.threads_created += 2
+        for t in self.active_threads:
+            t.start()
+
+    def close(self):
+        self.stop()
+
+class AnimatorWipers:
+    def __init__(self):
+        self.animator = LEDAnimator(GPIO)
+        self.threads_created = 1
+
+    def stop(self):
+        self.animator.cancel_all()
+
+    def start(self):
+        for channel, leds in (('front', FRONT_LEDS), ('back', BACK_LEDS)):
+            timeline, duration = sweep_timeline(leds, DELAY)
+            self.animator.start(channel, timeline, duration)
+
+    def close(self):
+        self.animator.close()
+
+def measure(wipers):
+    random.seed(1)
+    stops = []
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    for _ in range(COMMANDS):
+        wipers.start()
+        time.sleep(random.uniform(0.01, 0.1))
+        start = time.perf_counter()
+        wipers.stop()
+        stops.append(time.perf_counter() - start)
+    cpu = time.process_time() - cpu
+    wall = time.perf_counter() - wall
+    wipers.close()
+    stops.sort()
+    return stops, wipers.threads_created, cpu / wall
+
+def report(name, stops, threads, cpu):
+    print(f"{name:18s} stop p50 {stops[len(stops) // 2] * 1e3:7.3f} ms  "
+          f"max {stops[-1] * 1e3:7.3f} ms  threads {threads:4d}  CPU {cpu * 100:5.1f}%")
+
+def main():
+    print(f"{COMMANDS} preempting commands, both wipers\n")
+    report("thread per wiper", *measure(ThreadWipers()))
+    report("LEDAnimator", *measure(AnimatorWipers()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark CAN transmission of light frames: a bus opened and shut down
+for every frame (the old send_can_message) against CANTxService.
+
+Uses the socketcan vcan0 interface when it exists, else a python-can
+virtual bus (which makes opening a bus much cheaper than a socket):
+    sudo ip link add dev vcan0 type vcan && sudo ip link set up vcan0
+    python3 benchmarks/bench_tx_service.py    (from the Final/common directory)
+"""
+import os
+import sys
+import time
+
+import can
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from can_tx_service import CANTxService
+
+FRAMES = 2000
+
+def open_bus():
+    try:
+        return can.interface.Bus(channel='vcan0', interface='socketcan')
+    except (OSError, can.CanError):
+        return can.interface.Bus(channel='bench', interface='virtual')
+
+def run_per_frame():
+    start = time.perf_counter()
+    for i in range(FRAMES):
+        bus = open_bus()
+        bus.send(can.Message(arbitration_id=0x101 + i % 7, data=[i % 2], is_extended_id=False))
+        bus.shutdown()
+    return time.perf_counter() - start, None
+
+def run_service():
+    tx = CANTxService(bus=open_bus())
+    start = time.perf_counter()
+    for i in range(FRAMES):
+        tx.send(0x101 + i % 7, [i % 2])
+    tx.flush()
+    elapsed = time.perf_counter() - start
+    tx.close()
+    tx.bus.shutdown()
+    return elapsed, tx.stats()
+
+def report(name, elapsed, stats):
+    print(f"{name:22s} {FRAMES / elapsed:10.0f} frames/s")
+    if stats:
+        print(f"{'':22s} {stats}")
+
+def main():
+    bus = open_bus()
+    print(f"{FRAMES} frames on {bus.channel_info}\n")
+    bus.shutdown()
+    report("bus per frame", *run_per_frame())
+    report("CANTxService", *run_service())
+
+if __name__ == "__main__":
+    main()
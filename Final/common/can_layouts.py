@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+import struct
+
+# struct format character for each signal width in bytes
+WIDTH_FORMATS = {1: 'B', 2: 'H', 4: 'I', 8: 'Q'}
+BYTE_ORDERS = {'little': '<', 'big': '>'}
+
+class Signal:
+    def __init__(self, name, start, width=1, byteorder='little', default=0):
+        """One unsigned signal of a CAN frame, start and width in bytes"""
+        if width not in WIDTH_FORMATS:
+            raise ValueError(f"Unsupported width for {name}: {width} bytes")
+        if byteorder not in BYTE_ORDERS:
+            raise ValueError(f"Unknown byte order for {name}: {byteorder}")
+        self.name = name
+        self.start = start
+        self.width = width
+        self.byteorder = byteorder
+        self.default = default
+
+class FrameLayout:
+    """Signal layout of a CAN frame, compiled to a single struct.Struct
+    
+    Unused bytes are padding (always 0 when encoding). All multi-byte
+    signals of one frame must use the same byte order.
+    """
+    def __init__(self, name, signals, length=8):
+        self.name = name
+        self.length = length
+        self.signals = sorted(signals, key=lambda signal: signal.start)
+        self.names = tuple(signal.name for signal in self.signals)
+        self.defaults = tuple(signal.default for signal in self.signals)
+        self.struct = struct.Struct(self._compile())
+    
+    def _compile(self):
+        byteorders = {signal.byteorder for signal in self.signals if signal.width > 1}
+        if len(byteorders) > 1:
+            raise ValueError(f"{self.name}: mixed byte orders in one frame")
+        fmt = BYTE_ORDERS[byteorders.pop() if byteorders else 'little']
+        position = 0
+        for signal in self.signals:
+            if signal.start < position:
+                raise ValueError(f"{self.name}: {signal.name} overlaps the previous signal")
+            if signal.start > position:
+                fmt += f"{signal.start - position}x"
+            fmt += WIDTH_FORMATS[signal.width]
+            position = signal.start + signal.width
+        if position > self.length:
+            raise ValueError(f"{self.name}: signals do not fit in {self.length} bytes")
+        if position < self.length:
+            fmt += f"{self.length - position}x"
+        return fmt
+    
+    def encode(self, signals):
+        """Pack a dict of signal values, missing signals get their default"""
+        return self.struct.pack(*map(signals.get, self.names, self.defaults))
+    
+    def decode(self, data, skip_zero=False):
+        """Unpack frame data into a dict of signal values (without the 0 ones if skip_zero)"""
+        values = zip(self.names, self.struct.unpack_from(data))
+        if skip_zero:
+            return {name: value for name, value in values if value}
+        return dict(values)
+
+# Master -> slave wiper command (0x100)
+WIPER_COMMAND = FrameLayout('WiperCommand', [
+    Signal('wiperMode', 0),
+    Signal('wiperSpeed', 1),
+    Signal('wiperCycleCount', 2),
+    Signal('WiperIntermittent', 3),
+    Signal('wipingCycle', 4, width=2),  # ms, little endian
+])
+
+# Slave -> master wiper status (0x101)
+WIPER_RESPONSE = FrameLayout('WiperResponse', [
+    Signal('WiperStatus', 0),            # 1=ready, 0=fault
+    Signal('wiperCurrentSpeed', 1),      # 0=stopped, 1=slow, 2=fast
+    Signal('wiperCurrentPosition', 2),   # 0-100%
+    Signal('currentWiperMode', 3),       # Matches wiperMode
+    Signal('consumedPower', 4),          # Watts (0-255)
+    Signal('isWiperBlocked', 5),         # 0=no, 1=yes
+    Signal('blockageReason', 6),         # 0=none, 1=obstacle, 2=motor_fault
+    Signal('hwError', 7),                # 0=no error
+])
+
+# Slave -> master wiper status of the bugg pair (0x101), same signals as
+# WIPER_RESPONSE with consumedPower and currentWiperMode swapped
+WIPER_STATUS = FrameLayout('WiperStatus', [
+    Signal('WiperStatus', 0),
+    Signal('wiperCurrentSpeed', 1),
+    Signal('wiperCurrentPosition', 2),
+    Signal('consumedPower', 3),
+    Signal('currentWiperMode', 4),
+    Signal('isWiperBlocked', 5),
+    Signal('blockageReason', 6),
+    Signal('hwError', 7),
+])
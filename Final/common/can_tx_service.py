@@ -0,0 +1,130 @@
+import can
+import errno
+import queue
+import threading
+import time
+
+DEFAULT_QUEUE_SIZE = 256
+DEFAULT_BURST = 32
+RETRY_DELAY = 0.002    # Wait before resending when the tx buffer is full
+MAX_RETRIES = 50
+LATENCY_WINDOW = 1000  # Per-frame latencies kept for the percentiles
+CLOSE_TIMEOUT = 2.0    # Longest close() waits for the queue and the thread
+
+def tx_buffer_full(error):
+    """True if a send failed only because the socket tx buffer is full"""
+    return getattr(error, 'error_code', None) == errno.ENOBUFS
+
+class CANTxService:
+    """Long-lived CAN transmitter owning a single bus handle
+
+    Messages are queued with send() (bounded queue, the caller waits when
+    it is full) and a thread sends them in bursts of up to `burst`
+    frames. Sends that fail because the tx buffer is full are retried,
+    any other error only drops the frame it happened on.
+    """
+    def __init__(self, channel='can0', bustype='socketcan', queue_size=DEFAULT_QUEUE_SIZE,
+                 burst=DEFAULT_BURST, bus=None):
+        self.bus = bus if bus is not None else can.interface.Bus(channel=channel, bustype=bustype)
+        self.owns_bus = bus is None
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.burst = burst
+        self.running = True
+        # Statistics
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.bursts = 0
+        self.latencies = []
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def send(self, arbitration_id, data, timeout=None):
+        """Queue a frame, returns False if the queue stayed full for timeout seconds"""
+        msg = can.Message(arbitration_id=arbitration_id, data=data, is_extended_id=False)
+        try:
+            self.queue.put((time.perf_counter(), msg), timeout=timeout)
+            return True
+        except queue.Full:
+            self.failed += 1
+            return False
+
+    def _send_frame(self, queued_at, msg):
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                self.bus.send(msg)
+                self.sent += 1
+                self.latencies.append(time.perf_counter() - queued_at)
+                return True
+            except can.CanError as e:
+                if not tx_buffer_full(e) or attempt == MAX_RETRIES:
+                    print(f"Error sending CAN message {hex(msg.arbitration_id)}: {e}")
+                    self.failed += 1
+                    return False
+                self.retries += 1
+                time.sleep(RETRY_DELAY)
+            except Exception as e:
+                print(f"Error sending CAN message {hex(msg.arbitration_id)}: {e}")
+                self.failed += 1
+                return False
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                return
+            # Take what else is already queued, up to a burst
+            burst = [item]
+            while len(burst) < self.burst:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self.queue.put(None)  # Stop after this burst
+                    self.queue.task_done()
+                    break
+                burst.append(item)
+            for queued_at, msg in burst:
+                try:
+                    self._send_frame(queued_at, msg)
+                finally:
+                    self.queue.task_done()
+            self.bursts += 1
+            del self.latencies[:-LATENCY_WINDOW]
+
+    def flush(self):
+        """Wait until every queued frame was sent (or failed)"""
+        self.queue.join()
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else None
+        return {
+            'sent': self.sent,
+            'failed': self.failed,
+            'retries': self.retries,
+            'bursts': self.bursts,
+            'queued': self.queue.qsize(),
+            'latency_p50_ms': percentile(0.5),
+            'latency_p99_ms': percentile(0.99),
+            'latency_max_ms': latencies[-1] * 1000 if latencies else None,
+        }
+
+    def close(self, timeout=CLOSE_TIMEOUT):
+        """Send what is queued, stop the thread and shut the bus down
+
+        Waits at most timeout seconds for room in the queue and again for
+        the thread, what is still queued then is dropped.
+        """
+        if self.running:
+            self.running = False
+            try:
+                self.queue.put(None, timeout=timeout)
+            except queue.Full:
+                print(f"CAN tx queue still full after {timeout}s, dropping {self.queue.qsize()} frames")
+            self.thread.join(timeout)
+            if self.owns_bus:
+                self.bus.shutdown()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+import logging
+import time
+from datetime import datetime, timezone
+
+from pymongo import ASCENDING
+from pymongo.errors import PyMongoError
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_POLL_INTERVAL = 0.1  # Seconds between tailing queries (and change stream wait)
+LATENCY_WINDOW = 500         # Command-to-frame latencies kept for the percentiles
+
+class CommandIngest:
+    """Pending wiper commands read from MongoDB without a full scan per poll
+
+    Commands are read with a query on the (status, _id) index for the
+    pending ones that are not in flight (returned by fetch() but not
+    marked by complete() yet). When the server supports change streams
+    (replica set) the query only runs when an insert was seen, else it
+    runs every poll. A command stays pending until complete() marked it,
+    so a failed write gives it back to the next fetch. Commands are
+    marked in one write per batch.
+    """
+    def __init__(self, collection, use_change_stream=True, batch_size=DEFAULT_BATCH_SIZE,
+                 poll_interval=DEFAULT_POLL_INTERVAL):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.collection.create_index([('status', ASCENDING), ('_id', ASCENDING)])
+        self.in_flight = set()
+        self.retry = []
+        self.stream = self._open_change_stream() if use_change_stream else None
+        self.mode = 'change_stream' if self.stream is not None else 'tailing'
+        # Pending commands the change stream won't report (already there at
+        # start, or given back by a failed write) are read through the index
+        self.backlog = True
+        # Statistics
+        self.received = 0
+        self.completed = 0
+        self.writes = 0
+        self.latencies = []
+        logging.info(f"Command ingest using {self.mode}")
+
+    def _open_change_stream(self):
+        pipeline = [{'$match': {'operationType': 'insert', 'fullDocument.status': 'pending'}}]
+        try:
+            return self.collection.watch(pipeline, max_await_time_ms=int(self.poll_interval * 1000))
+        except (PyMongoError, NotImplementedError, TypeError) as e:
+            # Standalone mongod (or mongomock) has no change streams
+            logging.info(f"Change stream not available ({e}), tailing the pending index")
+            return None
+
+    def _query_pending(self):
+        query = {'status': 'pending'}
+        if self.in_flight:
+            query['_id'] = {'$nin': list(self.in_flight)}
+        cursor = self.collection.find(query).sort('_id', ASCENDING).limit(self.batch_size)
+        return list(cursor)
+
+    def _wait_stream(self, deadline):
+        """Wait for an insert of a pending command, False if deadline passed first"""
+        inserted = False
+        while True:
+            # try_next waits up to max_await_time_ms on the server
+            change = self.stream.try_next()
+            if change is not None:
+                inserted = True
+            elif inserted or time.monotonic() >= deadline:
+                return inserted
+
+    def fetch(self, timeout=0.0):
+        """Return the next pending commands in _id order, waiting up to timeout for new ones
+
+        Every command returned must be given to complete() or requeue().
+        """
+        if self.retry:
+            commands, self.retry = self.retry, []
+            return commands
+        deadline = time.monotonic() + timeout
+        if not self.backlog and self.stream is not None:
+            try:
+                if not self._wait_stream(deadline):
+                    return []
+            except PyMongoError as e:
+                # Resume by tailing the index, the commands are still pending
+                logging.error(f"Change stream error ({e}), switching to tailing")
+                self.stream = None
+                self.mode = 'tailing'
+        commands = self._query_pending()
+        # More are pending than one batch: query again without waiting for an insert
+        self.backlog = len(commands) == self.batch_size
+        if not commands and self.stream is None:
+            remaining = deadline - time.monotonic()
+            if remaining > 0:
+                time.sleep(min(remaining, self.poll_interval))
+        self.in_flight.update(command['_id'] for command in commands)
+        self.received += len(commands)
+        return commands
+
+    def requeue(self, command):
+        """Give a command back, it is returned first by the next fetch"""
+        self.retry.append(command)
+
+    def complete(self, commands, status='completed'):
+        """Mark commands in a single write and record their command-to-frame latency
+
+        If the write fails the commands are still pending and the next
+        fetch() returns them again.
+        """
+        if not commands:
+            return 0
+        ids = [command['_id'] for command in commands]
+        try:
+            result = self.collection.update_many(
+                {'_id': {'$in': ids}},
+                {'$set': {'status': status}}
+            )
+        except PyMongoError:
+            self.backlog = True
+            raise
+        finally:
+            self.in_flight.difference_update(ids)
+        now = datetime.now(timezone.utc)
+        for command in commands:
+            created = command.get('timestamp') or command['_id'].generation_time
+            if created.tzinfo is None:
+                created = created.replace(tzinfo=timezone.utc)
+            self.latencies.append((now - created).total_seconds())
+        del self.latencies[:-LATENCY_WINDOW]
+        self.writes += 1
+        self.completed += len(commands)
+        return result.modified_count
+
+    def ignore_pending(self):
+        """Mark every pending command ignored, the requeued ones too"""
+        for command in self.retry:
+            self.in_flight.discard(command['_id'])
+        self.retry = []
+        return self.collection.update_many(
+            {'status': 'pending'},
+            {'$set': {'status': 'ignored'}}
+        ).modified_count
+
+    def queue_depth(self):
+        """Number of pending commands in the collection (counted on the index)"""
+        return self.collection.count_documents({'status': 'pending'})
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        try:
+            queue_depth = self.queue_depth()
+        except PyMongoError:
+            queue_depth = None
+        return {
+            'mode': self.mode,
+            'received': self.received,
+            'completed': self.completed,
+            'writes': self.writes,
+            'queue_depth': queue_depth,
+            'latency_p50_ms': latencies[len(latencies) // 2] * 1000 if latencies else None,
+            'latency_max_ms': latencies[-1] * 1000 if latencies else None,
+        }
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
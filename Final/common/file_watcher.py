@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+# inotify event masks (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+# The file is complete once it was closed or renamed into place
+COMPLETE_MASK = IN_CLOSE_WRITE | IN_MOVED_TO
+
+EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+def _load_inotify():
+    """Return libc if it has inotify, None otherwise"""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    return libc
+
+class FileWatcher:
+    """Wait for changes to a single file
+    
+    Uses inotify on the file's directory when available (so editors that
+    replace the file are seen too) and falls back to polling os.stat().
+    A write is reported as soon as the writer closes the file; writes
+    that stay open are reported once they have been quiet for debounce
+    seconds, so half-written files are not picked up. writer_closed
+    tells whether the last change ended with the writer closing (or
+    renaming) the file, which only inotify can see.
+    """
+    def __init__(self, path, debounce=0.005, poll_interval=0.1, use_inotify=True):
+        self.path = os.path.abspath(path)
+        self.name = os.fsencode(os.path.basename(self.path))
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.events = 0
+        self.writer_closed = False
+        self.fd = None
+        
+        libc = _load_inotify() if use_inotify else None
+        if libc is not None:
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd >= 0:
+                directory = os.fsencode(os.path.dirname(self.path))
+                if libc.inotify_add_watch(fd, directory, WATCH_MASK) >= 0:
+                    self.fd = fd
+                else:
+                    os.close(fd)
+        self.backend = 'inotify' if self.fd is not None else 'poll'
+        self._last_stat = self._stat()
+    
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_ino, st.st_size, st.st_mtime_ns)
+        except OSError:
+            return None
+    
+    def _read_events(self):
+        """Return the OR of the event masks for our file, 0 if none"""
+        try:
+            buffer = os.read(self.fd, 4096)
+        except BlockingIOError:
+            return 0
+        mask = 0
+        offset = 0
+        while offset < len(buffer):
+            _, event_mask, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+            offset += EVENT_HEADER.size
+            if buffer[offset:offset + length].rstrip(b'\0') == self.name:
+                mask |= event_mask
+            offset += length
+        return mask
+    
+    def _wait_inotify(self, deadline):
+        mask = 0
+        while not mask & COMPLETE_MASK:
+            if mask:
+                # Modified but still open: wait for more writes or a quiet period
+                timeout = self.debounce
+            elif deadline is None:
+                timeout = None
+            else:
+                timeout = max(0.0, deadline - time.monotonic())
+            readable, _, _ = select.select([self.fd], [], [], timeout)
+            if not readable:
+                return bool(mask)
+            mask |= self._read_events()
+        self.writer_closed = True
+        return True
+    
+    def _wait_poll(self, deadline):
+        while True:
+            current = self._stat()
+            if current != self._last_stat:
+                # Wait until the file stops changing
+                time.sleep(self.debounce)
+                settled = self._stat()
+                while settled != current:
+                    current = settled
+                    time.sleep(self.debounce)
+                    settled = self._stat()
+                self._last_stat = current
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            interval = self.poll_interval
+            if deadline is not None:
+                interval = min(interval, max(0.0, deadline - time.monotonic()))
+            time.sleep(interval)
+    
+    def wait(self, timeout=None):
+        """Block until the file changed, return False if timeout passed first"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self.writer_closed = False
+        if self.fd is not None:
+            changed = self._wait_inotify(deadline)
+        else:
+            changed = self._wait_poll(deadline)
+        if changed:
+            self.events += 1
+        return changed
+    
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+import threading
+import time
+
+DEFAULT_TICK = 0.005   # Scheduler resolution in seconds
+DEFAULT_WHEEL_SIZE = 512
+
+def sweep_timeline(leds, step_delay):
+    """One wiper sweep: LEDs on right to left, then off left to right
+
+    Returns the list of (offset, pin, level) steps and the sweep duration,
+    each step lasts step_delay seconds.
+    """
+    timeline = [(i * step_delay, led, 1) for i, led in enumerate(leds)]
+    timeline += [((len(leds) + i) * step_delay, led, 0) for i, led in enumerate(reversed(leds))]
+    return timeline, 2 * len(leds) * step_delay
+
+class Animation:
+    """A precomputed step timeline playing on one channel"""
+    def __init__(self, channel, steps, period, cycles, pins, on_step=None, on_done=None):
+        self.channel = channel
+        self.steps = steps        # [(offset_ticks, pin, level)] sorted by offset
+        self.period = period      # ticks per cycle
+        self.cycles = cycles      # 0 = until cancelled
+        self.pins = pins
+        self.on_step = on_step
+        self.on_done = on_done
+        self.cancelled = False
+        self.finished = False
+        self.index = 0
+        self.cycle = 0
+        self.cycle_start = 0
+
+    def next_tick(self):
+        return self.cycle_start + self.steps[self.index][0]
+
+class LEDAnimator:
+    """Drives all LED channels from a single timer-wheel thread
+
+    Starting an animation on a channel preempts the one already playing
+    there. Cancelling only flags the animation (its pending wheel entry is
+    dropped when reached) and switches its LEDs off on the caller's thread,
+    so the stop takes a fixed, small amount of time.
+    """
+    def __init__(self, gpio, tick=DEFAULT_TICK, wheel_size=DEFAULT_WHEEL_SIZE):
+        self.gpio = gpio
+        self.tick = tick
+        self.wheel = [[] for _ in range(wheel_size)]
+        self.channels = {}
+        self.cond = threading.Condition()
+        self.epoch = time.monotonic()
+        self.current_tick = self._now_tick()
+        self.running = True
+        # Statistics
+        self.started = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.max_lateness = 0.0
+        self.max_stop_latency = 0.0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _now_tick(self):
+        return int((time.monotonic() - self.epoch) / self.tick)
+
+    def _schedule(self, animation, tick):
+        self.wheel[tick % len(self.wheel)].append((tick, animation))
+
+    def start(self, channel, timeline, duration, cycles=0, gap=0.0, on_step=None, on_done=None):
+        """Play a timeline on a channel, preempting what it was playing
+
+        timeline is a list of (offset, pin, level) with offsets in seconds
+        (see sweep_timeline), duration the length of one cycle, gap an idle
+        time added after every cycle. cycles=0 repeats until cancelled.
+        on_step(pin, level) is called after every step and on_done() when
+        the animation completes (not when it is cancelled), both from the
+        scheduler thread.
+        """
+        steps = sorted((round(offset / self.tick), pin, level) for offset, pin, level in timeline)
+        period = max(1, round((duration + gap) / self.tick))
+        pins = sorted({pin for _, pin, _ in steps})
+        animation = Animation(channel, steps, period, cycles, pins, on_step, on_done)
+        with self.cond:
+            self._cancel_locked(channel)
+            if not steps:
+                return animation
+            animation.cycle_start = max(self._now_tick(), self.current_tick + 1)
+            self.channels[channel] = animation
+            self._schedule(animation, animation.next_tick())
+            self.started += 1
+            self.cond.notify()
+        return animation
+
+    def _cancel_locked(self, channel):
+        animation = self.channels.pop(channel, None)
+        if animation is None:
+            return False
+        animation.cancelled = True
+        for pin in animation.pins:
+            self.gpio.output(pin, 0)
+        self.cancelled += 1
+        return True
+
+    def cancel(self, channel):
+        """Stop a channel and switch its LEDs off, returns False if it was idle"""
+        start = time.perf_counter()
+        with self.cond:
+            stopped = self._cancel_locked(channel)
+            self.max_stop_latency = max(self.max_stop_latency, time.perf_counter() - start)
+        return stopped
+
+    def cancel_all(self):
+        """Stop every channel and switch their LEDs off"""
+        start = time.perf_counter()
+        with self.cond:
+            for channel in list(self.channels):
+                self._cancel_locked(channel)
+            self.max_stop_latency = max(self.max_stop_latency, time.perf_counter() - start)
+
+    def is_active(self, channel):
+        return channel in self.channels
+
+    def _fire(self, animation, tick):
+        """Apply the due steps of an animation, returns True when it completes"""
+        lateness = (tick - animation.next_tick()) * self.tick
+        self.max_lateness = max(self.max_lateness, lateness)
+        steps = animation.steps
+        while animation.index < len(steps) and animation.next_tick() <= tick:
+            _, pin, level = steps[animation.index]
+            self.gpio.output(pin, level)
+            if animation.on_step:
+                animation.on_step(pin, level)
+            animation.index += 1
+        if animation.index == len(steps):
+            animation.cycle += 1
+            if animation.cycles and animation.cycle >= animation.cycles:
+                return True
+            animation.index = 0
+            animation.cycle_start += animation.period
+        self._schedule(animation, animation.next_tick())
+        return False
+
+    def _run(self):
+        while True:
+            done = []
+            with self.cond:
+                if not self.running:
+                    return
+                if not self.channels:
+                    # Idle: sleep until an animation is started
+                    self.cond.wait()
+                    if self.channels:
+                        # Skip the idle ticks, but never past the first scheduled step
+                        # (a later wake-up would leave it in its slot for a whole lap)
+                        earliest = min(animation.next_tick() for animation in self.channels.values())
+                        self.current_tick = max(self.current_tick, min(self._now_tick(), earliest) - 1)
+                    continue
+                now = self._now_tick()
+                next_tick = min(animation.next_tick() for animation in self.channels.values())
+                if now < next_tick:
+                    # Sleep until the next step is due (or an animation is started/cancelled)
+                    self.cond.wait(self.epoch + next_tick * self.tick - time.monotonic())
+                    continue
+                # Process every tick up to now (more than one if the thread was late)
+                while self.current_tick < now:
+                    self.current_tick += 1
+                    slot = self.wheel[self.current_tick % len(self.wheel)]
+                    if not slot:
+                        continue
+                    due = [entry for entry in slot if entry[0] <= self.current_tick]
+                    slot[:] = [entry for entry in slot if entry[0] > self.current_tick]
+                    for _, animation in due:
+                        if animation.cancelled:
+                            continue
+                        if self._fire(animation, self.current_tick):
+                            animation.finished = True
+                            del self.channels[animation.channel]
+                            self.completed += 1
+                            done.append(animation)
+            # Completion callbacks run without the lock held
+            for animation in done:
+                if animation.on_done:
+                    animation.on_done()
+
+    def stats(self):
+        with self.cond:
+            return {
+                'active': len(self.channels),
+                'started': self.started,
+                'completed': self.completed,
+                'cancelled': self.cancelled,
+                'max_lateness_ms': self.max_lateness * 1000,
+                'max_stop_latency_ms': self.max_stop_latency * 1000,
+            }
+
+    def close(self):
+        """Cancel every animation and stop the scheduler thread"""
+        self.cancel_all()
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        self.thread.join(timeout=1.0)
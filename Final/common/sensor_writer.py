@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+import collections
+import logging
+import os
+import threading
+import time
+
+from bson import json_util
+from bson.errors import BSONError
+from pymongo.errors import BulkWriteError, PyMongoError
+
+DEFAULT_BATCH_SIZE = 20
+DEFAULT_FLUSH_INTERVAL = 10.0  # Seconds a document may wait before its batch is written
+DEFAULT_MAX_QUEUE = 1000       # Documents kept in memory, the oldest are dropped beyond
+DEFAULT_RETRY_INTERVAL = 5.0   # Seconds between attempts while the database is unreachable
+DEFAULT_SPILL_PATH = 'sensor_spill.jsonl'
+DUPLICATE_KEY = 11000
+
+class SensorWriter:
+    """Background writer for the sensor documents
+
+    write() only appends to an in-memory queue, a thread inserts the
+    documents with insert_many in batches of batch_size (or every
+    flush_interval). While the database is unreachable the batches are
+    appended to a local spill file, replayed once inserts work again.
+    Spilled lines that do not parse are moved to spill_path + '.bad'.
+    If the queue still fills up, the oldest documents are dropped.
+    """
+    def __init__(self, collection, batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL,
+                 max_queue=DEFAULT_MAX_QUEUE, retry_interval=DEFAULT_RETRY_INTERVAL,
+                 spill_path=DEFAULT_SPILL_PATH):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_interval = retry_interval
+        self.spill_path = spill_path
+        self.queue = collections.deque(maxlen=max_queue)
+        self.cond = threading.Condition()
+        self.running = True
+        self.oldest_queued = None
+        self.database_ok = True
+        # Statistics
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.quarantined = 0
+        self.errors = 0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def write(self, document):
+        """Queue a document, never blocks on the database"""
+        with self.cond:
+            if len(self.queue) == self.queue.maxlen:
+                self.dropped += 1
+            self.queue.append(document)
+            if self.oldest_queued is None:
+                # The thread waits without timeout on an empty queue, start the flush_interval
+                self.oldest_queued = time.monotonic()
+                self.cond.notify()
+            elif len(self.queue) >= self.batch_size:
+                self.cond.notify()
+
+    def _take_batch(self):
+        """Wait until a batch is due and take it (empty list when stopping with nothing queued)"""
+        with self.cond:
+            while self.running:
+                if len(self.queue) >= self.batch_size:
+                    break
+                if self.queue and time.monotonic() - self.oldest_queued >= self.flush_interval:
+                    break
+                if self.queue:
+                    timeout = self.oldest_queued + self.flush_interval - time.monotonic()
+                else:
+                    timeout = None
+                if not self.database_ok and os.path.exists(self.spill_path):
+                    # Wake up to retry the spill file
+                    timeout = self.retry_interval if timeout is None else min(timeout, self.retry_interval)
+                if not self.cond.wait(timeout) and not self.queue:
+                    return []
+            batch = [self.queue.popleft() for _ in range(min(self.batch_size, len(self.queue)))]
+            self.oldest_queued = time.monotonic() if self.queue else None
+            return batch
+
+    def _insert(self, documents):
+        """insert_many, documents already inserted (duplicate _id) count as written"""
+        try:
+            self.collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            if any(error['code'] != DUPLICATE_KEY for error in e.details.get('writeErrors', [])):
+                raise
+
+    def _spill(self, documents):
+        try:
+            with open(self.spill_path, 'a') as f:
+                for document in documents:
+                    f.write(json_util.dumps(document) + '\n')
+            self.spilled += len(documents)
+        except OSError as e:
+            logging.error(f"Sensor spill failed, {len(documents)} documents lost: {e}")
+            self.dropped += len(documents)
+
+    def _quarantine(self, lines):
+        try:
+            with open(self.spill_path + '.bad', 'a') as f:
+                f.writelines(lines)
+            self.quarantined += len(lines)
+        except OSError as e:
+            logging.error(f"Sensor quarantine failed, {len(lines)} spilled lines lost: {e}")
+            self.dropped += len(lines)
+
+    def _replay(self):
+        """Insert the spilled documents, the file is removed once they are all in"""
+        try:
+            with open(self.spill_path) as f:
+                lines = [line for line in f if line.strip()]
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            logging.error(f"Sensor spill file unreadable, retrying later: {e}")
+            return
+        documents = []
+        bad = []
+        for line in lines:
+            try:
+                document = json_util.loads(line)
+            except (ValueError, TypeError, BSONError):
+                document = None
+            if isinstance(document, dict):
+                documents.append(document)
+            else:
+                bad.append(line)
+        for start in range(0, len(documents), self.batch_size):
+            self._insert(documents[start:start + self.batch_size])
+        if bad:
+            logging.error(f"Moving {len(bad)} unreadable spilled sensor lines to {self.spill_path}.bad")
+            self._quarantine(bad)
+        try:
+            os.remove(self.spill_path)
+        except OSError as e:
+            # Replayed again next time, the duplicate _ids are skipped by _insert
+            logging.error(f"Could not remove the sensor spill file: {e}")
+        self.replayed += len(documents)
+        logging.info(f"Replayed {len(documents)} spilled sensor documents")
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            try:
+                if not self.database_ok or os.path.exists(self.spill_path):
+                    self._replay()
+                if batch:
+                    self._insert(batch)
+                    self.written += len(batch)
+                    self.batches += 1
+                if not self.database_ok:
+                    logging.info("Sensor database reachable again")
+                self.database_ok = True
+            except PyMongoError as e:
+                self.errors += 1
+                if self.database_ok:
+                    logging.error(f"Sensor insert failed, spilling to {self.spill_path}: {e}")
+                self.database_ok = False
+                self._spill(batch)
+            with self.cond:
+                if not self.running and not self.queue:
+                    return
+
+    def stats(self):
+        with self.cond:
+            return {
+                'queued': len(self.queue),
+                'written': self.written,
+                'batches': self.batches,
+                'dropped': self.dropped,
+                'spilled': self.spilled,
+                'replayed': self.replayed,
+                'quarantined': self.quarantined,
+                'errors': self.errors,
+            }
+
+    def close(self, timeout=5.0):
+        """Write (or spill) what is queued and stop the thread"""
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        self.thread.join(timeout)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Behaviour checks for CommandIngest on mongomock, no MongoDB server needed.
+
+Run from the Final/common directory:
+    python3 -m unittest discover tests
+"""
+import os
+import sys
+import time
+import unittest
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import mongomock
+    from bson import ObjectId
+    from pymongo.errors import PyMongoError
+    from command_ingest import CommandIngest
+except ImportError:
+    mongomock = None
+
+def command(**fields):
+    document = {'wiperType': 'front', 'speed': 'normal', 'cycles': 1, 'status': 'pending'}
+    document.update(fields)
+    return document
+
+class FakeChangeStream:
+    """Change stream stand-in, try_next returns the queued changes then None"""
+    def __init__(self):
+        self.changes = []
+
+    def try_next(self):
+        if self.changes:
+            return self.changes.pop(0)
+        time.sleep(0.001)
+        return None
+
+    def close(self):
+        pass
+
+@unittest.skipIf(mongomock is None, "needs pymongo and mongomock")
+class TailingTest(unittest.TestCase):
+    def setUp(self):
+        self.collection = mongomock.MongoClient().db.commands
+        self.ingest = CommandIngest(self.collection, use_change_stream=False, batch_size=2, poll_interval=0.001)
+
+    def fetch_ids(self):
+        return [doc['_id'] for doc in self.ingest.fetch()]
+
+    def test_commands_in_id_order_by_batch(self):
+        ids = self.collection.insert_many([command() for _ in range(3)]).inserted_ids
+        first = self.ingest.fetch()
+        self.assertEqual([doc['_id'] for doc in first], ids[:2])
+        # In flight until completed: not returned again
+        second = self.ingest.fetch()
+        self.assertEqual([doc['_id'] for doc in second], ids[2:])
+        self.assertEqual(self.ingest.complete(first + second), 3)
+        self.assertEqual(self.ingest.fetch(), [])
+        self.assertEqual(self.ingest.queue_depth(), 0)
+
+    def test_failed_complete_gives_commands_back(self):
+        ids = self.collection.insert_many([command()]).inserted_ids
+        commands = self.ingest.fetch()
+        update_many = self.collection.update_many
+        def unreachable(*args, **kwargs):
+            raise PyMongoError("unreachable")
+        self.collection.update_many = unreachable
+        with self.assertRaises(PyMongoError):
+            self.ingest.complete(commands)
+        self.collection.update_many = update_many
+        self.assertEqual(self.fetch_ids(), ids)
+
+    def test_lower_id_inserted_later_is_read(self):
+        self.collection.insert_one(command())
+        self.ingest.complete(self.ingest.fetch())
+        # From a host whose clock is behind: its ObjectId sorts before the one completed
+        late = ObjectId.from_datetime(datetime(2000, 1, 1))
+        self.collection.insert_one(command(_id=late))
+        self.assertEqual(self.fetch_ids(), [late])
+
+    def test_requeue_returns_command_first(self):
+        self.collection.insert_many([command(), command()])
+        first, second = self.ingest.fetch()
+        self.ingest.complete([second])
+        self.ingest.requeue(first)
+        self.assertEqual(self.fetch_ids(), [first['_id']])
+
+    def test_ignore_pending(self):
+        self.collection.insert_many([command() for _ in range(3)])
+        self.ingest.requeue(self.ingest.fetch()[0])
+        self.assertEqual(self.ingest.ignore_pending(), 3)
+        self.assertEqual(self.ingest.fetch(), [])
+        self.assertEqual(self.collection.count_documents({'status': 'ignored'}), 3)
+
+    def test_latency_stats(self):
+        self.collection.insert_one(command(timestamp=datetime.utcnow()))
+        self.ingest.complete(self.ingest.fetch())
+        stats = self.ingest.stats()
+        self.assertEqual((stats['mode'], stats['received'], stats['completed'], stats['writes']),
+                         ('tailing', 1, 1, 1))
+        self.assertGreaterEqual(stats['latency_p50_ms'], 0)
+
+@unittest.skipIf(mongomock is None, "needs pymongo and mongomock")
+class ChangeStreamTest(unittest.TestCase):
+    def setUp(self):
+        self.collection = mongomock.MongoClient().db.commands
+        self.stream = FakeChangeStream()
+        self.collection.watch = lambda *args, **kwargs: self.stream
+        self.backlog_id = self.collection.insert_one(command()).inserted_id
+        self.ingest = CommandIngest(self.collection, batch_size=2, poll_interval=0.001)
+
+    def test_backlog_then_inserts(self):
+        self.assertEqual(self.ingest.mode, 'change_stream')
+        self.assertEqual([doc['_id'] for doc in self.ingest.fetch(0.01)], [self.backlog_id])
+        # Nothing read until the stream reports an insert
+        new_id = self.collection.insert_one(command()).inserted_id
+        self.assertEqual(self.ingest.fetch(0.01), [])
+        self.stream.changes.append({'fullDocument': {'_id': new_id}})
+        self.assertEqual([doc['_id'] for doc in self.ingest.fetch(0.01)], [new_id])
+
+    def test_failed_complete_is_read_without_insert(self):
+        commands = self.ingest.fetch(0.01)
+        update_many = self.collection.update_many
+        def unreachable(*args, **kwargs):
+            raise PyMongoError("unreachable")
+        self.collection.update_many = unreachable
+        with self.assertRaises(PyMongoError):
+            self.ingest.complete(commands)
+        self.collection.update_many = update_many
+        self.assertEqual([doc['_id'] for doc in self.ingest.fetch(0.01)], [self.backlog_id])
+
+    def test_stream_error_switches_to_tailing(self):
+        self.ingest.complete(self.ingest.fetch(0.01))
+        def broken():
+            raise PyMongoError("stream closed")
+        self.stream.try_next = broken
+        new_id = self.collection.insert_one(command()).inserted_id
+        self.assertEqual([doc['_id'] for doc in self.ingest.fetch(0.01)], [new_id])
+        self.assertEqual(self.ingest.mode, 'tailing')
+
+if __name__ == "__main__":
+    unittest.main()
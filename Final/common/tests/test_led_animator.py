@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Regression checks for the LEDAnimator timer wheel, no Pi needed.
+
+Run from the Final/common directory:
+    python3 -m unittest discover tests
+"""
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from led_animator import LEDAnimator, sweep_timeline
+
+TICK = 0.005
+
+class NullGPIO:
+    def output(self, pin, level):
+        pass
+
+class StartFromIdleTest(unittest.TestCase):
+    def setUp(self):
+        self.animator = LEDAnimator(NullGPIO(), tick=TICK)
+
+    def tearDown(self):
+        self.animator.close()
+
+    def start_and_wait_first_step(self, hold_ticks):
+        """Start from idle with the scheduler woken hold_ticks later, return the delay to the first step"""
+        first_step = threading.Event()
+        timeline, duration = sweep_timeline([23, 24, 25], 0.3)
+        # The condition's lock is reentrant: holding it keeps the scheduler
+        # asleep, so it wakes up in a later tick than the one start() used
+        with self.animator.cond:
+            self.animator.start('front', timeline, duration, on_step=lambda pin, level: first_step.set())
+            time.sleep(hold_ticks * TICK)
+            released = time.monotonic()
+        self.assertTrue(first_step.wait(1.0), "first step not fired within 1 s")
+        delay = time.monotonic() - released
+        self.animator.cancel('front')
+        return delay
+
+    def test_first_step_fires_after_late_wakeup(self):
+        for hold_ticks in (1, 2, 5):
+            delay = self.start_and_wait_first_step(hold_ticks)
+            self.assertLess(delay, 5 * TICK, f"woken {hold_ticks} ticks late: first step after {delay * 1000:.1f} ms")
+
+    def test_first_step_fires_after_long_idle(self):
+        # Idle for more than a wheel lap before the start
+        time.sleep(len(self.animator.wheel) * TICK + 0.1)
+        delay = self.start_and_wait_first_step(2)
+        self.assertLess(delay, 5 * TICK, f"first step after {delay * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Behaviour checks for SensorWriter on mongomock, no MongoDB server needed.
+
+Run from the Final/common directory:
+    python3 -m unittest discover tests
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import mongomock
+    from pymongo.errors import PyMongoError
+    from sensor_writer import SensorWriter
+except ImportError:
+    mongomock = None
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+@unittest.skipIf(mongomock is None, "needs pymongo and mongomock")
+class SensorWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.spill_path = os.path.join(self.directory, 'spill.jsonl')
+        self.collection = mongomock.MongoClient().db.sensors
+        self.insert_many = self.collection.insert_many
+
+    def start(self, **kwargs):
+        options = dict(batch_size=3, flush_interval=0.05, retry_interval=0.02, spill_path=self.spill_path)
+        options.update(kwargs)
+        writer = SensorWriter(self.collection, **options)
+        self.addCleanup(writer.close)
+        return writer
+
+    def values(self):
+        return sorted(doc['value'] for doc in self.collection.find())
+
+    def database_down(self):
+        def unreachable(*args, **kwargs):
+            raise PyMongoError("unreachable")
+        self.collection.insert_many = unreachable
+
+    def database_up(self):
+        self.collection.insert_many = self.insert_many
+
+    def test_full_batch_is_written(self):
+        writer = self.start(flush_interval=60)
+        for value in range(3):
+            writer.write({'value': value})
+        self.assertTrue(wait_for(lambda: self.values() == [0, 1, 2]))
+        self.assertEqual(writer.stats()['batches'], 1)
+
+    def test_lone_document_written_after_flush_interval(self):
+        writer = self.start()
+        writer.write({'value': 1})
+        self.assertTrue(wait_for(lambda: self.values() == [1], timeout=1.0))
+
+    def test_close_writes_what_is_queued(self):
+        writer = self.start(flush_interval=60)
+        writer.write({'value': 1})
+        writer.close()
+        self.assertEqual(self.values(), [1])
+
+    def test_full_queue_drops_oldest(self):
+        self.database_down()
+        writer = self.start(batch_size=100, max_queue=2, flush_interval=60)
+        for value in range(3):
+            writer.write({'value': value})
+        self.assertEqual(writer.stats()['dropped'], 1)
+        self.database_up()
+        writer.close()
+        self.assertEqual(self.values(), [1, 2])
+
+    def test_spilled_while_down_replayed_when_up(self):
+        self.database_down()
+        writer = self.start()
+        for value in range(3):
+            writer.write({'value': value})
+        self.assertTrue(wait_for(lambda: writer.stats()['spilled'] == 3))
+        self.assertTrue(os.path.exists(self.spill_path))
+        self.database_up()
+        self.assertTrue(wait_for(lambda: self.values() == [0, 1, 2]))
+        self.assertTrue(wait_for(lambda: not os.path.exists(self.spill_path)))
+        self.assertEqual(writer.stats()['replayed'], 3)
+
+    def test_bad_spill_lines_are_quarantined(self):
+        with open(self.spill_path, 'w') as f:
+            f.write('{"value": 1}\n{"value": 2, trunc\n5\n{"value": 3}\n')
+        writer = self.start()
+        writer.write({'value': 4})
+        self.assertTrue(wait_for(lambda: self.values() == [1, 3, 4]))
+        self.assertTrue(writer.thread.is_alive())
+        self.assertEqual(writer.stats()['quarantined'], 2)
+        with open(self.spill_path + '.bad') as f:
+            self.assertEqual(f.read(), '{"value": 2, trunc\n5\n')
+        self.assertFalse(os.path.exists(self.spill_path))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,9 @@
-import can
 import time
 import os
+import sys
+# Modules shared between the scripts live in Final/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'common'))
+from can_tx_service import CANTxService
 
 # CAN IDs for each light type
 LIGHT_IDS = {
@@ -20,19 +23,12 @@ STATUS_CODES = {
     "FAILED": 0xFF
 }
 
-def send_can_message(light, status):
-    try:
-        bus = can.interface.Bus(channel='can0', bustype='socketcan')
-        msg = can.Message(
-            arbitration_id=LIGHT_IDS[light],
-            data=[STATUS_CODES[status]],
-            is_extended_id=False
-        )
-        bus.send(msg)
-        print(f"Sent: {light} - {status} (ID: {hex(LIGHT_IDS[light])}, Data: {hex(STATUS_CODES[status])})")
-        bus.shutdown()
-    except Exception as e:
-        print(f"Error sending CAN message: {e}")
+def send_can_message(tx, light, status):
+    # The frame is sent by the tx service thread on its single bus handle
+    if tx.send(LIGHT_IDS[light], [STATUS_CODES[status]], timeout=1.0):
+        print(f"Queued: {light} - {status} (ID: {hex(LIGHT_IDS[light])}, Data: {hex(STATUS_CODES[status])})")
+    else:
+        print(f"Error sending CAN message: queue full, {light} - {status} dropped")
 
 def monitor_file(filename):
     print(f"Monitoring {filename} for new light status updates...")
@@ -41,6 +37,9 @@ def monitor_file(filename):
     # Get initial file size
     last_size = os.path.getsize(filename)
     
+    # One bus handle for the whole run
+    tx = CANTxService(channel='can0', bustype='socketcan')
+    
     try:
         while True:
             current_size = os.path.getsize(filename)
@@ -63,7 +62,7 @@ def monitor_file(filename):
                                 status = parts[1].split(':')[1].strip()
                                 
                                 if light in LIGHT_IDS and status in STATUS_CODES:
-                                    send_can_message(light, status)
+                                    send_can_message(tx, light, status)
                                 else:
                                     print(f"Ignoring unknown light/status: {line}")
                             except IndexError:
@@ -73,6 +72,9 @@ def monitor_file(filename):
             
     except KeyboardInterrupt:
         print("\nStopped monitoring")
+    finally:
+        tx.close()
+        print(f"CAN tx stats: {tx.stats()}")
 
 if __name__ == "__main__":
     monitor_file("analysis_results.txt")
\ No newline at end of file
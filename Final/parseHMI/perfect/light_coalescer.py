@@ -0,0 +1,58 @@
+import time
+
+class LightCoalescer:
+    """Keeps the latest requested status per light and only lets transitions through
+
+    request() records what analysis_results.txt asks for, changes() returns
+    the lights whose requested status differs from the last one sent
+    (repeated lines give nothing), refresh_due() the lights that were not
+    sent for refresh_interval seconds (keep-alive, None disables it).
+    """
+    def __init__(self, refresh_interval=None):
+        self.refresh_interval = refresh_interval
+        self.desired = {}
+        self.sent = {}
+        self.sent_at = {}
+        self.pending_requests = 0
+        # Statistics
+        self.requests = 0
+        self.transitions = 0
+        self.refreshes = 0
+        self.suppressed = 0
+
+    def request(self, light, status):
+        self.desired[light] = status
+        self.requests += 1
+        self.pending_requests += 1
+
+    def changes(self):
+        """(light, status) to send, a light whose send failed is returned again"""
+        changes = [(light, status) for light, status in self.desired.items()
+                   if self.sent.get(light) != status]
+        self.suppressed += max(0, self.pending_requests - len(changes))
+        self.pending_requests = 0
+        return changes
+
+    def refresh_due(self, now=None):
+        """(light, status) of the lights to send again as keep-alive"""
+        if self.refresh_interval is None:
+            return []
+        now = time.monotonic() if now is None else now
+        return [(light, status) for light, status in self.sent.items()
+                if now - self.sent_at[light] >= self.refresh_interval]
+
+    def mark_sent(self, light, status, refresh=False):
+        self.sent[light] = status
+        self.sent_at[light] = time.monotonic()
+        if refresh:
+            self.refreshes += 1
+        else:
+            self.transitions += 1
+
+    def stats(self):
+        return {
+            'requests': self.requests,
+            'transitions': self.transitions,
+            'refreshes': self.refreshes,
+            'suppressed': self.suppressed,
+        }
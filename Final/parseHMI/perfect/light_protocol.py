@@ -0,0 +1,63 @@
+# CAN lighting protocol shared by send.py (master) and receive.py (slave)
+
+# CAN IDs for each light type (one frame per light, 1 data byte)
+LIGHT_IDS = {
+    "Low Beam": 0x101,
+    "High Beam": 0x102,
+    "Parking Left": 0x103,
+    "Parking Right": 0x104,
+    "Hazard Lights": 0x105,
+    "Right Turn": 0x106,
+    "Left Turn": 0x107
+}
+
+# Reverse mapping for interpretation
+LIGHT_NAMES = {can_id: light for light, can_id in LIGHT_IDS.items()}
+
+# Status codes (1 byte)
+STATUS_CODES = {
+    "activated": 0x01,
+    "desactivated": 0x00,
+    "FAILED": 0xFF
+}
+
+STATUS_NAMES = {code: status for status, code in STATUS_CODES.items()}
+
+# Byte order of the lights in the packed frames
+LIGHT_ORDER = [
+    "Low Beam", "High Beam", "Parking Left", "Parking Right",
+    "Hazard Lights", "Right Turn", "Left Turn"
+]
+
+# Slave -> master status of all lights, 1 byte per light in LIGHT_ORDER
+RESPONSE_ID = 0x200
+
+# Master -> slave packed command: byte 0 is a change mask (bit i set = light
+# i of LIGHT_ORDER is commanded), bytes 1-7 the status code of each light
+PACKED_COMMAND_ID = 0x108
+
+def encode_packed_command(statuses):
+    """Pack {light: status} (only the commanded lights) into one 8-byte frame"""
+    data = bytearray(1 + len(LIGHT_ORDER))
+    for i, light in enumerate(LIGHT_ORDER):
+        if light in statuses:
+            data[0] |= 1 << i
+            data[1 + i] = STATUS_CODES[statuses[light]]
+    return data
+
+def decode_packed_command(data):
+    """Unpack a packed command into {light: status} for the lights in the change mask
+
+    Returns None if the frame is invalid: wrong length, or a commanded
+    light whose byte is not a status code.
+    """
+    if len(data) != 1 + len(LIGHT_ORDER):
+        return None
+    mask = data[0]
+    statuses = {}
+    for i, light in enumerate(LIGHT_ORDER):
+        if mask & (1 << i):
+            if data[1 + i] not in STATUS_NAMES:
+                return None
+            statuses[light] = STATUS_NAMES[data[1 + i]]
+    return statuses
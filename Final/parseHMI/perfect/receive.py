@@ -3,28 +3,11 @@ import RPi.GPIO as GPIO
 import logging
 import os
 import time
-# Reverse mappings for interpretation
-LIGHT_NAMES = {
-    0x101: "Low Beam",
-    0x102: "High Beam",
-    0x103: "Parking Left",
-    0x104: "Parking Right",
-    0x105: "Hazard Lights",
-    0x106: "Right Turn",
-    0x107: "Left Turn"
-}
-
-STATUS_NAMES = {
-    0x01: "activated",
-    0x00: "desactivated",
-    0xFF: "FAILED"
-}
-
-STATUS_CODES = {
-    "activated": 0x01,
-    "desactivated": 0x00,
-    "FAILED": 0xFF
-}
+import queue
+import logging.handlers
+from response_aggregator import ResponseAggregator
+from light_protocol import (LIGHT_NAMES, STATUS_NAMES, STATUS_CODES, LIGHT_ORDER,
+                            RESPONSE_ID, PACKED_COMMAND_ID, decode_packed_command)
 
 # GPIO pins for LEDs
 LED_PINS = {
@@ -37,23 +20,27 @@ LED_PINS = {
     "Left Turn": 6
 }
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('light_slave.log'),
-        logging.StreamHandler()
-    ]
-)
+# At most one response frame per window (seconds), a FAILED light is answered at once
+RESPONSE_WINDOW = 0.05
+
+# Configure logging, the file and console writes are done by a background listener
+log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+file_handler = logging.FileHandler('light_slave.log')
+file_handler.setFormatter(log_formatter)
+console_handler = logging.StreamHandler()
+console_handler.setFormatter(log_formatter)
+log_queue = queue.Queue(-1)
+log_listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler)
+logging.basicConfig(level=logging.INFO, handlers=[logging.handlers.QueueHandler(log_queue)])
+log_listener.start()
 
 class CANLightSlave:
-    def __init__(self):
+    def __init__(self, response_window=RESPONSE_WINDOW):
         self.channel = 'can0'
         self.bustype = 'socketcan'
         self.bus = None
         self.running = True
-        self.RESPONSE_ID = 0x200
+        self.RESPONSE_ID = RESPONSE_ID
         # Track light statuses (default to desactivated)
         self.light_statuses = {
             "Low Beam": "desactivated",
@@ -64,6 +51,8 @@ class CANLightSlave:
             "Right Turn": "desactivated",
             "Left Turn": "desactivated"
         }
+        # Light frames received within a window share one response
+        self.responses = ResponseAggregator(response_window)
         
         self.init_can_bus()
         self.setup_gpio()
@@ -97,14 +86,21 @@ class CANLightSlave:
             self.light_statuses[light] = status
             logging.info(f"Controlled LED: {light} = {status}")
     
+    def control_leds(self, statuses):
+        """Set the LEDs of several lights with a single GPIO call."""
+        lights = [light for light in statuses if light in LED_PINS]
+        if not lights:
+            return
+        GPIO.output([LED_PINS[light] for light in lights],
+                    [GPIO.HIGH if statuses[light] == "activated" else GPIO.LOW for light in lights])
+        for light in lights:
+            self.light_statuses[light] = statuses[light]
+        logging.info(f"Controlled LEDs: {statuses}")
+    
     def create_response_frame(self):
         """Create CAN frame with status of all lights."""
-        light_order = [
-            "Low Beam", "High Beam", "Parking Left", "Parking Right",
-            "Hazard Lights", "Right Turn", "Left Turn"
-        ]
-        data = bytearray(7)
-        for i, light in enumerate(light_order):
+        data = bytearray(len(LIGHT_ORDER))
+        for i, light in enumerate(LIGHT_ORDER):
             data[i] = STATUS_CODES[self.light_statuses[light]]
         return data
     
@@ -118,14 +114,7 @@ class CANLightSlave:
                 is_extended_id=False
             )
             self.bus.send(msg)
-            signals = {light: STATUS_NAMES[data[i]] for i, light in enumerate([
-                "Low Beam", "High Beam", "Parking Left", "Parking Right",
-                "Hazard Lights", "Right Turn", "Left Turn"
-            ])}
-            print("\nSent Response Signals:")
-            for key, value in signals.items():
-                print(f"{key}: {value}")
-            logging.info(f"Sent response CAN: {data.hex()}")
+            logging.info(f"Sent response CAN: {data.hex()} {self.light_statuses}")
         except Exception as e:
             logging.error(f"CAN response send error: {e}")
     
@@ -133,17 +122,33 @@ class CANLightSlave:
         print("Listening for CAN messages and controlling LEDs...")
         try:
             while self.running:
-                msg = self.bus.recv(timeout=1.0)
-                if msg:
+                msg = self.bus.recv(timeout=self.responses.timeout(1.0))
+                if msg and msg.arbitration_id == PACKED_COMMAND_ID:
+                    # All the commanded lights in one frame, one GPIO pass
+                    statuses = decode_packed_command(msg.data)
+                    if statuses is None:
+                        logging.warning(f"Invalid packed frame: {msg.data.hex()}")
+                        continue
+                    logging.info(f"Received packed: {statuses}")
+                    if statuses:
+                        self.control_leds(statuses)
+                        self.responses.update(urgent="FAILED" in statuses.values())
+                elif msg:
                     light = LIGHT_NAMES.get(msg.arbitration_id, f"Unknown ID: {hex(msg.arbitration_id)}")
                     status = STATUS_NAMES.get(msg.data[0] if msg.data else 0xFF, "Unknown status")
-                    print(f"Received: {light} - {status}")
+                    logging.info(f"Received: {light} - {status}")
                     
-                    if light in LED_PINS:
+                    if status not in STATUS_CODES:
+                        logging.warning(f"Invalid status for {light}: {msg.data.hex()}")
+                    elif light in LED_PINS:
                         self.control_led(light, status)
-                        self.send_response()
+                        self.responses.update(urgent=status == "FAILED")
                     else:
-                        print(f"No LED control for: {light}")
+                        logging.warning(f"No LED control for: {light}")
+                
+                if self.responses.due():
+                    self.send_response()
+                    self.responses.mark_sent()
                 
         except KeyboardInterrupt:
             logging.info("Received keyboard interrupt")
@@ -153,11 +158,16 @@ class CANLightSlave:
     def shutdown(self):
         logging.info("Shutting down...")
         self.running = False
+        if self.responses.pending and self.bus:
+            self.send_response()
+            self.responses.mark_sent()
+        logging.info(f"Response frames: {self.responses.stats()}")
         if self.bus:
             self.bus.shutdown()
         os.system(f'sudo /sbin/ip link set {self.channel} down')
         GPIO.cleanup()
         logging.info("Shutdown complete")
+        log_listener.stop()
 
 if __name__ == "__main__":
     slave = CANLightSlave()
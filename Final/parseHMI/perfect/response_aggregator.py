@@ -0,0 +1,55 @@
+import time
+
+class ResponseAggregator:
+    """Decides when the slave sends its status frame
+
+    update() records that the light statuses changed, due() tells when
+    the status frame should go out: at most one per window seconds, the
+    changes in between are folded into it. A FAILED light (urgent=True)
+    makes it due at once.
+    """
+    def __init__(self, window):
+        self.window = window
+        self.pending = False
+        self.urgent = False
+        self.last_sent = None
+        # Statistics
+        self.updates = 0
+        self.responses = 0
+        self.urgent_responses = 0
+
+    def update(self, urgent=False):
+        self.pending = True
+        self.urgent = self.urgent or urgent
+        self.updates += 1
+
+    def due(self, now=None):
+        if not self.pending:
+            return False
+        if self.urgent or self.last_sent is None:
+            return True
+        now = time.monotonic() if now is None else now
+        return now - self.last_sent >= self.window
+
+    def timeout(self, default, now=None):
+        """Seconds to wait for the next frame before the pending response is due"""
+        if not self.pending or self.last_sent is None:
+            return default
+        now = time.monotonic() if now is None else now
+        return max(0.0, min(default, self.last_sent + self.window - now))
+
+    def mark_sent(self):
+        if self.urgent:
+            self.urgent_responses += 1
+        self.pending = False
+        self.urgent = False
+        self.last_sent = time.monotonic()
+        self.responses += 1
+
+    def stats(self):
+        return {
+            'updates': self.updates,
+            'responses': self.responses,
+            'urgent': self.urgent_responses,
+            'folded': self.updates - self.responses,
+        }
@@ -2,52 +2,40 @@ import can
 import time
 import os
 import threading
+import argparse
+import sys
+# Modules shared between the scripts live in Final/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from file_watcher import FileWatcher
+from light_coalescer import LightCoalescer
+from tail_reader import TailReader, parse_light_events, known_light_events
 from datetime import datetime
 
-# CAN IDs for each light type
-LIGHT_IDS = {
-    "Low Beam": 0x101,
-    "High Beam": 0x102,
-    "Parking Left": 0x103,
-    "Parking Right": 0x104,
-    "Hazard Lights": 0x105,
-    "Right Turn": 0x106,
-    "Left Turn": 0x107
-}
+from light_protocol import (LIGHT_IDS, STATUS_CODES, STATUS_NAMES, LIGHT_ORDER,
+                            RESPONSE_ID, PACKED_COMMAND_ID, encode_packed_command)
 
-# Status codes (1 byte)
-STATUS_CODES = {
-    "activated": 0x01,
-    "desactivated": 0x00,
-    "FAILED": 0xFF
-}
+# Offset of the last line read, a restart resumes after it
+CHECKPOINT_FILE = 'analysis_results.offset.json'
 
-# Reverse mappings for response parsing
-LIGHT_NAMES = {
-    0x101: "Low Beam",
-    0x102: "High Beam",
-    0x103: "Parking Left",
-    0x104: "Parking Right",
-    0x105: "Hazard Lights",
-    0x106: "Right Turn",
-    0x107: "Left Turn"
-}
-
-STATUS_NAMES = {
-    0x01: "activated",
-    0x00: "desactivated",
-    0xFF: "FAILED"
-}
+# Seconds after which an unchanged light status is sent again (None = never)
+REFRESH_INTERVAL = 5.0
 
 class CANLightMaster:
-    def __init__(self, filename):
+    def __init__(self, filename, refresh_interval=REFRESH_INTERVAL, packed=False,
+                 checkpoint_file=CHECKPOINT_FILE):
         self.filename = filename
+        # packed: all the lights to send go in one PACKED_COMMAND_ID frame
+        self.packed = packed
         self.channel = 'can0'
         self.bustype = 'socketcan'
         self.bus = None
-        self.last_size = os.path.getsize(filename)
+        # Without a checkpoint only the lines written from now on are sent
+        self.tail = TailReader(filename, checkpoint_file)
+        self.watcher = FileWatcher(filename)
         self.running = True
-        self.RESPONSE_ID = 0x200
+        self.RESPONSE_ID = RESPONSE_ID
+        # Repeated lines are coalesced, only status changes (and keep-alives) are sent
+        self.coalescer = LightCoalescer(refresh_interval)
         
         self.init_can_bus()
         self.start_response_monitor()
@@ -71,19 +59,51 @@ class CANLightMaster:
             )
             self.bus.send(msg)
             print(f"Sent: {light} - {status} (ID: {hex(LIGHT_IDS[light])}, Data: {hex(STATUS_CODES[status])})")
+            return True
         except Exception as e:
             print(f"Error sending CAN message: {e}")
+            return False
+    
+    def send_packed_message(self, statuses):
+        """Send the status of several lights in one frame"""
+        try:
+            msg = can.Message(
+                arbitration_id=PACKED_COMMAND_ID,
+                data=encode_packed_command(statuses),
+                is_extended_id=False
+            )
+            self.bus.send(msg)
+            print(f"Sent packed: {statuses} (ID: {hex(PACKED_COMMAND_ID)}, Data: {msg.data.hex()})")
+            return True
+        except Exception as e:
+            print(f"Error sending CAN message: {e}")
+            return False
+    
+    def send_changes(self):
+        """Send the lights whose status changed, then the keep-alives that are due"""
+        changes = self.coalescer.changes()
+        refreshes = [(light, status) for light, status in self.coalescer.refresh_due()
+                     if light not in dict(changes)]
+        if self.packed:
+            if (changes or refreshes) and self.send_packed_message(dict(changes + refreshes)):
+                for light, status in changes:
+                    self.coalescer.mark_sent(light, status)
+                for light, status in refreshes:
+                    self.coalescer.mark_sent(light, status, refresh=True)
+            return
+        for light, status in changes:
+            if self.send_can_message(light, status):
+                self.coalescer.mark_sent(light, status)
+        for light, status in refreshes:
+            if self.send_can_message(light, status):
+                self.coalescer.mark_sent(light, status, refresh=True)
     
     def parse_response_frame(self, data):
         """Parse response CAN data into signals"""
         if len(data) != 7:
             return None
         signals = {}
-        light_order = [
-            "Low Beam", "High Beam", "Parking Left", "Parking Right",
-            "Hazard Lights", "Right Turn", "Left Turn"
-        ]
-        for i, light in enumerate(light_order):
+        for i, light in enumerate(LIGHT_ORDER):
             signals[light] = STATUS_NAMES.get(data[i], "Unknown status")
         return signals
     
@@ -140,49 +160,49 @@ class CANLightMaster:
         self.response_thread = threading.Thread(target=self.monitor_responses, daemon=True)
         self.response_thread.start()
     
+    def light_events(self):
+        """Light events of the lines appended to the file since the last call"""
+        # An unterminated last line is only taken once the writer closed the file
+        lines = self.tail.read_lines(writer_closed=self.watcher.writer_closed)
+        events = parse_light_events(lines, on_malformed=lambda line: print(f"Malformed line: {line}"))
+        return known_light_events(events, LIGHT_IDS, STATUS_CODES,
+                                  on_unknown=lambda event: print(f"Ignoring unknown light/status: {event}"))
+    
     def monitor_file(self):
         print(f"Monitoring {self.filename} for new light status updates...")
         print("Add new lines to the file to send CAN messages")
         
         try:
             while self.running:
-                current_size = os.path.getsize(self.filename)
+                for event in self.light_events():
+                    self.coalescer.request(event.light, event.status)
                 
-                if current_size > self.last_size:
-                    with open(self.filename, 'r') as f:
-                        f.seek(self.last_size)
-                        new_content = f.read()
-                        self.last_size = current_size
-                        
-                        lines = new_content.split('\n')
-                        for line in lines:
-                            if line.strip() and line.startswith("Light:") and "Result:" in line:
-                                try:
-                                    parts = line.split('|')
-                                    light = parts[0].split(':')[1].strip()
-                                    status = parts[1].split(':')[1].strip()
-                                    
-                                    if light in LIGHT_IDS and status in STATUS_CODES:
-                                        self.send_can_message(light, status)
-                                    else:
-                                        print(f"Ignoring unknown light/status: {line}")
-                                except IndexError:
-                                    print(f"Malformed line: {line}")
+                self.send_changes()
+                self.tail.checkpoint()
                 
-                time.sleep(0.1)
+                # Returns as soon as new lines are written (1s timeout to check running and keep-alives)
+                self.watcher.wait(timeout=1.0)
                 
         except KeyboardInterrupt:
             self.shutdown()
     
     def shutdown(self):
         self.running = False
+        print(f"Light frames: {self.coalescer.stats()}")
         if self.response_thread.is_alive():
             self.response_thread.join(timeout=0.5)
         if self.bus:
             self.bus.shutdown()
+        self.watcher.close()
+        self.tail.close()
+        print(f"Tail reader: {self.tail.stats()}")
         os.system(f'sudo /sbin/ip link set {self.channel} down')
         print("Shutdown complete")
 
 if __name__ == "__main__":
-    master = CANLightMaster("analysis_results.txt")
+    parser = argparse.ArgumentParser(description="Send the light statuses of analysis_results.txt over CAN")
+    parser.add_argument('--packed', action='store_true',
+                        help=f"send all the lights in one frame on {hex(PACKED_COMMAND_ID)}")
+    args = parser.parse_args()
+    master = CANLightMaster("analysis_results.txt", packed=args.packed)
     master.monitor_file()
\ No newline at end of file
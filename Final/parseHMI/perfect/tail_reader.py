@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+import collections
+import json
+import os
+import re
+
+CHUNK_SIZE = 65536
+
+# "Light: Low Beam | Result: activated"
+LIGHT_LINE = re.compile(r'Light:\s*(?P<light>[^|]*?)\s*\|\s*Result:\s*(?P<status>\S+)\s*$')
+
+LightEvent = collections.namedtuple('LightEvent', ['light', 'status'])
+
+class TailReader:
+    """Follow a growing text file line by line
+
+    read_lines() yields the lines appended since the last call. A line
+    still being written is kept until its '\\n' arrives, a last line
+    without one is only taken once the writer is known to be done with
+    it (read_lines(writer_closed=True), or the file was rotated). The
+    byte offset of the last complete line is saved to checkpoint_path
+    by checkpoint(), so a restart resumes there. When the file is
+    truncated it is read again from the start, when it is replaced
+    (rotation) the rest of the old file is read first, then the new one
+    from the start.
+    """
+    def __init__(self, path, checkpoint_path=None, start_at_end=True):
+        self.path = path
+        self.checkpoint_path = checkpoint_path
+        self.file = None
+        self.inode = None
+        self.offset = 0
+        self.partial = b''
+        self.saved = None
+        # Statistics
+        self.lines = 0
+        self.truncations = 0
+        self.rotations = 0
+
+        saved = self._load_checkpoint()
+        if saved is not None:
+            self._open(saved['offset'], saved['inode'])
+        else:
+            self._open(None if start_at_end else 0)
+
+    def _load_checkpoint(self):
+        if self.checkpoint_path is None or not os.path.exists(self.checkpoint_path):
+            return None
+        try:
+            with open(self.checkpoint_path) as f:
+                saved = json.load(f)
+            return {'inode': int(saved['inode']), 'offset': int(saved['offset'])}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Ignoring unreadable checkpoint {self.checkpoint_path}: {e}")
+            return None
+
+    def _open(self, offset, inode=None):
+        """Open the file at offset (None = its end), False if it does not exist yet"""
+        try:
+            self.file = open(self.path, 'rb')
+        except FileNotFoundError:
+            self.file = None
+            return False
+        st = os.fstat(self.file.fileno())
+        if inode is not None and (st.st_ino != inode or st.st_size < offset):
+            # The checkpoint is for a file that was rotated or truncated since
+            offset = 0
+        self.inode = st.st_ino
+        self.offset = st.st_size if offset is None else offset
+        self.file.seek(self.offset)
+        self.partial = b''
+        return True
+
+    def _drain(self):
+        """Yield the complete lines between the read position and the end of the file"""
+        while True:
+            chunk = self.file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            lines = (self.partial + chunk).split(b'\n')
+            self.partial = lines.pop()
+            for line in lines:
+                self.offset += len(line) + 1
+                self.lines += 1
+                yield line.rstrip(b'\r').decode('utf-8', errors='replace')
+
+    def _flush_partial(self):
+        line, self.partial = self.partial, b''
+        self.offset += len(line)
+        self.lines += 1
+        return line.rstrip(b'\r').decode('utf-8', errors='replace')
+
+    def read_lines(self, writer_closed=False):
+        """Generator of the new complete lines
+
+        writer_closed: the writer has closed the file (FileWatcher.writer_closed),
+        so a last line without '\\n' is complete too
+        """
+        if self.file is None and not self._open(0):
+            return
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            st = None
+        if st is not None and st.st_ino != self.inode:
+            # Rotated: finish the old file, then read the new one from the start
+            yield from self._drain()
+            if self.partial:
+                yield self._flush_partial()
+            self.file.close()
+            self.rotations += 1
+            if not self._open(0):
+                return
+        elif st is not None and st.st_size < self.offset + len(self.partial):
+            # Truncated: what was buffered is gone, start over
+            self.truncations += 1
+            self.file.seek(0)
+            self.offset = 0
+            self.partial = b''
+        yield from self._drain()
+        if self.partial and writer_closed:
+            yield self._flush_partial()
+
+    def checkpoint(self):
+        """Save the offset of the last complete line read (atomic replace)"""
+        if self.checkpoint_path is None or self.inode is None:
+            return
+        state = {'inode': self.inode, 'offset': self.offset}
+        if state == self.saved:
+            return
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.checkpoint_path)
+        self.saved = state
+
+    def stats(self):
+        return {
+            'lines': self.lines,
+            'offset': self.offset,
+            'buffered': len(self.partial),
+            'truncations': self.truncations,
+            'rotations': self.rotations,
+        }
+
+    def close(self):
+        self.checkpoint()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+def parse_light_events(lines, on_malformed=None):
+    """Turn "Light: X | Result: Y" lines into LightEvent, other lines are skipped"""
+    for line in lines:
+        match = LIGHT_LINE.match(line)
+        if match:
+            yield LightEvent(match.group('light'), match.group('status'))
+        elif line.startswith("Light:") and on_malformed is not None:
+            on_malformed(line)
+
+def known_light_events(events, lights, statuses, on_unknown=None):
+    """Only let through the events for a known light and status"""
+    for event in events:
+        if event.light in lights and event.status in statuses:
+            yield event
+        elif on_unknown is not None:
+            on_unknown(event)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Behaviour checks for LightCoalescer, no CAN bus needed.
+
+Run from the parseHMI/perfect directory:
+    python3 -m unittest discover tests
+"""
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from light_coalescer import LightCoalescer
+
+class ChangesTest(unittest.TestCase):
+    def setUp(self):
+        self.coalescer = LightCoalescer()
+
+    def send_changes(self):
+        changes = self.coalescer.changes()
+        for light, status in changes:
+            self.coalescer.mark_sent(light, status)
+        return changes
+
+    def test_only_transitions_are_sent(self):
+        self.coalescer.request("Low Beam", "activated")
+        self.assertEqual(self.send_changes(), [("Low Beam", "activated")])
+        for _ in range(3):
+            self.coalescer.request("Low Beam", "activated")
+        self.assertEqual(self.send_changes(), [])
+        self.assertEqual(self.coalescer.stats()['suppressed'], 3)
+
+    def test_latest_request_wins(self):
+        self.coalescer.request("High Beam", "activated")
+        self.coalescer.request("High Beam", "desactivated")
+        self.coalescer.request("High Beam", "FAILED")
+        self.assertEqual(self.send_changes(), [("High Beam", "FAILED")])
+        self.assertEqual(self.coalescer.stats()['transitions'], 1)
+
+    def test_back_to_sent_status_gives_nothing(self):
+        self.coalescer.request("Left Turn", "activated")
+        self.send_changes()
+        self.coalescer.request("Left Turn", "desactivated")
+        self.coalescer.request("Left Turn", "activated")
+        self.assertEqual(self.send_changes(), [])
+
+    def test_failed_send_is_returned_again(self):
+        self.coalescer.request("Right Turn", "activated")
+        self.assertEqual(self.coalescer.changes(), [("Right Turn", "activated")])
+        # Not marked sent: the next call still has it
+        self.assertEqual(self.coalescer.changes(), [("Right Turn", "activated")])
+
+class RefreshTest(unittest.TestCase):
+    def test_disabled_by_default(self):
+        coalescer = LightCoalescer()
+        coalescer.mark_sent("Low Beam", "activated")
+        self.assertEqual(coalescer.refresh_due(now=time.monotonic() + 3600), [])
+
+    def test_refresh_after_interval(self):
+        coalescer = LightCoalescer(refresh_interval=1.0)
+        coalescer.mark_sent("Low Beam", "activated")
+        now = time.monotonic()
+        self.assertEqual(coalescer.refresh_due(now=now), [])
+        self.assertEqual(coalescer.refresh_due(now=now + 1.0), [("Low Beam", "activated")])
+        coalescer.mark_sent("Low Beam", "activated", refresh=True)
+        self.assertEqual(coalescer.refresh_due(now=now + 1.0), [])
+        self.assertEqual(coalescer.stats()['refreshes'], 1)
+        self.assertEqual(coalescer.stats()['transitions'], 1)
+
+if __name__ == "__main__":
+    unittest.main()
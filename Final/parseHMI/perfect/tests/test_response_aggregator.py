@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Behaviour checks for ResponseAggregator, no CAN bus needed.
+
+Run from the parseHMI/perfect directory:
+    python3 -m unittest discover tests
+"""
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from response_aggregator import ResponseAggregator
+
+WINDOW = 0.05
+
+class ResponseAggregatorTest(unittest.TestCase):
+    def setUp(self):
+        self.responses = ResponseAggregator(WINDOW)
+
+    def send(self):
+        self.assertTrue(self.responses.due())
+        self.responses.mark_sent()
+        return time.monotonic()
+
+    def test_nothing_due_without_update(self):
+        self.assertFalse(self.responses.due())
+        self.assertEqual(self.responses.timeout(1.0), 1.0)
+
+    def test_first_update_is_due_at_once(self):
+        self.responses.update()
+        self.send()
+        self.assertFalse(self.responses.due())
+
+    def test_updates_within_window_are_folded(self):
+        self.responses.update()
+        sent_at = self.send()
+        for _ in range(3):
+            self.responses.update()
+        self.assertFalse(self.responses.due(now=sent_at))
+        self.assertTrue(self.responses.due(now=sent_at + WINDOW))
+        self.responses.mark_sent()
+        stats = self.responses.stats()
+        self.assertEqual((stats['updates'], stats['responses'], stats['folded']), (4, 2, 2))
+
+    def test_urgent_update_skips_the_window(self):
+        self.responses.update()
+        sent_at = self.send()
+        self.responses.update(urgent=True)
+        self.assertTrue(self.responses.due(now=sent_at))
+        self.responses.mark_sent()
+        self.assertEqual(self.responses.stats()['urgent'], 1)
+        # The urgent flag does not outlive its response
+        self.responses.update()
+        self.assertFalse(self.responses.due(now=time.monotonic()))
+
+    def test_timeout_ends_with_the_window(self):
+        self.responses.update()
+        sent_at = self.send()
+        self.responses.update()
+        self.assertAlmostEqual(self.responses.timeout(1.0, now=sent_at), WINDOW, places=3)
+        self.assertEqual(self.responses.timeout(1.0, now=sent_at + 2 * WINDOW), 0.0)
+        self.assertEqual(self.responses.timeout(0.01, now=sent_at), 0.01)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Behaviour checks for TailReader and the light line parsing, on temporary files.
+
+Run from the parseHMI/perfect directory:
+    python3 -m unittest discover tests
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tail_reader import TailReader, LightEvent, parse_light_events, known_light_events
+
+class TailReaderTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'analysis_results.txt')
+        self.checkpoint_path = os.path.join(self.directory, 'offset.json')
+        self.append("old line\n")
+
+    def append(self, text):
+        with open(self.path, 'a') as f:
+            f.write(text)
+
+    def reader(self, **kwargs):
+        tail = TailReader(self.path, self.checkpoint_path, **kwargs)
+        self.addCleanup(tail.close)
+        return tail
+
+    def test_starts_at_end(self):
+        tail = self.reader()
+        self.assertEqual(list(tail.read_lines()), [])
+        self.append("a\nb\n")
+        self.assertEqual(list(tail.read_lines()), ["a", "b"])
+
+    def test_start_at_beginning(self):
+        tail = self.reader(start_at_end=False)
+        self.assertEqual(list(tail.read_lines()), ["old line"])
+
+    def test_unterminated_line_waits_for_newline(self):
+        tail = self.reader()
+        self.append("Light: High Beam | Res")
+        self.assertEqual(list(tail.read_lines()), [])
+        self.assertEqual(list(tail.read_lines()), [])
+        self.append("ult: activated\n")
+        self.assertEqual(list(tail.read_lines()), ["Light: High Beam | Result: activated"])
+
+    def test_unterminated_line_taken_once_writer_closed(self):
+        tail = self.reader()
+        self.append("Light: Low Beam | Result: activated")
+        self.assertEqual(list(tail.read_lines(writer_closed=True)), ["Light: Low Beam | Result: activated"])
+        self.assertEqual(tail.stats()['buffered'], 0)
+
+    def test_checkpoint_resumes_after_last_complete_line(self):
+        tail = self.reader()
+        self.append("a\nhalf")
+        self.assertEqual(list(tail.read_lines()), ["a"])
+        tail.close()
+        self.append(" line\nb\n")
+        self.assertEqual(list(self.reader().read_lines()), ["half line", "b"])
+
+    def test_truncated_file_is_read_from_start(self):
+        tail = self.reader()
+        self.append("a\nb\n")
+        list(tail.read_lines())
+        with open(self.path, 'w') as f:
+            f.write("c\n")
+        self.assertEqual(list(tail.read_lines()), ["c"])
+        self.assertEqual(tail.stats()['truncations'], 1)
+
+    def test_rotated_file_rest_of_old_then_new(self):
+        tail = self.reader()
+        self.append("a\n")
+        list(tail.read_lines())
+        self.append("b\nlast")
+        os.rename(self.path, self.path + '.1')
+        self.append("c\n")
+        self.assertEqual(list(tail.read_lines()), ["b", "last", "c"])
+        self.assertEqual(tail.stats()['rotations'], 1)
+
+    def test_unreadable_checkpoint_is_ignored(self):
+        with open(self.checkpoint_path, 'w') as f:
+            f.write("not json")
+        tail = self.reader()
+        self.append("a\n")
+        self.assertEqual(list(tail.read_lines()), ["a"])
+
+class LightEventsTest(unittest.TestCase):
+    def test_parse_light_events(self):
+        malformed = []
+        lines = ["Light: Low Beam | Result: activated", "something else",
+                 "Light:  Hazard Lights |Result: FAILED  ", "Light: Low Beam"]
+        events = list(parse_light_events(lines, on_malformed=malformed.append))
+        self.assertEqual(events, [LightEvent("Low Beam", "activated"), LightEvent("Hazard Lights", "FAILED")])
+        self.assertEqual(malformed, ["Light: Low Beam"])
+
+    def test_known_light_events(self):
+        unknown = []
+        events = [LightEvent("Low Beam", "activated"), LightEvent("Fog", "activated"),
+                  LightEvent("Low Beam", "blinking")]
+        known = list(known_light_events(events, {"Low Beam"}, {"activated"}, on_unknown=unknown.append))
+        self.assertEqual(known, [LightEvent("Low Beam", "activated")])
+        self.assertEqual(len(unknown), 2)
+
+if __name__ == "__main__":
+    unittest.main()
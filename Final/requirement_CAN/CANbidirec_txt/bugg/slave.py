@@ -1,11 +1,15 @@
 #!/usr/bin/env python3
 import can
 import os
+import sys
 import RPi.GPIO as GPIO
 import time
 import threading
 import logging
 import re
+# Modules shared between the scripts live in Final/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'common'))
+from can_layouts import WIPER_COMMAND, WIPER_STATUS
 
 # GPIO setup
 FRONT_LEDS = [23, 24, 26]  # Right to left
@@ -116,17 +120,7 @@ class CANWiperSlave:
     def create_status_frame(self):
         """Create CAN frame from current status values"""
         with self.operation_lock:
-            data = bytearray([
-                self.status_signals['WiperStatus'],
-                self.status_signals['wiperCurrentSpeed'],
-                self.status_signals['wiperCurrentPosition'],
-                self.status_signals['consumedPower'],
-                self.status_signals['currentWiperMode'],
-                self.status_signals['isWiperBlocked'],
-                self.status_signals['blockageReason'],
-                self.status_signals['hwError']
-            ])
-        return data
+            return WIPER_STATUS.encode(self.status_signals)
 
     def send_status_with_retry(self, max_retries=3, retry_delay=0.1):
         """Send status with retry logic"""
@@ -296,19 +290,8 @@ class CANWiperSlave:
             logging.info(f"Started continuous front wiper (speed={'fast' if self.wiper_speed == 2 else 'normal'})")
 
     def parse_can_frame(self, data):
-        """Convert CAN data back to signals"""
-        signals = {}
-        if data[0] > 0:
-            signals['wiperMode'] = data[0]
-        if data[1] > 0:
-            signals['wiperSpeed'] = data[1]
-        if data[2] > 0:
-            signals['wiperCycleCount'] = data[2]
-        if data[3] > 0:
-            signals['WiperIntermittent'] = data[3]
-        if data[4] > 0 or data[5] > 0:
-            signals['wipingCycle'] = data[4] | (data[5] << 8)
-        return signals
+        """Convert CAN data back to signals (signals that are 0 are left out)"""
+        return WIPER_COMMAND.decode(data, skip_zero=True)
 
     def monitor_can(self):
         """Monitor CAN bus for messages"""
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark input.txt request -> CAN frame latency of CANWiperMaster.
+
+Runs CANWiperMaster.monitor() in a scratch directory on a python-can
+virtual bus (no can0 or sudo needed), writes wiper requests to input.txt
+and measures how long it takes until the 0x100 frame is on the bus:
+
+  poll     the old loop, checking the mtime every 0.3 s
+  inotify  FileWatcher with inotify
+  stat     FileWatcher's polling fallback (0.1 s)
+
+Run from this directory:
+    python3 bench_input_latency.py
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import can
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Modules shared between the scripts live in Final/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'common'))
+from file_watcher import FileWatcher
+from main import CANWiperMaster
+from req import AsyncFileSink, WiperSystem
+
+REQUESTS = 20
+OLD_POLL_INTERVAL = 0.3
+REQUEST = """ignition = 'ON'
+wiperRequestOperation = {operation}
+rainIntensity = 3
+ReverseGear = 0
+"""
+
+
+class SleepWatcher:
+    """Stands in for FileWatcher to get the old sleep-and-stat loop"""
+    def wait(self, timeout=None):
+        time.sleep(OLD_POLL_INTERVAL)
+        return False
+
+    def close(self):
+        pass
+
+
+def make_master(bus, watcher):
+    # Skip __init__, it brings up can0 with sudo
+    master = CANWiperMaster.__new__(CANWiperMaster)
+    master.bus = bus
+    master.dispatcher = None
+    master.wiper = WiperSystem("input.txt", output_sink=AsyncFileSink("wiper_output.txt"))
+    master.CAN_MSG_ID = 0x100
+    master.last_modified = 0
+    master.running = True
+    master.watcher = watcher
+    return master
+
+
+def measure(name, watcher):
+    tx_bus = can.Bus(interface='virtual', channel=name)
+    rx_bus = can.Bus(interface='virtual', channel=name)
+    master = make_master(tx_bus, watcher)
+    latencies = []
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        thread = threading.Thread(target=master.monitor, daemon=True)
+        thread.start()
+        # The first pass processes the current input.txt, drain that frame
+        rx_bus.recv(timeout=2.0)
+        for i in range(REQUESTS):
+            time.sleep(0.05)
+            written_at = time.perf_counter()
+            with open("input.txt", 'w') as f:
+                f.write(REQUEST.format(operation=2 + i % 2))
+            msg = rx_bus.recv(timeout=2.0)
+            if msg is not None:
+                latencies.append(time.perf_counter() - written_at)
+        master.running = False
+        thread.join(timeout=2.0)
+    watcher.close()
+    master.wiper.close()
+    tx_bus.shutdown()
+    rx_bus.shutdown()
+    return sorted(latencies)
+
+
+def report(name, latencies):
+    if not latencies:
+        print(f"{name:8s} no frames received")
+        return
+    p50 = latencies[len(latencies) // 2] * 1e3
+    p90 = latencies[int(len(latencies) * 0.9)] * 1e3
+    print(f"{name:8s} {len(latencies):3d}/{REQUESTS} frames  "
+          f"p50 {p50:7.2f} ms  p90 {p90:7.2f} ms  max {latencies[-1] * 1e3:7.2f} ms")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        with open("input.txt", 'w') as f:
+            f.write(REQUEST.format(operation=2))
+        report("poll", measure("poll", SleepWatcher()))
+        report("inotify", measure("inotify", FileWatcher("input.txt")))
+        report("stat", measure("stat", FileWatcher("input.txt", use_inotify=False)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+import can
+import logging
+import threading
+
+STANDARD_ID_MASK = 0x7FF
+EXTENDED_ID_MASK = 0x1FFFFFFF
+
+class CANDispatcher:
+    """Route received CAN messages to handlers by arbitration ID
+    
+    One can.Notifier thread reads the bus for every subscriber, and the
+    subscribed IDs are installed as SocketCAN filters so the kernel drops
+    all other traffic before it reaches Python.
+    """
+    def __init__(self, bus, timeout=1.0):
+        self.bus = bus
+        self.timeout = timeout
+        self.notifier = None
+        self._handlers = {}  # (arbitration_id, is_extended_id) -> [handler, ...]
+        self._lock = threading.Lock()
+        
+        # Statistics
+        self.dispatched = 0
+        self.unrouted = 0
+        self.handler_errors = 0
+    
+    def subscribe(self, arbitration_id, handler, extended=False):
+        """Call handler(msg) for every message with this arbitration ID"""
+        with self._lock:
+            self._handlers.setdefault((arbitration_id, extended), []).append(handler)
+            self._apply_filters()
+    
+    def unsubscribe(self, arbitration_id, handler, extended=False):
+        """Remove a handler added with subscribe"""
+        with self._lock:
+            handlers = self._handlers.get((arbitration_id, extended), [])
+            if handler in handlers:
+                handlers.remove(handler)
+            if not handlers:
+                self._handlers.pop((arbitration_id, extended), None)
+            self._apply_filters()
+    
+    def _apply_filters(self):
+        """Install one kernel filter per subscribed ID"""
+        filters = [
+            {'can_id': can_id,
+             'can_mask': EXTENDED_ID_MASK if extended else STANDARD_ID_MASK,
+             'extended': extended}
+            for can_id, extended in self._handlers
+        ]
+        # No subscriptions: set_filters(None) would let everything through,
+        # but nothing is routed anyway so keep the last filters instead
+        if filters:
+            self.bus.set_filters(filters)
+    
+    def _on_message(self, msg):
+        handlers = self._handlers.get((msg.arbitration_id, msg.is_extended_id))
+        if not handlers:
+            # Only happens on interfaces without hardware/kernel filtering
+            self.unrouted += 1
+            return
+        self.dispatched += 1
+        for handler in list(handlers):
+            try:
+                handler(msg)
+            except Exception as e:
+                # An exception would stop the notifier thread for every subscriber
+                self.handler_errors += 1
+                logging.error(f"CAN handler error for ID 0x{msg.arbitration_id:X}: {e}")
+    
+    def start(self):
+        """Start the notifier thread"""
+        if self.notifier is None:
+            self.notifier = can.Notifier(self.bus, [self._on_message], timeout=self.timeout)
+    
+    def stop(self):
+        """Stop the notifier thread, the bus itself stays open"""
+        if self.notifier is not None:
+            self.notifier.stop(self.timeout)
+            self.notifier = None
+    
+    def stats(self):
+        """Return routing statistics as a dict"""
+        return {
+            'dispatched': self.dispatched,
+            'unrouted': self.unrouted,
+            'handler_errors': self.handler_errors,
+        }
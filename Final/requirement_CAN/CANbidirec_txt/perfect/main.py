@@ -2,9 +2,13 @@
 import time
 import can
 import os
-import re
-import threading
-from req import WiperSystem
+import sys
+from req import AsyncFileSink, WiperSystem
+from can_dispatcher import CANDispatcher
+# Modules shared between the scripts live in Final/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'common'))
+from file_watcher import FileWatcher
+from can_layouts import WIPER_COMMAND, WIPER_RESPONSE
 from datetime import datetime
 
 class CANWiperMaster:
@@ -12,10 +16,12 @@ class CANWiperMaster:
         self.channel = 'can0'
         self.bustype = 'socketcan'
         self.bus = None
-        self.wiper = WiperSystem("input.txt", "wiper_output.txt")
+        self.dispatcher = None
+        self.wiper = WiperSystem("input.txt", output_sink=AsyncFileSink("wiper_output.txt"))
         self.CAN_MSG_ID = 0x100
         self.RESPONSE_MSG_ID = 0x101
         self.last_modified = 0
+        self.watcher = FileWatcher("input.txt")
         self.running = True
         
         self.init_can_bus()
@@ -31,45 +37,24 @@ class CANWiperMaster:
             print(f"CAN init failed: {e}")
             raise
     
-    def extract_signals(self, content):
-        """Extract only the signals that appear in the output"""
-        signals = {}
-        matches = re.finditer(r'(\w+)\s*=\s*(\d+)', content)
-        for match in matches:
-            signals[match.group(1)] = int(match.group(2))
-        return signals
-    
     def create_can_frame(self, signals):
         """Create CAN frame from exact output signals"""
-        data = bytearray(8)
-        if 'wiperMode' in signals:
-            data[0] = signals['wiperMode']
-        if 'wiperSpeed' in signals:
-            data[1] = signals['wiperSpeed']
-        if 'wiperCycleCount' in signals:
-            data[2] = signals['wiperCycleCount']
-        if 'WiperIntermittent' in signals:
-            data[3] = signals['WiperIntermittent']
-        if 'wipingCycle' in signals:
-            data[4] = signals['wipingCycle'] & 0xFF
-            data[5] = (signals['wipingCycle'] >> 8) & 0xFF
-        return data
+        return WIPER_COMMAND.encode(signals)
     
     def send_signals(self):
-        """Process input and send exact output signals"""
+        """Process input and send the output signals"""
         try:
-            self.wiper.process_operation()
-            with open("wiper_output.txt", 'r') as f:
-                content = f.read()
-                print("\nGenerated Output:")
-                print(content.strip())
-                
-                signals = self.extract_signals(content)
-                print("\nSignals to transmit:", signals)
-                
-                can_data = self.create_can_frame(signals)
-                self.send_can(can_data)
-                
+            # Process through requirements, the output signals come back directly
+            signals = self.wiper.process_operation()
+            if signals is None:
+                print("No signals to transmit")
+                return
+            print("\nSignals to transmit:", signals)
+            
+            # Create and send CAN frame
+            can_data = self.create_can_frame(signals)
+            self.send_can(can_data)
+            
         except Exception as e:
             print(f"Error: {e}")
     
@@ -87,16 +72,7 @@ class CANWiperMaster:
     
     def parse_response_frame(self, data):
         """Parse response CAN data into signals"""
-        signals = {}
-        signals['WiperStatus'] = data[0]  # 1=ready, 0=fault
-        signals['wiperCurrentSpeed'] = data[1]  # 0=stopped, 1=slow, 2=fast
-        signals['wiperCurrentPosition'] = data[2]  # 0-100%
-        signals['currentWiperMode'] = data[3]  # Matches wiperMode
-        signals['consumedPower'] = data[4]  # Watts (0-255)
-        signals['isWiperBlocked'] = data[5]  # 0=no, 1=yes
-        signals['blockageReason'] = data[6]  # 0=none, 1=obstacle, 2=motor_fault
-        signals['hwError'] = data[7]  # 0=no error
-        return signals
+        return WIPER_RESPONSE.decode(data)
     
     def write_response_to_file(self, signals):
         """Write response signals to response_signals.txt with timestamp"""
@@ -111,25 +87,20 @@ class CANWiperMaster:
         except Exception as e:
             print(f"Error writing to response_signals.txt: {e}")
     
-    def monitor_responses(self):
-        """Monitor CAN bus for response messages from slave"""
-        print("Listening for response CAN messages...")
-        try:
-            while self.running:
-                msg = self.bus.recv(timeout=1.0)
-                if msg and msg.arbitration_id == self.RESPONSE_MSG_ID:
-                    signals = self.parse_response_frame(msg.data)
-                    print("\nReceived Response Signals:")
-                    for key, value in signals.items():
-                        print(f"{key}: {value}")
-                    self.write_response_to_file(signals)
-        except Exception as e:
-            print(f"Response monitoring error: {e}")
+    def handle_response(self, msg):
+        """Handle a response message from the slave (called by the dispatcher)"""
+        signals = self.parse_response_frame(msg.data)
+        print("\nReceived Response Signals:")
+        for key, value in signals.items():
+            print(f"{key}: {value}")
+        self.write_response_to_file(signals)
     
     def start_response_monitor(self):
-        """Start a thread to monitor response messages"""
-        self.response_thread = threading.Thread(target=self.monitor_responses, daemon=True)
-        self.response_thread.start()
+        """Route response messages from the slave to handle_response"""
+        self.dispatcher = CANDispatcher(self.bus)
+        self.dispatcher.subscribe(self.RESPONSE_MSG_ID, self.handle_response)
+        self.dispatcher.start()
+        print("Listening for response CAN messages...")
     
     def file_changed(self):
         try:
@@ -148,14 +119,17 @@ class CANWiperMaster:
                 if self.file_changed():
                     print("\n=== Input Changed ===")
                     self.send_signals()
-                time.sleep(0.3)
+                # Returns as soon as input.txt is written (1s timeout to check running)
+                self.watcher.wait(timeout=1.0)
         except KeyboardInterrupt:
             self.shutdown()
     
     def shutdown(self):
         self.running = False
-        if self.response_thread.is_alive():
-            self.response_thread.join(timeout=0.5)
+        if self.dispatcher:
+            self.dispatcher.stop()
+        self.watcher.close()
+        self.wiper.close()
         if self.bus:
             self.bus.shutdown()
         os.system(f'sudo /sbin/ip link set {self.channel} down')
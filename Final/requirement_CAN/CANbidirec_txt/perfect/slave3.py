@@ -6,6 +6,13 @@ import time
 import threading
 import logging
 import re
+import sys
+from can_dispatcher import CANDispatcher
+# Modules shared between the scripts live in Final/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'common'))
+from file_watcher import FileWatcher
+from can_layouts import WIPER_COMMAND, WIPER_RESPONSE
+from led_animator import LEDAnimator, sweep_timeline
 
 # GPIO setup
 FRONT_LEDS = [23, 24, 26]  # Right to left
@@ -38,9 +45,8 @@ class CANWiperSlave:
             GPIO.setup(pin, GPIO.OUT)
             GPIO.output(pin, GPIO.LOW)
             
-        # Thread control
-        self.stop_event = threading.Event()
-        self.active_threads = []
+        # One scheduler thread drives both wipers, a new command preempts the running one
+        self.animator = LEDAnimator(GPIO)
         self.operation_lock = threading.Lock()
         self.running = True
         self.back_wiper_active = False
@@ -55,9 +61,11 @@ class CANWiperSlave:
         # Initialize response signals
         self.response_signals = self.read_response_file()
         
-        # Start CAN monitoring thread
-        self.can_thread = threading.Thread(target=self.monitor_can, daemon=True)
-        self.can_thread.start()
+        # Route wiper commands (0x100) to handle_command, the kernel drops other IDs
+        self.dispatcher = CANDispatcher(self.can_bus)
+        self.dispatcher.subscribe(0x100, self.handle_command)
+        self.dispatcher.start()
+        logging.info("Listening for CAN messages...")
         
         # Start response file monitoring thread
         self.start_response_monitor()
@@ -105,6 +113,7 @@ class CANWiperSlave:
     def monitor_response_file(self):
         """Monitor response.txt for changes and send updates"""
         logging.info("Monitoring response.txt...")
+        watcher = FileWatcher("response.txt")
         try:
             while self.running:
                 if self.response_file_changed():
@@ -114,83 +123,54 @@ class CANWiperSlave:
                     for key, value in self.response_signals.items():
                         print(f"{key}: {value}")
                     self.send_response()
-                time.sleep(0.3)  # Fast polling
+                watcher.wait(timeout=1.0)  # Wakes up as soon as response.txt is written
         except Exception as e:
             logging.error(f"Response file monitoring error: {e}")
+        finally:
+            watcher.close()
 
     def start_response_monitor(self):
         """Start a thread to monitor response.txt"""
         self.response_thread = threading.Thread(target=self.monitor_response_file, daemon=True)
         self.response_thread.start()
 
-    def _wiper_sweep(self, leds, speed, stop_event):
-        """Perform a complete wiper sweep with proper timing"""
+    def _wiper_timeline(self, leds, speed):
+        """Steps of a complete wiper sweep with proper timing"""
         delay = 0.3  # Base delay for normal speed
         if speed == 2:  # Fast speed
             delay = 0.15
-        
-        # Simulate position from 0 to 100
-        steps = len(leds) * 2  # Forward and backward
-        position_increment = 100 // steps
-        
-        # Forward sweep
-        for i, led in enumerate(leds):
-            if stop_event.is_set():
-                return False
-            GPIO.output(led, GPIO.HIGH)
+        return sweep_timeline(leds, delay/len(leds))
+
+    def _track_position(self, pin, level):
+        """Simulate position from 0 to 100 (called by the animator on every step)"""
+        position_increment = 100 // (len(FRONT_LEDS) * 2)  # Forward and backward
+        if level:
             self.wiper_position = min(100, self.wiper_position + position_increment)
-            time.sleep(delay/len(leds))
-        
-        # Backward sweep
-        for i, led in enumerate(reversed(leds)):
-            if stop_event.is_set():
-                return False
-            GPIO.output(led, GPIO.LOW)
+        else:
             self.wiper_position = max(0, self.wiper_position - position_increment)
-            time.sleep(delay/len(leds))
-        
-        return True
 
-    def _activate_wiper(self, leds, speed, cycles, is_intermittent=False):
-        """Wiper operation with immediate stop capability"""
-        count = 0
-        
-        try:
-            while cycles == 0 or count < cycles:
-                if self.stop_event.is_set():
-                    break
-                
-                if not self._wiper_sweep(leds, speed, self.stop_event):
-                    break
-                
-                if cycles > 0:
-                    count += 1
-                
-                if is_intermittent:
-                    if not (self.wiper_mode == 2 and 
-                           self.wiper_speed == 1 and 
-                           self.wiper_intermittent == 1):
-                        break
-                    time.sleep(1.7)
-        finally:
-            for led in leds:
-                GPIO.output(led, GPIO.LOW)
-            self.wiper_position = 0
-            self.send_response()
+    def _wipe_done(self):
+        """Called by the animator when a wiper finished its cycles"""
+        self.wiper_position = 0
+        self.send_response()
+
+    def _activate_wiper(self, channel, leds, speed, cycles, is_intermittent=False):
+        """Start a wiper on the animator (cycles=0 wipes until stopped)"""
+        timeline, duration = self._wiper_timeline(leds, speed)
+        # Intermittent wiping pauses 1.7 s after every sweep
+        gap = 1.7 if is_intermittent else 0.0
+        self.animator.start(channel, timeline, duration, cycles=cycles, gap=gap,
+                            on_step=self._track_position, on_done=self._wipe_done)
 
     def _stop_wipers(self):
         """Immediately stop all wiper activity"""
         with self.operation_lock:
-            self.stop_event.set()
-            
-            for t in self.active_threads:
-                t.join(timeout=0.1)
+            # Cancelling switches the LEDs of the running animations off
+            self.animator.cancel_all()
             
             for pin in FRONT_LEDS + BACK_LEDS:
                 GPIO.output(pin, GPIO.LOW)
             
-            self.stop_event.clear()
-            self.active_threads = []
             self.back_wiper_active = False
             self.wiper_position = 0
             logging.info("Wipers fully stopped")
@@ -198,19 +178,19 @@ class CANWiperSlave:
 
     def create_response_frame(self):
         """Create CAN frame for response signals"""
-        data = bytearray(8)
         # WiperStatus: 1 if no block or error, else 0
         wiper_status = 1 if (self.response_signals['isWiperBlocked'] == 0 and 
                             self.response_signals['hwError'] == 0) else 0
-        data[0] = wiper_status
-        data[1] = self.wiper_speed  # wiperCurrentSpeed
-        data[2] = self.wiper_position  # wiperCurrentPosition
-        data[3] = self.wiper_mode  # currentWiperMode
-        data[4] = self.response_signals['consumedPower']
-        data[5] = self.response_signals['isWiperBlocked']
-        data[6] = self.response_signals['blockageReason']
-        data[7] = self.response_signals['hwError']
-        return data
+        return WIPER_RESPONSE.encode({
+            'WiperStatus': wiper_status,
+            'wiperCurrentSpeed': self.wiper_speed,
+            'wiperCurrentPosition': self.wiper_position,
+            'currentWiperMode': self.wiper_mode,
+            'consumedPower': self.response_signals['consumedPower'],
+            'isWiperBlocked': self.response_signals['isWiperBlocked'],
+            'blockageReason': self.response_signals['blockageReason'],
+            'hwError': self.response_signals['hwError']
+        })
 
     def send_response(self):
         """Send response signals back to master"""
@@ -224,16 +204,7 @@ class CANWiperSlave:
             self.can_bus.send(msg)
             logging.info(f"Sent response CAN: {data.hex()}")
             # Display sent signals
-            signals = {
-                'WiperStatus': data[0],
-                'wiperCurrentSpeed': data[1],
-                'wiperCurrentPosition': data[2],
-                'currentWiperMode': data[3],
-                'consumedPower': data[4],
-                'isWiperBlocked': data[5],
-                'blockageReason': data[6],
-                'hwError': data[7]
-            }
+            signals = WIPER_RESPONSE.decode(data)
             print("\nSent Response Signals:")
             for key, value in signals.items():
                 print(f"{key}: {value}")
@@ -255,35 +226,17 @@ class CANWiperSlave:
             return
         
         if self.wiper_mode == 1:
-            thread = threading.Thread(
-                target=self._activate_wiper,
-                args=(FRONT_LEDS, self.wiper_speed, 1),
-                daemon=True
-            )
-            self.active_threads = [thread]
-            thread.start()
+            self._activate_wiper('front', FRONT_LEDS, self.wiper_speed, 1)
             logging.info("Started touch mode (single wipe)")
         
         elif self.wiper_mode in [2, 4]:
-            front_thread = threading.Thread(
-                target=self._activate_wiper,
-                args=(FRONT_LEDS, self.wiper_speed, 0),
-                daemon=True
-            )
-            self.active_threads = [front_thread]
-            front_thread.start()
+            self._activate_wiper('front', FRONT_LEDS, self.wiper_speed, 0)
             
             if (self.wiper_mode == 2 and 
                 self.wiper_speed == 1 and 
                 self.wiper_intermittent == 1):
                 self.back_wiper_active = True
-                back_thread = threading.Thread(
-                    target=self._activate_wiper,
-                    args=(BACK_LEDS, 1, 0, True),
-                    daemon=True
-                )
-                self.active_threads.append(back_thread)
-                back_thread.start()
+                self._activate_wiper('back', BACK_LEDS, 1, 0, True)
                 logging.info("Started intermittent rear wiper")
             else:
                 with self.operation_lock:
@@ -296,40 +249,22 @@ class CANWiperSlave:
         self.send_response()
 
     def parse_can_frame(self, data):
-        """Convert CAN data back to signals"""
-        signals = {}
-        if data[0] > 0:
-            signals['wiperMode'] = data[0]
-        if data[1] > 0:
-            signals['wiperSpeed'] = data[1]
-        if data[2] > 0:
-            signals['wiperCycleCount'] = data[2]
-        if data[3] > 0:
-            signals['WiperIntermittent'] = data[3]
-        if data[4] > 0 or data[5] > 0:
-            signals['wipingCycle'] = data[4] | (data[5] << 8)
-        return signals
+        """Convert CAN data back to signals (signals that are 0 are left out)"""
+        return WIPER_COMMAND.decode(data, skip_zero=True)
 
-    def monitor_can(self):
-        """Monitor CAN bus for messages"""
-        logging.info("Listening for CAN messages...")
-        try:
-            while self.running:
-                msg = self.can_bus.recv(timeout=1.0)
-                if msg and msg.arbitration_id == 0x100:
-                    signals = self.parse_can_frame(msg.data)
-                    self.process_can_signals(signals)
-        except Exception as e:
-            logging.error(f"CAN monitoring error: {e}")
+    def handle_command(self, msg):
+        """Handle a wiper command message (called by the dispatcher)"""
+        signals = self.parse_can_frame(msg.data)
+        self.process_can_signals(signals)
 
     def shutdown(self):
         """Clean up resources"""
         logging.info("Shutting down...")
         self.running = False
         self._stop_wipers()
+        self.animator.close()
         
-        if self.can_thread.is_alive():
-            self.can_thread.join(timeout=0.5)
+        self.dispatcher.stop()
         if self.response_thread.is_alive():
             self.response_thread.join(timeout=0.5)
         
@@ -2,9 +2,12 @@
 import time
 import can
 import os
-import re
+import sys
 import json
-from req import WiperSystem
+from req import AsyncFileSink, WiperSystem
+# Modules shared between the scripts live in Final/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from can_layouts import WIPER_COMMAND
 
 class CANWiperMaster:
     def __init__(self):
@@ -13,7 +16,7 @@ class CANWiperMaster:
         self.bus = None
         # Create a temporary input.txt that req.py can read
         self.convert_json_to_txt("input.json", "input.txt")
-        self.wiper = WiperSystem("input.txt", "wiper_output.txt")
+        self.wiper = WiperSystem("input.txt", output_sink=AsyncFileSink("wiper_output.txt"))
         self.CAN_MSG_ID = 0x100
         self.last_modified = 0
         
@@ -65,57 +68,27 @@ class CANWiperMaster:
             print(f"CAN init failed: {e}")
             raise
     
-    def extract_signals(self, content):
-        """Extract only the signals that appear in the output"""
-        signals = {}
-        # Find all key=value pairs
-        matches = re.finditer(r'(\w+)\s*=\s*(\d+)', content)
-        for match in matches:
-            signals[match.group(1)] = int(match.group(2))
-        return signals
-    
     def create_can_frame(self, signals):
         """Create CAN frame from exact output signals"""
-        data = bytearray(8)  # Initialize with zeros
-        
-        # Map output signals to CAN frame bytes
-        if 'wiperMode' in signals:
-            data[0] = signals['wiperMode']
-        if 'wiperSpeed' in signals:
-            data[1] = signals['wiperSpeed']
-        if 'wiperCycleCount' in signals:
-            data[2] = signals['wiperCycleCount']
-        if 'WiperIntermittent' in signals:
-            data[3] = signals['WiperIntermittent']
-        if 'wipingCycle' in signals:
-            data[4] = signals['wipingCycle'] & 0xFF
-            data[5] = (signals['wipingCycle'] >> 8) & 0xFF
-        
-        return data
+        return WIPER_COMMAND.encode(signals)
     
     def send_signals(self):
-        """Process input and send exact output signals"""
+        """Process input and send the output signals"""
         try:
             # First update the input.txt from the JSON
             self.convert_json_to_txt("input.json", "input.txt")
             
-            # Process through requirements
-            self.wiper.process_operation()
+            # Process through requirements, the output signals come back directly
+            signals = self.wiper.process_operation()
+            if signals is None:
+                print("No signals to transmit")
+                return
+            print("\nSignals to transmit:", signals)
+            
+            # Create and send CAN frame
+            can_data = self.create_can_frame(signals)
+            self.send_can(can_data)
             
-            # Read the generated output
-            with open("wiper_output.txt", 'r') as f:
-                content = f.read()
-                print("\nGenerated Output:")
-                print(content.strip())
-                
-                # Extract exact signals
-                signals = self.extract_signals(content)
-                print("\nSignals to transmit:", signals)
-                
-                # Create and send CAN frame
-                can_data = self.create_can_frame(signals)
-                self.send_can(can_data)
-                
         except Exception as e:
             print(f"Error: {e}")
     
@@ -153,6 +126,7 @@ class CANWiperMaster:
             self.shutdown()
     
     def shutdown(self):
+        self.wiper.close()
         if self.bus:
             self.bus.shutdown()
         os.system(f'sudo /sbin/ip link set {self.channel} down')
@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 import can
 import os
+import sys
 import RPi.GPIO as GPIO
 import time
 import threading
 import logging
+# Modules shared between the scripts live in Final/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from can_layouts import WIPER_COMMAND
 
 # GPIO setup
 FRONT_LEDS = [23, 24, 26]  # Right to left
@@ -179,19 +183,8 @@ class CANWiperSlave:
             logging.info(f"Started continuous front wiper (speed={'fast' if self.wiper_speed == 2 else 'normal'})")
 
     def parse_can_frame(self, data):
-        """Convert CAN data back to signals"""
-        signals = {}
-        if data[0] > 0:  # wiperMode
-            signals['wiperMode'] = data[0]
-        if data[1] > 0:  # wiperSpeed
-            signals['wiperSpeed'] = data[1]
-        if data[2] > 0:  # wiperCycleCount
-            signals['wiperCycleCount'] = data[2]
-        if data[3] > 0:  # WiperIntermittent
-            signals['WiperIntermittent'] = data[3]
-        if data[4] > 0 or data[5] > 0:  # wipingCycle
-            signals['wipingCycle'] = data[4] | (data[5] << 8)
-        return signals
+        """Convert CAN data back to signals (signals that are 0 are left out)"""
+        return WIPER_COMMAND.decode(data, skip_zero=True)
 
     def monitor_can(self):
         """Monitor CAN bus for messages"""
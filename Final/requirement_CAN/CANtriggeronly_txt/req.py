@@ -1,196 +1,195 @@
 ##############################################################
+import re
+import threading
 import time
 import os
 
+# Rain intensity from which automatic mode switches to speed 2
+RAIN_SPEED2_THRESHOLD = 20
+
+# name = value, one per line (values may be quoted)
+SIGNAL_PATTERN = re.compile(r"^\s*(\w+)\s*=\s*(.*?)\s*$", re.MULTILINE)
+
+class WiperInput:
+    """Typed record of the signals in input.txt"""
+    def __init__(self, ignition_on=False, request=0, rain_intensity=0, reverse_gear=0):
+        self.ignition_on = ignition_on
+        self.request = request
+        self.rain_intensity = rain_intensity
+        self.reverse_gear = reverse_gear
+
+    @classmethod
+    def parse(cls, content):
+        """Parse the input file content in one pass"""
+        values = {}
+        for name, value in SIGNAL_PATTERN.findall(content):
+            values.setdefault(name, value)
+
+        rain_intensity = 0
+        if 'rainIntensity' in values:
+            try:
+                rain_intensity = int(''.join(filter(str.isdigit, values['rainIntensity'])))
+            except ValueError as e:
+                print(f"Warning: Could not parse rain intensity, using default (0). Error: {e}")
+
+        request = values.get('wiperRequestOperation', '')
+        return cls(
+            ignition_on=values.get('ignition', '').strip('\'"') == 'ON',
+            request=int(request) if request.isdigit() else 0,
+            rain_intensity=rain_intensity,
+            reverse_gear=1 if values.get('ReverseGear') == '1' else 0
+        )
+#____________________________________modes_______________________________
+# Each mode returns (text for wiper_output.txt, output signals)
+
+def touch_mode(record):
+    print(f"Touch Mode: ON")
+    return """Touch Mode On:{ 
+    wiperMode=1,
+    wiperCycleCount=1,
+    wiperSpeed=1,;}""", {'wiperMode': 1, 'wiperCycleCount': 1, 'wiperSpeed': 1}
+
+def speed1_mode(record):
+    print(f"Speed 1 Mode: ON")
+    return """Speed 1 Mode On:{ 
+    wiperMode=2,
+    wiperSpeed=1;}""", {'wiperMode': 2, 'wiperSpeed': 1}
+
+def speed2_mode(record):
+    print(f"Speed 2 Mode: ON")
+    return """Speed 2 Mode On:{ 
+    wiperMode=2,
+    wiperSpeed=2;}""", {'wiperMode': 2, 'wiperSpeed': 2}
+
+def automatic_mode(record):
+    rain_intensity = record.rain_intensity
+    if rain_intensity < RAIN_SPEED2_THRESHOLD:
+        wiper_speed = 1
+        print(f"Light rain detected ({rain_intensity}) - using speed 1")
+    else:
+        wiper_speed = 2
+        print(f"Heavy rain detected ({rain_intensity}) - using speed 2")
+    print(f"Automatic Mode: ON (Rain: {rain_intensity}, Speed: {wiper_speed})")
+    return f"""Automatic Mode On:{{
+        wiperMode=4,
+        wiperSpeed={wiper_speed};}}""", {'wiperMode': 4, 'wiperSpeed': wiper_speed}
+
+def intermittent_mode(record):
+    print("Intermittent Mode: ON (Reverse Gear Active)")
+    return """Intermittent Mode On (Reverse Gear):{
+        wiperMode=2,
+        wiperSpeed=1,
+        WiperIntermittent=1
+        wipingCycle=1700;}""", {'wiperMode': 2, 'wiperSpeed': 1, 'WiperIntermittent': 1, 'wipingCycle': 1700}
+#____________________________________decision table_______________________________
+# (wiperRequestOperation, ReverseGear or None for both) -> mode, highest priority first
+DECISION_RULES = [
+    (4, 1, intermittent_mode),
+    (1, None, touch_mode),
+    (2, None, speed1_mode),
+    (3, None, speed2_mode),
+    (4, None, automatic_mode),
+]
+
+def compile_decision_table(rules):
+    """Expand the rules into a dict so a decision is a single lookup"""
+    table = {}
+    for request, reverse_gear, mode in rules:
+        for gear in ((0, 1) if reverse_gear is None else (reverse_gear,)):
+            table.setdefault((request, gear), mode)
+    return table
+
+DECISION_TABLE = compile_decision_table(DECISION_RULES)
+
+class AsyncFileSink:
+    """Write output texts to a file from a background thread.
+
+    If texts come in faster than they are written only the latest one is
+    kept, so the file always ends up with the last decision.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._pending = None
+        self._writing = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, text):
+        """Queue text to replace the file content, returns immediately."""
+        with self._condition:
+            self._pending = text
+            self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """Wait until the queued text is on disk, False on timeout."""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._pending is None and not self._writing, timeout)
+
+    def close(self, timeout=1.0):
+        """Write what is still queued and stop the thread."""
+        self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending is not None or self._closed)
+                if self._pending is None:
+                    return
+                text, self._pending = self._pending, None
+                self._writing = True
+            try:
+                with open(self.path, 'w') as output_file:
+                    output_file.write(text)
+            except Exception as e:
+                print(f"Error writing file: {e}")
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
 class WiperSystem:
-    def __init__(self, input_file_path="input.txt", output_file_path="wiper_output.txt"):
+    def __init__(self, input_file_path="input.txt", output_file_path="wiper_output.txt", output_sink=None):
+        """output_sink (e.g. AsyncFileSink) replaces the blocking write to
+        output_file_path, pass output_file_path=None for no text output."""
         self.input_file_path = input_file_path
         self.output_file_path = output_file_path
+        self.output_sink = output_sink
         self.last_modified_time = 0
 
-    def check_wiper_status(self):
-        """Check if ignition is ON (returns 1) or OFF (returns 0)."""
+    def close(self):
+        """Flush and stop the output sink, if any."""
+        if self.output_sink is not None:
+            self.output_sink.close()
+
+    def read_input(self):
+        """Read and parse the input file, None if it cannot be read."""
         try:
             with open(self.input_file_path, 'r') as file:
-                content = file.read()
-                
-                if 'ignition = \'ON\'' in content or 'ignition = "ON"' in content:
-                    print("Wiper function enabled - ignition ON")
-                    status = 1
-                else:
-                    print("Wiper function disabled - ignition OFF")
-                    status = 0
-                output_data = f"""Wiper_Function_Enabled = {status}"""
-                with open(self.output_file_path, 'w') as output_file:
-                    output_file.write(output_data)
-                    
-                return status
-
-                    
+                return WiperInput.parse(file.read())
         except FileNotFoundError:
             print(f"Error: File '{self.input_file_path}' not found.")
-            return 0
         except Exception as e:
             print(f"Error reading file: {e}")
-            return 0
-#____________________________________touch mode_______________________________
-    def check_touch_mode(self):
-        """Process wiper operation if ignition is ON and request is valid."""
-        if self.check_wiper_status() != 1:
-            print("System not operational - ignition is OFF")
-            return False
-        
-        try:
-            with open(self.input_file_path, 'r') as file:
-                content = file.read()
-                
-                if 'wiperRequestOperation = 1' in content:
-                    output_data = """Touch Mode On:{ 
-    wiperMode=1,
-    wiperCycleCount=1,
-    wiperSpeed=1,;}"""
-                    
-                    with open(self.output_file_path, 'w') as output_file:
-                        output_file.write(output_data)
-                    
-                    print(f"Touch Mode: ON")
-                    return True
-                return False
-                    
-        except Exception as e:
-            print(f"Error processing wiper operation: {e}")
-            return False
-#______________________________________speed1 mode_______________________________
-    def check_speed1_mode(self):
-        """Process wiper operation if ignition is ON and request is valid."""
-        if self.check_wiper_status() != 1:  # Changed from 2 to 1 to be consistent
-            print("System not operational - ignition is OFF")
-            return False
-        
-        try:
-            with open(self.input_file_path, 'r') as file:
-                content = file.read()
-                
-                if 'wiperRequestOperation = 2' in content:
-                    output_data = """Speed 1 Mode On:{ 
-    wiperMode=2,
-    wiperSpeed=1;}"""
-                    
-                    with open(self.output_file_path, 'w') as output_file:
-                        output_file.write(output_data)
-                    
-                    print(f"Speed 1 Mode: ON")
-                    return True
-                return False
-                    
-        except Exception as e:
-            print(f"Error processing wiper operation: {e}")
-            return False
-#__________________________________Speed2 MODE_____________________________________________
-    def check_speed2_mode(self):
-        """Process wiper operation if ignition is ON and request is valid."""
-        if self.check_wiper_status() != 1:  # Changed from 2 to 1 to be consistent
-            print("System not operational - ignition is OFF")
-            return False
-        
-        try:
-            with open(self.input_file_path, 'r') as file:
-                content = file.read()
-                
-                if 'wiperRequestOperation = 3' in content:
-                    output_data = """Speed 2 Mode On:{ 
-    wiperMode=2,
-    wiperSpeed=2;}"""
-                    
-                    with open(self.output_file_path, 'w') as output_file:
-                        output_file.write(output_data)
-                    
-                    print(f"Speed 2 Mode: ON")
-                    return True
-                return False
-                    
-        except Exception as e:
-            print(f"Error processing wiper operation: {e}")
-            return False
+        return None
 
-#_________________________________Automatic mode____________________________________________
-         
-    def check_automatic_mode(self):
-        """Process wiper operation if ignition is ON and request is valid."""
-        if self.check_wiper_status() != 1:
+    def evaluate(self, record):
+        """Return (output text, output signals) for a WiperInput, None if no valid request."""
+        mode = DECISION_TABLE.get((record.request, record.reverse_gear))
+        if mode is None:
+            print("No valid wiper operation requested")
+            return None
+        if not record.ignition_on:
+            print("Wiper function disabled - ignition OFF")
             print("System not operational - ignition is OFF")
-            return False
-        
-        try:
-            with open(self.input_file_path, 'r') as file:
-                content = file.read()
-                
-                if 'wiperRequestOperation = 4' in content:
-                    # Initialize rain_intensity with a default value
-                    rain_intensity = 0
-                    
-                    # Try to extract rain intensity value
-                    try:
-                        # Find the rain intensity line (handles multiple formats)
-                        rain_line = [line for line in content.split('\n') 
-                                   if 'rainIntensity' in line][0]
-                        # Extract the numeric value
-                        rain_intensity = int(''.join(filter(str.isdigit, rain_line)))
-                    except (ValueError, IndexError, AttributeError) as e:
-                        print(f"Warning: Could not parse rain intensity, using default (0). Error: {e}")
-                    
-                    # Determine wiper speed based on rain intensity
-                    if rain_intensity < 20:
-                        wiper_speed = 1
-                        print(f"Light rain detected ({rain_intensity}) - using speed 1")
-                    else:
-                        wiper_speed = 2
-                        print(f"Heavy rain detected ({rain_intensity}) - using speed 2")
-                    
-                    output_data = f"""Automatic Mode On:{{
-        wiperMode=4,
-        wiperSpeed={wiper_speed};}}"""
-                    
-                    with open(self.output_file_path, 'w') as output_file:
-                        output_file.write(output_data)
-                    
-                    print(f"Automatic Mode: ON (Rain: {rain_intensity}, Speed: {wiper_speed})")
-                    return True
-                return False
-                    
-        except Exception as e:
-            print(f"Error processing wiper operation: {e}")
-            return False
-#________________________Intermittent mode______________________________________
-    def check_intermittent_mode(self):
-        """Process intermittent wiper operation when in reverse gear."""
-        if self.check_wiper_status() != 1:
-            print("System not operational - ignition is OFF")
-            return False
-        
-        try:
-            with open(self.input_file_path, 'r') as file:
-                content = file.read()
-                
-                # Check for both conditions
-                if 'wiperRequestOperation = 4' in content and 'ReverseGear = 1' in content:
-                    output_data = """Intermittent Mode On (Reverse Gear):{
-        wiperMode=2,
-        wiperSpeed=1,
-        WiperIntermittent=1
-        wipingCycle=1700;}"""
-                    
-                    with open(self.output_file_path, 'w') as output_file:
-                        output_file.write(output_data)
-                    
-                    print("Intermittent Mode: ON (Reverse Gear Active)")
-                    return True
-                return False
-                    
-        except Exception as e:
-            print(f"Error processing intermittent wiper operation: {e}")
-            return False
-            
+            return "Wiper_Function_Enabled = 0", {'Wiper_Function_Enabled': 0}
+        print("Wiper function enabled - ignition ON")
+        return mode(record)
 #_____________________________________________________________________
     def file_has_changed(self):
         """Check if the input file has been modified since last check."""
@@ -204,26 +203,26 @@ class WiperSystem:
             return False
 #______________________________________________________________________
     def process_operation(self):
-        """Determine which operation to execute based on input file content."""
-        try:
-            with open(self.input_file_path, 'r') as file:
-                content = file.read()
-                
-                if 'wiperRequestOperation = 4' in content and 'ReverseGear = 1' in content:
-                    self.check_intermittent_mode()
-                elif 'wiperRequestOperation = 1' in content:
-                    self.check_touch_mode()                    
-                elif 'wiperRequestOperation = 2' in content:
-                    self.check_speed1_mode()
-                elif 'wiperRequestOperation = 3' in content:
-                    self.check_speed2_mode()
-                elif 'wiperRequestOperation = 4' in content:
-                    self.check_automatic_mode()                                        
-                else:
-                    print("No valid wiper operation requested")
-                    
-        except Exception as e:
-            print(f"Error reading file: {e}")
+        """Read the input file once, decide the wiper operation and output its text.
+
+        Returns the output signals, or None if no valid operation was requested.
+        """
+        record = self.read_input()
+        if record is None:
+            return None
+        result = self.evaluate(record)
+        if result is None:
+            return None
+        output_data, signals = result
+        if self.output_sink is not None:
+            self.output_sink.write(output_data)
+        elif self.output_file_path:
+            try:
+                with open(self.output_file_path, 'w') as output_file:
+                    output_file.write(output_data)
+            except Exception as e:
+                print(f"Error writing file: {e}")
+        return signals
 #_________________________________________________________________
     def monitor_input_file(self):
         """Continuously monitor the input file for changes."""
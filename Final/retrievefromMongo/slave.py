@@ -1,4 +1,8 @@
 #!/usr/bin/env python3
+import os
+import sys
+# lin_protocol is the library in Final/web/LinLib_py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'web', 'LinLib_py'))
 from lin_protocol import LINSlave
 import RPi.GPIO as GPIO
 import time
@@ -9,6 +13,10 @@ import threading
 FRONT_LEDS = [23, 24, 26]  # Right to left
 BACK_LEDS = [16, 20, 21]   # Right to left
 
+# LIN frames
+COMMAND_FRAME_ID = 0x20
+STATUS_FRAME_ID = 0x21  # Published by this slave: type, speed, cycles
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -22,12 +30,14 @@ logging.basicConfig(
 class WiperSlave:
     def __init__(self):
         self.lin_slave = LINSlave()
+        self.lin_slave.register_response(STATUS_FRAME_ID, bytes([0, 0, 0]))
         GPIO.setmode(GPIO.BCM)
         for pin in FRONT_LEDS + BACK_LEDS:
             GPIO.setup(pin, GPIO.OUT)
             GPIO.output(pin, GPIO.LOW)
         self.stop_event = threading.Event()
         self.active_threads = []
+        self.wipers_running = 0  # Wipers of the current command still doing their cycles
         self.operation_lock = threading.Lock()
             
     def _wiper_sweep(self, leds, speed, stop_event):
@@ -72,6 +82,20 @@ class WiperSlave:
             # Ensure all LEDs are off when done
             for led in leds:
                 GPIO.output(led, GPIO.LOW)
+        
+        if cycles > 0 and count >= cycles:
+            self._wipe_done()
+    
+    def _wipe_done(self):
+        """A wiper finished its cycles: report idle once every wiper of the command has"""
+        with self.operation_lock:
+            # Threads of a command that was replaced meanwhile don't count
+            if threading.current_thread() not in self.active_threads:
+                return
+            self.wipers_running -= 1
+            if self.wipers_running == 0:
+                self.lin_slave.update_response(STATUS_FRAME_ID, bytes([0, 0, 0]))
+                logging.info("Wiper cycles completed")
     
     def _stop_wipers(self):
         """Immediately stop all wiper activity"""
@@ -88,6 +112,7 @@ class WiperSlave:
             
             self.stop_event.clear()
             self.active_threads = []
+            self.lin_slave.update_response(STATUS_FRAME_ID, bytes([0, 0, 0]))
             logging.info("Wipers fully stopped")
     
     def activate_wipers(self, wiper_type, speed, cycles):
@@ -97,33 +122,38 @@ class WiperSlave:
         
         if wiper_type == 0:  # Explicit stop command
             return
+        
+        with self.operation_lock:
+            self.lin_slave.update_response(STATUS_FRAME_ID, bytes([wiper_type, speed, cycles]))
             
-        # Prepare new operation
-        if wiper_type == 3:  # Both wipers
-            front_thread = threading.Thread(
-                target=self._activate_single_wiper,
-                args=(FRONT_LEDS, speed, cycles),
-                daemon=True
-            )
-            back_thread = threading.Thread(
-                target=self._activate_single_wiper,
-                args=(BACK_LEDS, speed, cycles),
-                daemon=True
-            )
-            self.active_threads = [front_thread, back_thread]
-            front_thread.start()
-            back_thread.start()
-            logging.info(f"Started both wipers (speed={'fast' if speed == 2 else 'normal'}, cycles={'infinite' if cycles == 0 else cycles})")
-        else:  # Single wiper
-            leds = FRONT_LEDS if wiper_type == 1 else BACK_LEDS
-            single_thread = threading.Thread(
-                target=self._activate_single_wiper,
-                args=(leds, speed, cycles),
-                daemon=True
-            )
-            self.active_threads = [single_thread]
-            single_thread.start()
-            logging.info(f"Started {'front' if wiper_type == 1 else 'back'} wiper (speed={'fast' if speed == 2 else 'normal'}, cycles={'infinite' if cycles == 0 else cycles})")
+            # Prepare new operation
+            if wiper_type == 3:  # Both wipers
+                front_thread = threading.Thread(
+                    target=self._activate_single_wiper,
+                    args=(FRONT_LEDS, speed, cycles),
+                    daemon=True
+                )
+                back_thread = threading.Thread(
+                    target=self._activate_single_wiper,
+                    args=(BACK_LEDS, speed, cycles),
+                    daemon=True
+                )
+                self.active_threads = [front_thread, back_thread]
+                self.wipers_running = 2
+                front_thread.start()
+                back_thread.start()
+                logging.info(f"Started both wipers (speed={'fast' if speed == 2 else 'normal'}, cycles={'infinite' if cycles == 0 else cycles})")
+            else:  # Single wiper
+                leds = FRONT_LEDS if wiper_type == 1 else BACK_LEDS
+                single_thread = threading.Thread(
+                    target=self._activate_single_wiper,
+                    args=(leds, speed, cycles),
+                    daemon=True
+                )
+                self.active_threads = [single_thread]
+                self.wipers_running = 1
+                single_thread.start()
+                logging.info(f"Started {'front' if wiper_type == 1 else 'back'} wiper (speed={'fast' if speed == 2 else 'normal'}, cycles={'infinite' if cycles == 0 else cycles})")
     
     def run(self):
         try:
@@ -133,7 +163,7 @@ class WiperSlave:
                     frame = self.lin_slave.receive_frame(expected_data_length=3)
                     if frame:
                         frame_id, data = frame
-                        if frame_id == 0x20 and len(data) == 3:
+                        if frame_id == COMMAND_FRAME_ID and len(data) == 3:
                             logging.info(f"Received command: type={data[0]}, speed={data[1]}, cycles={data[2]}")
                             if data == bytes([0, 0, 0]):
                                 logging.info("Processing STOP command")
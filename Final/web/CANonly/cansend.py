@@ -1,7 +1,12 @@
 #!/usr/bin/env python3
 import can
 import time
+import sys
+import os
 from pymongo import MongoClient
+# Modules shared between the scripts live in Final/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from sensor_writer import SensorWriter
 import logging
 import board
 import adafruit_dht
@@ -31,6 +36,8 @@ class WiperController:
         self.db = self.mongo_client.LIN_wiper77  # You might want to rename this to CAN_wiper77
         self.commands_collection = self.db.commands
         self.sensor_collection = self.db.sensors
+        # Sensor documents are inserted in batches by a background thread
+        self.sensor_writer = SensorWriter(self.sensor_collection)
         
         # Sensor setup
         self.dht = adafruit_dht.DHT11(board.D17)
@@ -87,7 +94,7 @@ class WiperController:
                         'humidity': humidity,
                         'timestamp': datetime.utcnow()
                     }
-                    self.sensor_collection.insert_one(sensor_data)
+                    self.sensor_writer.write(sensor_data)
                     logging.info(f"Sensor data: Temp={temp}C, Humidity={humidity}%")
                     
                     previous_mode = self.is_automatic_mode
@@ -156,6 +163,8 @@ class WiperController:
             logging.info("Cleaning up resources")
             self._send_stop_command()
             self.bus.shutdown()
+            self.sensor_writer.close()
+            logging.info(f"Sensor writer stats: {self.sensor_writer.stats()}")
             self.mongo_client.close()
             try:
                 self.dht.exit()
@@ -0,0 +1,93 @@
+from .constants import *
+
+INVALID_PID = 0xFF
+
+def _pid_with_parity(frame_id):
+    p0 = (frame_id ^ (frame_id >> 1) ^ (frame_id >> 2) ^ (frame_id >> 4)) & 0x01
+    p1 = ~((frame_id >> 1) ^ (frame_id >> 3) ^ (frame_id >> 4) ^ (frame_id >> 5)) & 0x01
+    return (frame_id & 0x3F) | (p0 << 6) | (p1 << 7)
+
+# frame_id -> PID with parity bits (64 entries)
+PID_TABLE = bytes(_pid_with_parity(frame_id) for frame_id in range(64))
+
+# PID byte -> frame_id, INVALID_PID if the parity bits are wrong (256 entries)
+PID_TO_ID = bytes(pid & 0x3F if PID_TABLE[pid & 0x3F] == pid else INVALID_PID
+                  for pid in range(256))
+
+def calculate_pid(frame_id):
+    """
+    Calculate Protected Identifier with parity bits
+    
+    Args:
+        frame_id: 6-bit LIN frame ID (0-63)
+    
+    Returns:
+        byte: PID with parity bits
+    """
+    if frame_id > 0x3F:
+        raise ValueError("Frame ID must be 6 bits (0-63)")
+    return PID_TABLE[frame_id]
+
+def parse_pid(pid_byte):
+    """
+    Extract frame ID and verify parity
+    
+    Args:
+        pid_byte: Received PID byte
+    
+    Returns:
+        int: Frame ID if parity is valid, None otherwise
+    """
+    frame_id = PID_TO_ID[pid_byte]
+    return None if frame_id == INVALID_PID else frame_id
+
+# The checksums sum all bytes first and add the carries back afterwards,
+# which gives the same result as adding the carry after every byte. Two
+# folds are enough for any frame (sums below 0x10000).
+
+def classic_checksum(data):
+    """
+    Calculate LIN 1.x classic checksum (data bytes only)
+    
+    Args:
+        data: Data bytes (bytes, bytearray, memoryview or list of ints)
+    
+    Returns:
+        byte: Calculated checksum
+    """
+    total = sum(data)
+    total = (total & 0xFF) + (total >> 8)
+    return 0xFF - ((total & 0xFF) + (total >> 8))
+
+def enhanced_checksum(pid, data):
+    """
+    Calculate LIN 2.x enhanced checksum (PID and data bytes)
+    
+    Args:
+        pid: Protected Identifier byte
+        data: Data bytes (bytes, bytearray, memoryview or list of ints)
+    
+    Returns:
+        byte: Calculated checksum
+    """
+    total = pid + sum(data)
+    total = (total & 0xFF) + (total >> 8)
+    return 0xFF - ((total & 0xFF) + (total >> 8))
+
+def frame_checksum(pid, data, model=CHECKSUM_ENHANCED):
+    """
+    Calculate the checksum of a frame for the given checksum model
+    
+    Diagnostic frames (0x3C/0x3D) always use the classic checksum.
+    
+    Args:
+        pid: Protected Identifier byte
+        data: Data bytes
+        model: CHECKSUM_CLASSIC or CHECKSUM_ENHANCED
+    
+    Returns:
+        byte: Calculated checksum
+    """
+    if model == CHECKSUM_CLASSIC or (pid & 0x3F) in (MASTER_REQUEST_FRAME_ID, SLAVE_RESPONSE_FRAME_ID):
+        return classic_checksum(data)
+    return enhanced_checksum(pid, data)
\ No newline at end of file
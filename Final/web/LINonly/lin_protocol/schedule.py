@@ -0,0 +1,219 @@
+import threading
+import time
+from collections import deque
+from .constants import *
+
+class ScheduleSlot:
+    def __init__(self, frame_id, delay, data=None, sporadic=False,
+                 response_length=None, on_response=None):
+        """
+        One slot of a LIN schedule table
+        
+        Args:
+            frame_id: 6-bit LIN frame ID (0-63)
+            delay: Slot time in seconds until the next slot starts
+            data: Frame data, or a callable returning it (None skips the slot)
+            sporadic: Only transmit when new data was posted for frame_id
+                (every posted data is sent once, in order)
+            response_length: If set, only the header is sent and a slave
+                response with this many data bytes is read back
+            on_response: Called as on_response(frame_id, data) for every
+                response received in this slot
+        """
+        if frame_id > 0x3F:
+            raise ValueError("Frame ID must be 6 bits (0-63)")
+        if delay <= 0:
+            raise ValueError("Slot delay must be positive")
+        self.frame_id = frame_id
+        self.delay = delay
+        self.data = data
+        self.sporadic = sporadic
+        self.response_length = response_length
+        self.on_response = on_response
+        
+        # Statistics
+        self.sent = 0
+        self.skipped = 0
+        self.errors = 0
+        self.overruns = 0
+        self.no_response = 0
+        self.max_jitter = 0.0
+        self.total_jitter = 0.0
+    
+    def record_jitter(self, jitter):
+        """Record how late (in seconds) the slot started"""
+        self.max_jitter = max(self.max_jitter, jitter)
+        self.total_jitter += jitter
+    
+    def stats(self):
+        """Return the slot statistics as a dict"""
+        runs = self.sent + self.skipped + self.errors + self.no_response
+        return {
+            'frame_id': self.frame_id,
+            'sent': self.sent,
+            'skipped': self.skipped,
+            'errors': self.errors,
+            'overruns': self.overruns,
+            'no_response': self.no_response,
+            'max_jitter': self.max_jitter,
+            'mean_jitter': self.total_jitter / runs if runs else 0.0
+        }
+
+class LINScheduler:
+    def __init__(self, master, tables, initial_table='normal'):
+        """
+        Run LIN schedule tables on a LINMaster from a background thread
+        
+        Slots are started on a fixed timeline (each slot starts delay
+        seconds after the previous one was due), so the latency of a posted
+        frame is bounded by the schedule instead of by polling loops.
+        
+        Args:
+            master: LINMaster used to send the frames
+            tables: Dict of table name -> list of ScheduleSlot
+            initial_table: Name of the table to start with
+        """
+        if initial_table not in tables:
+            raise ValueError(f"Unknown schedule table: {initial_table}")
+        self.master = master
+        self.tables = tables
+        self.current_table = initial_table
+        self.last_error = None
+        
+        self._requested_table = None
+        self._frame_data = {}
+        # frame_id -> posted data not sent yet, oldest first
+        self._queued = {}
+        self._sending = 0
+        self._lock = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread = None
+    
+    def post(self, frame_id, data):
+        """
+        Queue data for frame_id, each posted data is sent once by the next
+        slot of frame_id (in posting order), unconditional slots then keep
+        repeating the last one
+        
+        Args:
+            frame_id: 6-bit LIN frame ID (0-63)
+            data: Data bytes to send (max 8 bytes)
+        """
+        if len(data) > MAX_FRAME_DATA_LENGTH:
+            raise ValueError(f"Data length exceeds maximum of {MAX_FRAME_DATA_LENGTH} bytes")
+        with self._lock:
+            self._frame_data[frame_id] = bytes(data)
+            self._queued.setdefault(frame_id, deque()).append(bytes(data))
+    
+    def flush(self, timeout=None):
+        """
+        Wait until all posted data has been sent (or failed, see stats)
+        
+        Returns:
+            bool: True if nothing is pending anymore, False on timeout
+        """
+        with self._lock:
+            return self._lock.wait_for(lambda: not self._sending and not any(self._queued.values()),
+                                       timeout)
+    
+    def switch_table(self, name):
+        """Switch to another schedule table at the next slot boundary"""
+        if name not in self.tables:
+            raise ValueError(f"Unknown schedule table: {name}")
+        self._requested_table = name
+    
+    def stats(self):
+        """Return slot statistics for every table"""
+        return {name: [slot.stats() for slot in slots] for name, slots in self.tables.items()}
+    
+    def start(self):
+        """Start running the schedule in a background thread"""
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout=1.0):
+        """Stop the schedule thread"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    def _slot_data(self, slot):
+        """Return (data to send for slot or None to skip it, True if it was posted)"""
+        with self._lock:
+            queued = self._queued.get(slot.frame_id)
+            if queued:
+                self._sending += 1
+                return queued.popleft(), True
+            if slot.sporadic:
+                return None, False
+            if slot.frame_id in self._frame_data:
+                return self._frame_data[slot.frame_id], False
+        return (slot.data() if callable(slot.data) else slot.data), False
+    
+    def _send_slot(self, slot):
+        data, posted = self._slot_data(slot)
+        if data is None:
+            slot.skipped += 1
+            return
+        try:
+            self.master.send_frame(slot.frame_id, data)
+            slot.sent += 1
+        except Exception as e:
+            slot.errors += 1
+            self.last_error = e
+        finally:
+            if posted:
+                with self._lock:
+                    self._sending -= 1
+                    self._lock.notify_all()
+    
+    def _request_slot(self, slot):
+        try:
+            data = self.master.request_frame(slot.frame_id, slot.response_length)
+        except Exception as e:
+            slot.errors += 1
+            self.last_error = e
+            return
+        if data is None:
+            slot.no_response += 1
+            return
+        slot.sent += 1
+        if slot.on_response is not None:
+            slot.on_response(slot.frame_id, data)
+    
+    def _run(self):
+        index = 0
+        due = time.monotonic()
+        while not self._stop_event.is_set():
+            if self._requested_table is not None:
+                self.current_table = self._requested_table
+                self._requested_table = None
+                index = 0
+            
+            slots = self.tables[self.current_table]
+            if not slots:
+                # Empty table (e.g. sleep): keep the bus idle
+                self._stop_event.wait(0.01)
+                due = time.monotonic()
+                continue
+            
+            slot = slots[index % len(slots)]
+            index += 1
+            remaining = due - time.monotonic()
+            if remaining > 0 and self._stop_event.wait(remaining):
+                break
+            
+            slot.record_jitter(max(0.0, time.monotonic() - due))
+            if slot.response_length:
+                self._request_slot(slot)
+            else:
+                self._send_slot(slot)
+            
+            due += slot.delay
+            now = time.monotonic()
+            if now > due:
+                # Slot took longer than its slot time, restart the timeline
+                slot.overruns += 1
+                due = now
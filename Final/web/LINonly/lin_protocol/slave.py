@@ -1,12 +1,18 @@
-import serial
 import time
-import RPi.GPIO as GPIO
+from collections import deque
 from .constants import *
 from .exceptions import *
+from .parser import LINFrameParser
+from .codec import calculate_pid, frame_checksum, parse_pid
+from .transport import wait_readable, open_serial, load_gpio
+
+# Default of receive_frame's timeout: use the slave's frame_timeout
+_FRAME_TIMEOUT = object()
 
 class LINSlave:
     def __init__(self, serial_port=DEFAULT_SERIAL_PORT, baud_rate=DEFAULT_BAUD_RATE,
-                 wakeup_pin=DEFAULT_WAKEUP_PIN):
+                 wakeup_pin=DEFAULT_WAKEUP_PIN, frame_timeout=DEFAULT_FRAME_TIMEOUT,
+                 checksum_model=CHECKSUM_ENHANCED, transport=None, gpio=None):
         """
         Initialize LIN Slave controller
         
@@ -14,35 +20,44 @@ class LINSlave:
             serial_port: Serial port device path
             baud_rate: Communication baud rate
             wakeup_pin: GPIO pin for wakeup signal
+            frame_timeout: Seconds receive_frame waits for a frame (None = forever)
+            checksum_model: CHECKSUM_ENHANCED (LIN 2.x) or CHECKSUM_CLASSIC (LIN 1.x)
+            transport: Already opened serial-like object to use instead of serial_port
+            gpio: GPIO module to use instead of RPi.GPIO (e.g. transport.NullGPIO())
         """
-        self.ser = serial.Serial(serial_port, baudrate=baud_rate, timeout=0.1)
+        if transport is None:
+            transport = open_serial(serial_port, baud_rate, timeout=DEFAULT_BYTE_TIMEOUT)
+        self.ser = transport
+        self.gpio = gpio if gpio is not None else load_gpio()
         self.baud_rate = baud_rate
         self.wakeup_pin = wakeup_pin
+        self.frame_timeout = frame_timeout
+        self.checksum_model = checksum_model
+        self.parser = LINFrameParser(checksum_model=checksum_model)
+        self._pending_frames = deque()
         
-        # Configure GPIO for wakeup
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setup(self.wakeup_pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+        # frame_id -> (ready-to-send data + checksum, on_sent callback)
+        self._responses = {}
         
+        # Configure GPIO for wakeup
+        self.gpio.setmode(self.gpio.BCM)
+        self.gpio.setup(self.wakeup_pin, self.gpio.IN, pull_up_down=self.gpio.PUD_UP)
+    
     @staticmethod
     def verify_checksum(pid, data, received_checksum):
         """
-        Verify LIN 2.0 classic checksum
+        Verify LIN 2.x enhanced checksum (PID included), classic for
+        the diagnostic frames 0x3C/0x3D as on the bus
         
         Args:
             pid: Protected Identifier byte
             data: Received data bytes
             received_checksum: Received checksum byte
-            
+        
         Returns:
             bool: True if checksum matches, False otherwise
         """
-        calculated_checksum = pid
-        for byte in data:
-            calculated_checksum += byte
-            if calculated_checksum > 0xFF:
-                calculated_checksum -= 0xFF
-        calculated_checksum = (0xFF - calculated_checksum) & 0xFF
-        return calculated_checksum == received_checksum
+        return frame_checksum(pid, data) == received_checksum
     
     @staticmethod
     def parse_pid(pid_byte):
@@ -51,71 +66,92 @@ class LINSlave:
         
         Args:
             pid_byte: Received PID byte
-            
+        
         Returns:
             int: Frame ID if parity is valid, None otherwise
         """
-        frame_id = pid_byte & 0x3F
-        p0 = (pid_byte >> 6) & 0x01
-        p1 = (pid_byte >> 7) & 0x01
+        return parse_pid(pid_byte)
+    
+    def _encode_response(self, frame_id, data):
+        if len(data) == 0 or len(data) > MAX_FRAME_DATA_LENGTH:
+            raise ValueError(f"Response must have 1 to {MAX_FRAME_DATA_LENGTH} data bytes")
+        pid = calculate_pid(frame_id)
+        return bytes(data) + bytes([frame_checksum(pid, data, self.checksum_model)])
+    
+    def register_response(self, frame_id, data, on_sent=None):
+        """
+        Publish a response for frame_id
         
-        # Verify parity
-        calc_p0 = (frame_id ^ (frame_id >> 1) ^ (frame_id >> 2) ^ (frame_id >> 4)) & 0x01
-        calc_p1 = ~((frame_id >> 1) ^ (frame_id >> 3) ^ (frame_id >> 4) ^ (frame_id >> 5)) & 0x01
+        When the master sends the header for frame_id, the precomputed
+        data + checksum is written straight away from receive_frame.
+        
+        Args:
+            frame_id: 6-bit LIN frame ID (0-63)
+            data: Response data bytes (1-8 bytes)
+            on_sent: Optional callback(frame_id) called after each response
+        """
+        self._responses[frame_id] = (self._encode_response(frame_id, data), on_sent)
+        # Only the header of this frame comes from the master
+        self.parser.data_lengths[frame_id] = 0
+    
+    def update_response(self, frame_id, data):
+        """
+        Replace the response data of a registered frame
         
-        if p0 != calc_p0 or p1 != calc_p1:
-            return None
-        return frame_id
+        Call this whenever the published state changes, so nothing has to
+        be computed when the header arrives.
+        """
+        if frame_id not in self._responses:
+            raise LINFrameError(f"No response registered for frame 0x{frame_id:02X}")
+        self._responses[frame_id] = (self._encode_response(frame_id, data),
+                                     self._responses[frame_id][1])
+    
+    def unregister_response(self, frame_id):
+        """Stop publishing a response for frame_id"""
+        self._responses.pop(frame_id, None)
+        self.parser.data_lengths.pop(frame_id, None)
     
-    def receive_frame(self, expected_data_length=3):
+    def receive_frame(self, expected_data_length=3, timeout=_FRAME_TIMEOUT):
         """
         Receive and process LIN frame
         
+        Blocks in select() until bytes arrive, then reads everything that is
+        waiting in one call and feeds it to the frame parser. Frames with a
+        bad parity or checksum are counted in self.parser and skipped.
+        Headers of registered response frames are answered here and not
+        returned.
+        
         Args:
             expected_data_length: Expected number of data bytes
-            
+            timeout: Seconds to wait for a frame, None to wait forever,
+                defaults to frame_timeout
+        
         Returns:
-            tuple: (frame_id, data) if frame is valid, None otherwise
-            
-        Raises:
-            LINError: If frame validation fails
+            tuple: (frame_id, data) if a valid frame arrived, None on timeout
         """
-        # Wait for break
-        while True:
-            if self.ser.in_waiting:
-                try:
-                    byte = self.ser.read(1)
-                    if byte == bytes([BREAK_BYTE]):
-                        break
-                except:
-                    break
-        
-        # Read sync
-        sync = self.ser.read(1)
-        if sync != bytes([SYNC_BYTE]):
-            raise LINSyncError("Invalid sync byte")
-        
-        # Read PID
-        pid_byte = ord(self.ser.read(1))
-        frame_id = self.parse_pid(pid_byte)
-        if frame_id is None:
-            raise LINParityError("PID parity check failed")
-        
-        # Read data
-        data = self.ser.read(expected_data_length)
-        if len(data) != expected_data_length:
-            raise LINFrameError(f"Expected {expected_data_length} data bytes, got {len(data)}")
-        
-        # Read checksum
-        checksum = ord(self.ser.read(1))
+        if timeout is _FRAME_TIMEOUT:
+            timeout = self.frame_timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self.parser.data_length = expected_data_length
         
-        # Verify checksum
-        if not self.verify_checksum(pid_byte, data, checksum):
-            raise LINChecksumError("Checksum verification failed")
+        while not self._pending_frames:
+            if not wait_readable(self.ser, deadline):
+                return None
+            chunk = self.ser.read(self.ser.in_waiting or 1)
+            for frame in self.parser.feed(chunk):
+                response = self._responses.get(frame[0])
+                if response is None:
+                    self._pending_frames.append(frame)
+                    continue
+                # Header for a frame we publish: answer within the response space
+                self.ser.write(response[0])
+                self.ser.flush()
+                if response[1] is not None:
+                    response[1](frame[0])
         
-        return (frame_id, data)
+        return self._pending_frames.popleft()
     
     def close(self):
         """Clean up resources"""
         self.ser.close()
-        GPIO.cleanup()
\ No newline at end of file
+        self.gpio.cleanup()
\ No newline at end of file
@@ -1,7 +1,13 @@
 #!/usr/bin/env python3
 from lin_protocol import LINMaster
 import time
+import sys
+import os
 from pymongo import MongoClient
+# Modules shared between the scripts live in Final/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from sensor_writer import SensorWriter
+from command_ingest import CommandIngest
 import logging
 import board
 import adafruit_dht
@@ -24,6 +30,10 @@ class WiperController:
         self.db = self.mongo_client.LIN_wiper77
         self.commands_collection = self.db.commands
         self.sensor_collection = self.db.sensors
+        # Sensor documents are inserted in batches by a background thread
+        self.sensor_writer = SensorWriter(self.sensor_collection)
+        # Indexed, batched reads of the pending commands (change stream when available)
+        self.ingest = CommandIngest(self.commands_collection, poll_interval=0.5)
         self.dht = adafruit_dht.DHT11(board.D17)  # GPIO17
         self.last_sensor_read = 0
         self.sensor_read_interval = 2.0  # Read sensor every 2 seconds
@@ -60,7 +70,7 @@ class WiperController:
                         'humidity': humidity,
                         'timestamp': datetime.utcnow()
                     }
-                    self.sensor_collection.insert_one(sensor_data)
+                    self.sensor_writer.write(sensor_data)
                     logging.info(f"Stored sensor data: Temp={temp}C, Humidity={humidity}%")
                     
                     # Check temperature and toggle mode
@@ -68,10 +78,7 @@ class WiperController:
                         self.is_automatic_mode = True
                         logging.info("Switching to automatic mode (temperature >= 26C)")
                         # Clear pending commands to prevent interference
-                        self.commands_collection.update_many(
-                            {"status": "pending"},
-                            {"$set": {"status": "ignored"}}
-                        )
+                        self.ingest.ignore_pending()
                     elif temp < 26 and self.is_automatic_mode:
                         self.is_automatic_mode = False
                         logging.info("Switching to manual mode (temperature < 26C)")
@@ -101,7 +108,9 @@ class WiperController:
         else:
             # In manual mode, process user commands
             try:
-                pending_commands = self.commands_collection.find({"status": "pending"})
+                # Waits up to 0.5 s for new commands (this is the loop's pacing in manual mode)
+                pending_commands = self.ingest.fetch(timeout=0.5)
+                executed = []
                 
                 for command in pending_commands:
                     frame_data = self._command_to_frame_data(
@@ -114,16 +123,17 @@ class WiperController:
                         self.lin_master.send_frame(0x20, frame_data)
                         logging.info(f"Manual mode: Sent LIN frame: {frame_data}")
                         
-                        self.commands_collection.update_one(
-                            {"_id": command["_id"]},
-                            {"$set": {"status": "completed"}}
-                        )
+                        executed.append(command)
                         
                     except Exception as e:
                         logging.error(f"Error sending frame: {e}")
+                        self.ingest.requeue(command)
                         
+                # One write for the whole batch
+                self.ingest.complete(executed)
             except Exception as e:
                 logging.error(f"Error processing commands: {e}")
+                time.sleep(0.5)  # Don't spin while MongoDB is unreachable
             
     def run(self):
         """Main loop for processing commands and sensor data"""
@@ -131,12 +141,17 @@ class WiperController:
             while True:
                 self.read_and_store_sensor_data()
                 self.process_pending_commands()
-                time.sleep(0.5)  # Short delay to prevent excessive CPU usage
+                if self.is_automatic_mode:
+                    time.sleep(0.5)  # Short delay to prevent excessive CPU usage
                 
         except KeyboardInterrupt:
             logging.info("Shutting down...")
         finally:
             self.lin_master.close()
+            logging.info(f"Command ingest stats: {self.ingest.stats()}")
+            self.ingest.close()
+            self.sensor_writer.close()
+            logging.info(f"Sensor writer stats: {self.sensor_writer.stats()}")
             self.mongo_client.close()
             try:
                 self.dht.exit()
@@ -1,7 +1,13 @@
 #!/usr/bin/env python3
 from lin_protocol import LINMaster
 import time
+import sys
+import os
 from pymongo import MongoClient
+# Modules shared between the scripts live in Final/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from sensor_writer import SensorWriter
+from command_ingest import CommandIngest
 import logging
 import board
 import adafruit_dht
@@ -24,6 +30,10 @@ class WiperController:
         self.db = self.mongo_client.LIN_wiper77
         self.commands_collection = self.db.commands
         self.sensor_collection = self.db.sensors
+        # Sensor documents are inserted in batches by a background thread
+        self.sensor_writer = SensorWriter(self.sensor_collection)
+        # Indexed, batched reads of the pending commands (change stream when available)
+        self.ingest = CommandIngest(self.commands_collection, poll_interval=0.1)
         self.dht = adafruit_dht.DHT11(board.D17)
         self.last_sensor_read = 0
         self.sensor_read_interval = 2.0
@@ -83,7 +93,7 @@ class WiperController:
                         'humidity': humidity,
                         'timestamp': datetime.utcnow()
                     }
-                    self.sensor_collection.insert_one(sensor_data)
+                    self.sensor_writer.write(sensor_data)
                     logging.info(f"Sensor data: Temp={temp}C, Humidity={humidity}%")
                     
                     previous_mode = self.is_automatic_mode
@@ -92,19 +102,13 @@ class WiperController:
                     if not previous_mode and new_mode:
                         logging.info("ACTIVATING automatic mode (temp ≥27C)")
                         self.is_automatic_mode = True
-                        self.commands_collection.update_many(
-                            {"status": "pending"},
-                            {"$set": {"status": "ignored"}}
-                        )
+                        self.ingest.ignore_pending()
                     elif previous_mode and not new_mode:
                         logging.info("DEACTIVATING automatic mode (temp <27C)")
                         self.is_automatic_mode = False
                         if not self._send_stop_command():
                             logging.error("Stop command not confirmed!")
-                        self.commands_collection.update_many(
-                            {"status": "pending"},
-                            {"$set": {"status": "ignored"}}
-                        )
+                        self.ingest.ignore_pending()
                 
             except RuntimeError as e:
                 logging.error(f"Sensor read error: {e}")
@@ -120,7 +124,9 @@ class WiperController:
                 logging.error(f"Automatic mode frame error: {e}")
         else:
             try:
-                pending_commands = self.commands_collection.find({"status": "pending"})
+                # Waits up to 0.1 s for new commands (this is the loop's pacing in manual mode)
+                pending_commands = self.ingest.fetch(timeout=0.1)
+                executed = []
                 for command in pending_commands:
                     frame_data = self._command_to_frame_data(
                         command['wiperType'],
@@ -130,14 +136,15 @@ class WiperController:
                     try:
                         self.lin_master.send_frame(0x20, frame_data)
                         logging.info(f"Executed command: {command['wiperType']} {command['speed']}")
-                        self.commands_collection.update_one(
-                            {"_id": command["_id"]},
-                            {"$set": {"status": "completed"}}
-                        )
+                        executed.append(command)
                     except Exception as e:
                         logging.error(f"Command execution error: {e}")
+                        self.ingest.requeue(command)
+                # One write for the whole batch
+                self.ingest.complete(executed)
             except Exception as e:
                 logging.error(f"Command processing error: {e}")
+                time.sleep(0.1)  # Don't spin while MongoDB is unreachable
             
     def run(self):
         try:
@@ -145,7 +152,8 @@ class WiperController:
             while True:
                 self.read_and_store_sensor_data()
                 self.process_pending_commands()
-                time.sleep(0.1)
+                if self.is_automatic_mode:
+                    time.sleep(0.1)
                 
         except KeyboardInterrupt:
             logging.info("Shutdown initiated")
@@ -153,6 +161,10 @@ class WiperController:
             logging.info("Cleaning up resources")
             self._send_stop_command()
             self.lin_master.close()
+            logging.info(f"Command ingest stats: {self.ingest.stats()}")
+            self.ingest.close()
+            self.sensor_writer.close()
+            logging.info(f"Sensor writer stats: {self.sensor_writer.stats()}")
             self.mongo_client.close()
             try:
                 self.dht.exit()
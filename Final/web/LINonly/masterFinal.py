@@ -1,7 +1,13 @@
 #!/usr/bin/env python3
-from lin_protocol import LINMaster
+from lin_protocol import LINMaster, LINScheduler, ScheduleSlot
 import time
+import sys
+import os
 from pymongo import MongoClient
+# Modules shared between the scripts live in Final/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from sensor_writer import SensorWriter
+from command_ingest import CommandIngest
 import logging
 import board
 import adafruit_dht
@@ -20,10 +26,22 @@ logging.basicConfig(
 class WiperController:
     def __init__(self):
         self.lin_master = LINMaster()
+        # Commands go out in the next 0x20 slot of the normal schedule table,
+        # the slave publishes its wiper state in the 0x21 slot
+        self.wiper_status = None
+        self.scheduler = LINScheduler(self.lin_master, {
+            'normal': [ScheduleSlot(0x20, 0.02, sporadic=True),
+                       ScheduleSlot(0x21, 0.05, response_length=3,
+                                    on_response=self._on_wiper_status)]
+        })
         self.mongo_client = MongoClient('mongodb://10.20.0.27:27017/')
         self.db = self.mongo_client.LIN_wiper77
         self.commands_collection = self.db.commands
         self.sensor_collection = self.db.sensors
+        # Sensor documents are inserted in batches by a background thread
+        self.sensor_writer = SensorWriter(self.sensor_collection)
+        # Indexed, batched reads of the pending commands (change stream when available)
+        self.ingest = CommandIngest(self.commands_collection, poll_interval=0.1)
         self.dht = adafruit_dht.DHT11(board.D17)
         self.last_sensor_read = 0
         self.sensor_read_interval = 2.0
@@ -31,6 +49,7 @@ class WiperController:
         self.automatic_frame_data = self._command_to_frame_data('both', 'normal', 0)  # 0 cycles = infinite
         self.stop_frame_data = bytes([0, 0, 0])
         self.last_mode_switch = 0
+        self.automatic_frame_pending = False
         self.mode_switch_delay = 1.0
         
     def _command_to_frame_data(self, wiper_type, speed, cycles):
@@ -45,11 +64,17 @@ class WiperController:
         
         return bytes([wiper_byte, speed_byte, cycles_byte])
     
+    def _on_wiper_status(self, frame_id, data):
+        """Log the wiper state reported by the slave when it changes"""
+        if data != self.wiper_status:
+            self.wiper_status = data
+            logging.info(f"Slave status: type={data[0]}, speed={data[1]}, cycles={data[2]}")
+    
     def _send_stop_command(self):
         """Send stop command with guaranteed delivery"""
         try:
-            self.lin_master.send_frame(0x20, self.stop_frame_data)
-            logging.info("Sent STOP command")
+            self.scheduler.post(0x20, self.stop_frame_data)
+            logging.info("Queued STOP command")
             return True
         except Exception as e:
             logging.error(f"Stop command failed: {e}")
@@ -67,7 +92,7 @@ class WiperController:
                         'humidity': humidity,
                         'timestamp': datetime.utcnow()
                     }
-                    self.sensor_collection.insert_one(sensor_data)
+                    self.sensor_writer.write(sensor_data)
                     logging.info(f"Sensor data: Temp={temp}C, Humidity={humidity}%")
                     
                     previous_mode = self.is_automatic_mode
@@ -77,21 +102,16 @@ class WiperController:
                         if not previous_mode and new_mode:
                             logging.info("ACTIVATING automatic mode (temp ≥27C)")
                             self.is_automatic_mode = True
+                            self.automatic_frame_pending = True
                             self.last_mode_switch = current_time
-                            self.commands_collection.update_many(
-                                {"status": "pending"},
-                                {"$set": {"status": "ignored"}}
-                            )
+                            self.ingest.ignore_pending()
                         elif previous_mode and not new_mode:
                             logging.info("DEACTIVATING automatic mode (temp <27C)")
                             self.is_automatic_mode = False
                             self.last_mode_switch = current_time
                             if not self._send_stop_command():
                                 logging.error("Stop command not confirmed!")
-                            self.commands_collection.update_many(
-                                {"status": "pending"},
-                                {"$set": {"status": "ignored"}}
-                            )
+                            self.ingest.ignore_pending()
                 
             except RuntimeError as e:
                 logging.error(f"Sensor read error: {e}")
@@ -101,15 +121,19 @@ class WiperController:
     def process_pending_commands(self):
         if self.is_automatic_mode:
             # Only send the automatic mode frame once when entering automatic mode
-            if time.time() - self.last_mode_switch < 0.5:  # Send for first 0.5s after switch
+            # (every post is sent, posting it on each loop would restart the wipers)
+            if self.automatic_frame_pending:
                 try:
-                    self.lin_master.send_frame(0x20, self.automatic_frame_data)
-                    logging.info("Sent automatic mode activation frame")
+                    self.scheduler.post(0x20, self.automatic_frame_data)
+                    self.automatic_frame_pending = False
+                    logging.info("Queued automatic mode activation frame")
                 except Exception as e:
                     logging.error(f"Automatic mode frame error: {e}")
         else:
             try:
-                pending_commands = self.commands_collection.find({"status": "pending"})
+                # Waits up to 0.1 s for new commands (this is the loop's pacing in manual mode)
+                pending_commands = self.ingest.fetch(timeout=0.1)
+                executed = []
                 for command in pending_commands:
                     frame_data = self._command_to_frame_data(
                         command['wiperType'],
@@ -117,31 +141,42 @@ class WiperController:
                         command['cycles']
                     )
                     try:
-                        self.lin_master.send_frame(0x20, frame_data)
+                        self.scheduler.post(0x20, frame_data)
                         logging.info(f"Executed command: {command['wiperType']} {command['speed']}")
-                        self.commands_collection.update_one(
-                            {"_id": command["_id"]},
-                            {"$set": {"status": "completed"}}
-                        )
+                        executed.append(command)
                     except Exception as e:
                         logging.error(f"Command execution error: {e}")
+                        self.ingest.requeue(command)
+                # One write for the whole batch
+                self.ingest.complete(executed)
             except Exception as e:
                 logging.error(f"Command processing error: {e}")
+                time.sleep(0.1)  # Don't spin while MongoDB is unreachable
             
     def run(self):
         try:
             logging.info("Starting wiper controller")
+            self.scheduler.start()
             while True:
                 self.read_and_store_sensor_data()
                 self.process_pending_commands()
-                time.sleep(0.1)
+                if self.is_automatic_mode:
+                    time.sleep(0.1)
                 
         except KeyboardInterrupt:
             logging.info("Shutdown initiated")
         finally:
             logging.info("Cleaning up resources")
             self._send_stop_command()
+            if not self.scheduler.flush(timeout=1.0):
+                logging.error("STOP command still pending at shutdown")
+            self.scheduler.stop()
+            logging.info(f"LIN schedule stats: {self.scheduler.stats()}")
             self.lin_master.close()
+            logging.info(f"Command ingest stats: {self.ingest.stats()}")
+            self.ingest.close()
+            self.sensor_writer.close()
+            logging.info(f"Sensor writer stats: {self.sensor_writer.stats()}")
             self.mongo_client.close()
             try:
                 self.dht.exit()
@@ -4,6 +4,11 @@ import RPi.GPIO as GPIO
 import time
 import logging
 import threading
+import sys
+import os
+# Modules shared between the scripts live in Final/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from led_animator import LEDAnimator, sweep_timeline
 
 # GPIO setup
 FRONT_LEDS = [23, 24, 25]  # Right to left
@@ -26,55 +31,31 @@ class WiperSlave:
         for pin in FRONT_LEDS + BACK_LEDS:
             GPIO.setup(pin, GPIO.OUT)
             GPIO.output(pin, GPIO.LOW)
-        self.stop_event = threading.Event()
-        self.active_threads = []
+        # One scheduler thread drives both wipers, a new command preempts the running one
+        self.animator = LEDAnimator(GPIO)
         self.operation_lock = threading.Lock()
             
-    def _activate_single_wiper(self, leds, speed, cycles):
+    def _activate_single_wiper(self, channel, leds, speed, cycles):
         """Wiper operation with immediate stop capability"""
         delay = 0.3 if speed == 2 else 0.6
         
-        for _ in range(cycles):
-            if self.stop_event.is_set():
-                break
-                
-            # Forward sweep with frequent stop checks
-            for led in leds:
-                if self.stop_event.is_set():
-                    break
-                GPIO.output(led, GPIO.HIGH)
-                start_time = time.time()
-                while time.time() - start_time < delay:
-                    if self.stop_event.is_set():
-                        break
-                    time.sleep(0.05)  # Check every 50ms
-            
-            # Backward sweep with frequent stop checks
-            for led in reversed(leds):
-                if self.stop_event.is_set():
-                    break
-                GPIO.output(led, GPIO.LOW)
-                start_time = time.time()
-                while time.time() - start_time < delay:
-                    if self.stop_event.is_set():
-                        break
-                    time.sleep(0.05)
+        if cycles == 0:  # No sweep requested
+            return
+        
+        # Forward sweep then backward sweep, each LED step lasts delay
+        timeline, duration = sweep_timeline(leds, delay)
+        self.animator.start(channel, timeline, duration, cycles=cycles)
     
     def _stop_wipers(self):
         """Immediately stop all wiper activity"""
         with self.operation_lock:
-            self.stop_event.set()
-            
-            # Wait for active threads to finish
-            for t in self.active_threads:
-                t.join(timeout=0.1)
+            # Cancelling switches the LEDs of the running animations off
+            self.animator.cancel_all()
             
             # Ensure all LEDs are off
             for pin in FRONT_LEDS + BACK_LEDS:
                 GPIO.output(pin, GPIO.LOW)
             
-            self.stop_event.clear()
-            self.active_threads = []
             logging.info("Wipers fully stopped")
     
     def activate_wipers(self, wiper_type, speed, cycles):
@@ -87,25 +68,12 @@ class WiperSlave:
             
         # Prepare new operation
         if wiper_type == 3:  # Both wipers
-            front_thread = threading.Thread(
-                target=self._activate_single_wiper,
-                args=(FRONT_LEDS, speed, cycles)
-            )
-            back_thread = threading.Thread(
-                target=self._activate_single_wiper,
-                args=(BACK_LEDS, speed, cycles)
-            )
-            self.active_threads = [front_thread, back_thread]
-            front_thread.start()
-            back_thread.start()
+            self._activate_single_wiper('front', FRONT_LEDS, speed, cycles)
+            self._activate_single_wiper('back', BACK_LEDS, speed, cycles)
         else:  # Single wiper
             leds = FRONT_LEDS if wiper_type == 1 else BACK_LEDS
-            single_thread = threading.Thread(
-                target=self._activate_single_wiper,
-                args=(leds, speed, cycles)
-            )
-            self.active_threads = [single_thread]
-            single_thread.start()
+            channel = 'front' if wiper_type == 1 else 'back'
+            self._activate_single_wiper(channel, leds, speed, cycles)
     
     def run(self):
         try:
@@ -130,6 +98,7 @@ class WiperSlave:
             logging.info("Shutdown initiated")
         finally:
             self._stop_wipers()
+            self.animator.close()
             self.lin_slave.close()
             GPIO.cleanup()
             logging.info("Slave shutdown complete")
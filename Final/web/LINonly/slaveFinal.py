@@ -4,11 +4,20 @@ import RPi.GPIO as GPIO
 import time
 import logging
 import threading
+import sys
+import os
+# Modules shared between the scripts live in Final/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from led_animator import LEDAnimator, sweep_timeline
 
 # GPIO setup
 FRONT_LEDS = [23, 24, 25]  # Right to left
 BACK_LEDS = [16, 20, 21]   # Right to left
 
+# LIN frames
+COMMAND_FRAME_ID = 0x20
+STATUS_FRAME_ID = 0x21  # Published by this slave: type, speed, cycles
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -22,72 +31,50 @@ logging.basicConfig(
 class WiperSlave:
     def __init__(self):
         self.lin_slave = LINSlave()
+        self.lin_slave.register_response(STATUS_FRAME_ID, bytes([0, 0, 0]))
         GPIO.setmode(GPIO.BCM)
         for pin in FRONT_LEDS + BACK_LEDS:
             GPIO.setup(pin, GPIO.OUT)
             GPIO.output(pin, GPIO.LOW)
-        self.stop_event = threading.Event()
-        self.active_threads = []
+        # One scheduler thread drives both wipers, a new command preempts the running one
+        self.animator = LEDAnimator(GPIO)
         self.operation_lock = threading.Lock()
             
-    def _wiper_sweep(self, leds, speed, stop_event):
-        """Perform a complete wiper sweep with proper timing"""
+    def _wiper_timeline(self, leds, speed):
+        """Steps of a complete wiper sweep with proper timing"""
         delay = 0.6  # Normal speed delay (0.6s total per sweep)
         if speed == 2:  # Fast speed
             delay = 0.3
         
-        # Forward sweep (right to left)
-        for i, led in enumerate(leds):
-            if stop_event.is_set():
-                return False
-            GPIO.output(led, GPIO.HIGH)
-            # Evenly distribute delay across all LEDs
-            time.sleep(delay/len(leds))
-        
-        # Backward sweep (left to right)
-        for i, led in enumerate(reversed(leds)):
-            if stop_event.is_set():
-                return False
-            GPIO.output(led, GPIO.LOW)
-            # Evenly distribute delay across all LEDs
-            time.sleep(delay/len(leds))
-        
-        return True
+        # Forward sweep (right to left) then backward sweep (left to right),
+        # the delay is evenly distributed across all LEDs
+        return sweep_timeline(leds, delay/len(leds))
     
-    def _activate_single_wiper(self, leds, speed, cycles):
-        """Wiper operation with immediate stop capability"""
-        count = 0
-        
-        try:
-            while cycles == 0 or count < cycles:
-                if self.stop_event.is_set():
-                    break
-                
-                if not self._wiper_sweep(leds, speed, self.stop_event):
-                    break
-                
-                if cycles > 0:
-                    count += 1
-        finally:
-            # Ensure all LEDs are off when done
-            for led in leds:
-                GPIO.output(led, GPIO.LOW)
+    def _activate_single_wiper(self, channel, leds, speed, cycles):
+        """Start a wiper on the animator (cycles=0 wipes until stopped)"""
+        timeline, duration = self._wiper_timeline(leds, speed)
+        self.animator.start(channel, timeline, duration, cycles=cycles, on_done=self._wipe_done)
+    
+    def _wipe_done(self):
+        """A wiper finished its cycles: report idle once no wiper is running"""
+        with self.operation_lock:
+            # A newer command may have started the wipers again meanwhile
+            if self.animator.is_active('front') or self.animator.is_active('back'):
+                return
+            self.lin_slave.update_response(STATUS_FRAME_ID, bytes([0, 0, 0]))
+            logging.info("Wiper cycles completed")
     
     def _stop_wipers(self):
         """Immediately stop all wiper activity"""
         with self.operation_lock:
-            self.stop_event.set()
-            
-            # Wait for active threads to finish
-            for t in self.active_threads:
-                t.join(timeout=0.1)
+            # Cancelling switches the LEDs of the running animations off
+            self.animator.cancel_all()
             
             # Ensure all LEDs are off
             for pin in FRONT_LEDS + BACK_LEDS:
                 GPIO.output(pin, GPIO.LOW)
             
-            self.stop_event.clear()
-            self.active_threads = []
+            self.lin_slave.update_response(STATUS_FRAME_ID, bytes([0, 0, 0]))
             logging.info("Wipers fully stopped")
     
     def activate_wipers(self, wiper_type, speed, cycles):
@@ -97,33 +84,20 @@ class WiperSlave:
         
         if wiper_type == 0:  # Explicit stop command
             return
+        
+        with self.operation_lock:
+            self.lin_slave.update_response(STATUS_FRAME_ID, bytes([wiper_type, speed, cycles]))
             
-        # Prepare new operation
-        if wiper_type == 3:  # Both wipers
-            front_thread = threading.Thread(
-                target=self._activate_single_wiper,
-                args=(FRONT_LEDS, speed, cycles),
-                daemon=True
-            )
-            back_thread = threading.Thread(
-                target=self._activate_single_wiper,
-                args=(BACK_LEDS, speed, cycles),
-                daemon=True
-            )
-            self.active_threads = [front_thread, back_thread]
-            front_thread.start()
-            back_thread.start()
-            logging.info(f"Started both wipers (speed={'fast' if speed == 2 else 'normal'}, cycles={'infinite' if cycles == 0 else cycles})")
-        else:  # Single wiper
-            leds = FRONT_LEDS if wiper_type == 1 else BACK_LEDS
-            single_thread = threading.Thread(
-                target=self._activate_single_wiper,
-                args=(leds, speed, cycles),
-                daemon=True
-            )
-            self.active_threads = [single_thread]
-            single_thread.start()
-            logging.info(f"Started {'front' if wiper_type == 1 else 'back'} wiper (speed={'fast' if speed == 2 else 'normal'}, cycles={'infinite' if cycles == 0 else cycles})")
+            # Prepare new operation
+            if wiper_type == 3:  # Both wipers
+                self._activate_single_wiper('front', FRONT_LEDS, speed, cycles)
+                self._activate_single_wiper('back', BACK_LEDS, speed, cycles)
+                logging.info(f"Started both wipers (speed={'fast' if speed == 2 else 'normal'}, cycles={'infinite' if cycles == 0 else cycles})")
+            else:  # Single wiper
+                leds = FRONT_LEDS if wiper_type == 1 else BACK_LEDS
+                channel = 'front' if wiper_type == 1 else 'back'
+                self._activate_single_wiper(channel, leds, speed, cycles)
+                logging.info(f"Started {'front' if wiper_type == 1 else 'back'} wiper (speed={'fast' if speed == 2 else 'normal'}, cycles={'infinite' if cycles == 0 else cycles})")
     
     def run(self):
         try:
@@ -133,7 +107,7 @@ class WiperSlave:
                     frame = self.lin_slave.receive_frame(expected_data_length=3)
                     if frame:
                         frame_id, data = frame
-                        if frame_id == 0x20 and len(data) == 3:
+                        if frame_id == COMMAND_FRAME_ID and len(data) == 3:
                             logging.info(f"Received command: type={data[0]}, speed={data[1]}, cycles={data[2]}")
                             if data == bytes([0, 0, 0]):
                                 logging.info("Processing STOP command")
@@ -148,6 +122,7 @@ class WiperSlave:
             logging.info("Shutdown initiated")
         finally:
             self._stop_wipers()
+            self.animator.close()
             self.lin_slave.close()
             GPIO.cleanup()
             logging.info("Slave shutdown complete")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the lin_protocol codec against the bitwise PID and
+checksum code it replaced.
+
+Run from the LinLib_py directory:
+    python3 benchmarks/bench_codec.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lin_protocol import calculate_pid, enhanced_checksum, parse_pid
+
+DATA = bytes([0x03, 0x01, 0x02, 0xFF, 0x80, 0x40, 0x20, 0x10])
+NUMBER = 200000
+
+
+def bitwise_pid(frame_id):
+    p0 = (frame_id ^ (frame_id >> 1) ^ (frame_id >> 2) ^ (frame_id >> 4)) & 0x01
+    p1 = ~((frame_id >> 1) ^ (frame_id >> 3) ^ (frame_id >> 4) ^ (frame_id >> 5)) & 0x01
+    return (frame_id & 0x3F) | (p0 << 6) | (p1 << 7)
+
+
+def bit_list_pid(frame_id):
+    id_bits = [frame_id >> i & 1 for i in range(6)]
+    p0 = id_bits[0] ^ id_bits[1] ^ id_bits[2] ^ id_bits[4]
+    p1 = ~(id_bits[1] ^ id_bits[3] ^ id_bits[4] ^ id_bits[5]) & 1
+    return (frame_id | (p0 << 6) | (p1 << 7)) & 0xFF
+
+
+def bitwise_parse_pid(pid_byte):
+    frame_id = pid_byte & 0x3F
+    if bitwise_pid(frame_id) != pid_byte:
+        return None
+    return frame_id
+
+
+def loop_checksum(pid, data):
+    checksum = pid
+    for byte in data:
+        checksum += byte
+        if checksum > 0xFF:
+            checksum -= 0xFF
+    return (0xFF - checksum) & 0xFF
+
+
+def bench(name, stmt):
+    seconds = min(timeit.repeat(stmt, number=NUMBER, repeat=5))
+    print(f"{name:28s} {seconds / NUMBER * 1e9:8.1f} ns/call")
+    return seconds
+
+
+def main():
+    pid = calculate_pid(0x20)
+    view = memoryview(DATA)
+    for name, old, new in [
+        ("pid", lambda: bitwise_pid(0x2A), lambda: calculate_pid(0x2A)),
+        ("pid (bit list)", lambda: bit_list_pid(0x2A), lambda: calculate_pid(0x2A)),
+        ("parse_pid", lambda: bitwise_parse_pid(0xA0), lambda: parse_pid(0xA0)),
+        ("checksum 8 bytes", lambda: loop_checksum(pid, DATA), lambda: enhanced_checksum(pid, DATA)),
+        ("checksum memoryview", lambda: loop_checksum(pid, view), lambda: enhanced_checksum(pid, view)),
+    ]:
+        before = bench(f"{name} (old)", old)
+        after = bench(f"{name} (codec)", new)
+        print(f"{'':28s} speedup x{before / after:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark LINFrameParser against byte-at-a-time frame assembly.
+
+The per-byte loop mirrors what the callcanlin receiver used to do: one
+read(1) per byte, appended to a buffer that is re-validated every time.
+The parser is fed the same stream through reads of up to CHUNK_SIZE
+bytes, as a single read(in_waiting) would return it. Both sides read
+from a pipe so the syscall cost is part of the measurement.
+
+Run from the LinLib_py directory:
+    python3 benchmarks/bench_parser.py
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lin_protocol import LINMaster, LINFrameParser
+from lin_protocol.codec import frame_checksum
+from lin_protocol.constants import BREAK_BYTE, SYNC_BYTE
+
+FRAMES = 20000
+DATA_LENGTH = 3
+CHUNK_SIZES = [16, 256, 4096]
+
+
+def encode_frame(frame_id, data):
+    pid = LINMaster.calculate_pid(frame_id)
+    checksum = frame_checksum(pid, data)
+    return bytes([BREAK_BYTE, SYNC_BYTE, pid]) + data + bytes([checksum])
+
+
+def per_byte(fd, size):
+    """Byte-at-a-time assembly"""
+    frames = reads = 0
+    buffer = bytearray()
+    frame_size = 3 + DATA_LENGTH + 1
+    for _ in range(size):
+        byte = os.read(fd, 1)[0]
+        reads += 1
+        buffer.append(byte)
+        if len(buffer) >= frame_size:
+            if buffer[0] == BREAK_BYTE and buffer[1] == SYNC_BYTE:
+                pid = buffer[2]
+                data = bytes(buffer[3:-1])
+                if (LINMaster.calculate_pid(pid & 0x3F) == pid and
+                        frame_checksum(pid, data) == buffer[-1]):
+                    frames += 1
+            buffer = bytearray()
+    return frames, reads
+
+
+def chunked(fd, size, chunk_size):
+    parser = LINFrameParser(data_length=DATA_LENGTH)
+    frames = reads = received = 0
+    while received < size:
+        chunk = os.read(fd, chunk_size)
+        reads += 1
+        received += len(chunk)
+        frames += len(parser.feed(chunk))
+    return frames, reads
+
+
+def run(name, stream, func, *args):
+    read_fd, write_fd = os.pipe()
+    writer = threading.Thread(target=os.write, args=(write_fd, stream))
+    writer.start()
+    start = time.perf_counter()
+    frames, reads = func(read_fd, len(stream), *args)
+    elapsed = time.perf_counter() - start
+    writer.join()
+    os.close(read_fd)
+    os.close(write_fd)
+    print(f"{name:20s} {frames / elapsed:10.0f} frames/s  "
+          f"{reads / frames:6.2f} reads/frame  ({frames} frames)")
+
+
+def main():
+    stream = b''.join(encode_frame(i % 64, bytes([i & 0xFF, 1, 2])) for i in range(FRAMES))
+    run("per-byte", stream, per_byte)
+    for chunk_size in CHUNK_SIZES:
+        run(f"parser chunk={chunk_size}", stream, chunked, chunk_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark LINSlave.receive_frame over the virtual LIN bus.
+
+Measures the CPU used by an idle slave waiting for a frame and the
+break-to-frame latency, for the select() based receive path and for the
+old busy-spin loop on in_waiting. The slave runs on
+lin_protocol.transport's socketpair bus with the no-op GPIO shim, so no
+serial port, pyserial or RPi.GPIO is needed.
+
+Run from the LinLib_py directory:
+    python3 benchmarks/bench_receive.py
+"""
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lin_protocol import LINMaster, LINSlave, NullGPIO, virtual_serial_pair
+from lin_protocol.constants import BREAK_BYTE, SYNC_BYTE
+
+BAUD_RATE = 19200
+FRAME_ID = 0x20
+FRAME_DATA = bytes([3, 1, 2])
+IDLE_SECONDS = 2.0
+FRAMES = 200
+
+
+def encode_frame(frame_id, data):
+    pid = LINMaster.calculate_pid(frame_id)
+    checksum = LINMaster.calculate_checksum(pid, data)
+    return bytes([BREAK_BYTE, SYNC_BYTE, pid]) + data + bytes([checksum])
+
+
+def busy_spin_receive(slave, expected_data_length=3):
+    """The receive loop LINSlave used before, kept for comparison"""
+    while True:
+        if slave.ser.in_waiting:
+            if slave.ser.read(1) == bytes([BREAK_BYTE]):
+                break
+    slave.ser.read(2)
+    return slave.ser.read(expected_data_length + 1)
+
+
+def measure_idle_cpu(receive):
+    """Run receive with no traffic and return the fraction of a core used"""
+    cpu_start = time.process_time()
+    wall_start = time.monotonic()
+    receive()
+    return (time.process_time() - cpu_start) / (time.monotonic() - wall_start)
+
+
+def measure_latency(slave, master_port, receive):
+    """Return break-to-frame latencies in seconds"""
+    frame = encode_frame(FRAME_ID, FRAME_DATA)
+    latencies = []
+    for _ in range(FRAMES):
+        sent_at = []
+
+        def writer():
+            time.sleep(0.002)
+            sent_at.append(time.perf_counter())
+            # Straight onto the socket, the UART pacing is not part of the latency
+            master_port.sock.sendall(frame)
+
+        t = threading.Thread(target=writer)
+        t.start()
+        receive()
+        latencies.append(time.perf_counter() - sent_at[0])
+        t.join()
+    return latencies
+
+
+def report(name, cpu, latencies):
+    latencies = sorted(latencies)
+    p50 = latencies[len(latencies) // 2] * 1e6
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+    print(f"{name:12s} idle CPU {cpu * 100:6.1f}%  "
+          f"latency p50 {p50:8.1f} us  p99 {p99:8.1f} us  "
+          f"mean {statistics.mean(latencies) * 1e6:8.1f} us")
+
+
+def main():
+    master_port, slave_port = virtual_serial_pair(BAUD_RATE)
+    slave = LINSlave(baud_rate=BAUD_RATE, transport=slave_port, gpio=NullGPIO())
+    try:
+        def timed_out_spin():
+            # The old loop never returns on an idle bus, so stop it from a timer
+            timer = threading.Timer(IDLE_SECONDS, master_port.write, (encode_frame(FRAME_ID, FRAME_DATA),))
+            timer.start()
+            busy_spin_receive(slave)
+
+        cpu = measure_idle_cpu(timed_out_spin)
+        report("busy-spin", cpu, measure_latency(slave, master_port, lambda: busy_spin_receive(slave)))
+
+        cpu = measure_idle_cpu(lambda: slave.receive_frame(timeout=IDLE_SECONDS))
+        report("select", cpu, measure_latency(slave, master_port, lambda: slave.receive_frame(timeout=1.0)))
+    finally:
+        slave.close()
+        master_port.close()
+
+
+if __name__ == "__main__":
+    main()
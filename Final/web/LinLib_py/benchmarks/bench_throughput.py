@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark master->slave traffic over a virtual LIN bus.
+
+LINMaster and LINSlave run against lin_protocol.transport's socketpair
+bus (paced to the baud rate) with the no-op GPIO shim, so no Pi, serial
+port or RPi.GPIO is needed. For every baud rate it reports frames/s
+(and how close that is to the wire limit), send-to-receive latency
+percentiles and the process CPU time per frame.
+
+Run from the LinLib_py directory:
+    python3 benchmarks/bench_throughput.py
+    python3 benchmarks/bench_throughput.py --baud 19200 --frames 500 --min-fps 100
+
+With --min-fps the script exits with status 1 if any baud rate is
+slower, so it can guard against regressions in CI.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lin_protocol import LINMaster, LINSlave, NullGPIO, virtual_serial_pair
+
+FRAME_ID = 0x20
+DATA_LENGTH = 3
+BAUD_RATES = (9600, 19200)
+
+
+def wire_limit(baud_rate, data_length=DATA_LENGTH):
+    """Frames/s if the bus only carried LINMaster.send_frame's bits"""
+    quarter = baud_rate // 4
+    # Break byte and break idle at a quarter of the baud rate, then
+    # sync + PID + data + checksum at full speed, 10 bits per byte
+    break_time = 10.0 / quarter + 13.0 / quarter
+    frame_time = (3 + data_length) * 10.0 / baud_rate
+    return 1.0 / (break_time + frame_time)
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run(baud_rate, frames):
+    master_port, slave_port = virtual_serial_pair(baud_rate)
+    master = LINMaster(baud_rate=baud_rate, inter_frame_space=0,
+                       transport=master_port, gpio=NullGPIO())
+    slave = LINSlave(baud_rate=baud_rate, transport=slave_port, gpio=NullGPIO())
+
+    sent_at = [0.0] * frames
+    latencies = []
+
+    def receiver():
+        while len(latencies) < frames:
+            frame = slave.receive_frame(DATA_LENGTH, timeout=1.0)
+            if frame is None:
+                break
+            seq = frame[1][0] << 8 | frame[1][1]
+            latencies.append(time.perf_counter() - sent_at[seq])
+
+    thread = threading.Thread(target=receiver)
+    thread.start()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for seq in range(frames):
+        sent_at[seq] = time.perf_counter()
+        master.send_frame(FRAME_ID, bytes([seq >> 8, seq & 0xFF, 0]))
+    thread.join()
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    master.close()
+    slave.close()
+    return {
+        'received': len(latencies),
+        'errors': slave.parser.parity_errors + slave.parser.checksum_errors,
+        'fps': len(latencies) / wall,
+        'latencies': sorted(latencies),
+        'cpu_per_frame': cpu / max(len(latencies), 1),
+    }
+
+
+def report(baud_rate, frames, result):
+    latencies = result['latencies']
+    limit = wire_limit(baud_rate)
+    print(f"{baud_rate:6d} baud  {result['received']:5d}/{frames} frames  "
+          f"{result['errors']} errors  "
+          f"{result['fps']:7.1f} frames/s ({result['fps'] / limit * 100:5.1f}% of wire limit)")
+    if latencies:
+        print(f"             latency p50 {percentile(latencies, 0.50) * 1e3:6.2f} ms  "
+              f"p90 {percentile(latencies, 0.90) * 1e3:6.2f} ms  "
+              f"p99 {percentile(latencies, 0.99) * 1e3:6.2f} ms  "
+              f"max {latencies[-1] * 1e3:6.2f} ms  "
+              f"CPU {result['cpu_per_frame'] * 1e6:7.1f} us/frame")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--baud', type=int, action='append',
+                        help="Baud rate to test (repeatable, default 9600 and 19200)")
+    parser.add_argument('--frames', type=int, default=300, help="Frames per baud rate")
+    parser.add_argument('--min-fps', type=float,
+                        help="Fail if fewer frames/s are reached at any baud rate")
+    args = parser.parse_args()
+
+    failed = False
+    for baud_rate in args.baud or BAUD_RATES:
+        result = run(baud_rate, args.frames)
+        report(baud_rate, args.frames, result)
+        if result['received'] < args.frames:
+            failed = True
+        if args.min_fps is not None and result['fps'] < args.min_fps:
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
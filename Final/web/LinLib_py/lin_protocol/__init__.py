@@ -1,6 +1,14 @@
 from .master import LINMaster
 from .slave import LINSlave
+from .parser import LINFrameParser
+from .schedule import LINScheduler, ScheduleSlot
+from .transport import NullGPIO, VirtualSerial, virtual_serial_pair
 from .exceptions import *
+from .codec import (calculate_pid, parse_pid, classic_checksum,
+                    enhanced_checksum, frame_checksum)
 
-__all__ = ['LINMaster', 'LINSlave', 'LINError', 'LINChecksumError', 
+__all__ = ['LINMaster', 'LINSlave', 'LINFrameParser', 'LINScheduler',
+           'ScheduleSlot', 'NullGPIO', 'VirtualSerial', 'virtual_serial_pair',
+           'calculate_pid', 'parse_pid', 'classic_checksum',
+           'enhanced_checksum', 'frame_checksum', 'LINError', 'LINChecksumError', 
            'LINParityError', 'LINSyncError', 'LINFrameError']
\ No newline at end of file
@@ -0,0 +1,121 @@
+"""
+Vectorized LIN frame encoding/decoding for offline log analysis.
+
+Needs NumPy, which is why this module is not imported by lin_protocol
+itself:
+    from lin_protocol.batch import decode_frames
+
+The PID and checksum definitions are the tables from lin_protocol.codec,
+so the results match LINMaster/LINSlave exactly.
+"""
+import numpy as np
+from .constants import *
+from .codec import PID_TABLE, PID_TO_ID, INVALID_PID
+
+PID_TABLE_ARRAY = np.frombuffer(PID_TABLE, dtype=np.uint8)
+PID_TO_ID_ARRAY = np.frombuffer(PID_TO_ID, dtype=np.uint8)
+
+# Offset of the PID in a raw frame: break, sync, PID, data..., checksum
+PID_OFFSET = 2
+
+def _checksums(pids, data, checksum_model):
+    total = data.sum(axis=1, dtype=np.uint32)
+    if checksum_model == CHECKSUM_ENHANCED:
+        frame_ids = pids & 0x3F
+        # Diagnostic frames always use the classic checksum
+        enhanced = (frame_ids != MASTER_REQUEST_FRAME_ID) & (frame_ids != SLAVE_RESPONSE_FRAME_ID)
+        total += np.where(enhanced, pids, 0).astype(np.uint32)
+    total = (total & 0xFF) + (total >> 8)
+    total = (total & 0xFF) + (total >> 8)
+    return (0xFF - total).astype(np.uint8)
+
+def encode_frames(frame_ids, data, checksum_model=CHECKSUM_ENHANCED):
+    """
+    Encode many frames with the same data length at once
+    
+    Args:
+        frame_ids: 1-D array of 6-bit frame IDs
+        data: 2-D uint8 array, one row of data bytes per frame
+        checksum_model: CHECKSUM_ENHANCED (LIN 2.x) or CHECKSUM_CLASSIC (LIN 1.x)
+    
+    Returns:
+        ndarray: 2-D uint8 array of raw frames (break, sync, PID, data, checksum)
+    """
+    frame_ids = np.asarray(frame_ids)
+    data = np.asarray(data, dtype=np.uint8)
+    if data.ndim != 2 or len(data) != len(frame_ids):
+        raise ValueError("data must be a 2-D array with one row per frame ID")
+    if data.shape[1] > MAX_FRAME_DATA_LENGTH:
+        raise ValueError(f"Data length exceeds maximum of {MAX_FRAME_DATA_LENGTH} bytes")
+    if np.any((frame_ids < 0) | (frame_ids > 0x3F)):
+        raise ValueError("Frame ID must be 6 bits (0-63)")
+    
+    pids = PID_TABLE_ARRAY[frame_ids]
+    frames = np.empty((len(data), PID_OFFSET + 2 + data.shape[1]), dtype=np.uint8)
+    frames[:, 0] = BREAK_BYTE
+    frames[:, 1] = SYNC_BYTE
+    frames[:, PID_OFFSET] = pids
+    frames[:, PID_OFFSET + 1:-1] = data
+    frames[:, -1] = _checksums(pids, data, checksum_model)
+    return frames
+
+def decode_frames(frames, pid_offset=PID_OFFSET, checksum_model=CHECKSUM_ENHANCED):
+    """
+    Validate many raw frames with the same data length at once
+    
+    Args:
+        frames: 2-D uint8 array, one raw frame per row ending with the checksum
+        pid_offset: Column of the PID (2 for break, sync, PID, ...)
+        checksum_model: CHECKSUM_ENHANCED (LIN 2.x) or CHECKSUM_CLASSIC (LIN 1.x)
+    
+    Returns:
+        tuple: (frame_ids, parity_ok, checksum_ok) arrays, one entry per frame
+    """
+    frames = np.asarray(frames, dtype=np.uint8)
+    if frames.ndim != 2 or frames.shape[1] < pid_offset + 2:
+        raise ValueError("frames must be a 2-D array with a PID and checksum column")
+    
+    pids = frames[:, pid_offset]
+    frame_ids = pids & 0x3F
+    parity_ok = PID_TO_ID_ARRAY[pids] != INVALID_PID
+    checksum_ok = _checksums(pids, frames[:, pid_offset + 1:-1], checksum_model) == frames[:, -1]
+    return frame_ids, parity_ok, checksum_ok
+
+def find_headers(buffer):
+    """
+    Find the start of every break/sync pair in a captured byte stream
+    
+    Args:
+        buffer: bytes-like object or 1-D uint8 array
+    
+    Returns:
+        ndarray: Offsets of the break bytes
+    """
+    raw = np.frombuffer(buffer, dtype=np.uint8) if not isinstance(buffer, np.ndarray) else buffer
+    return np.flatnonzero((raw[:-1] == BREAK_BYTE) & (raw[1:] == SYNC_BYTE))
+
+def decode_buffer(buffer, offsets, data_length, pid_offset=PID_OFFSET,
+                  checksum_model=CHECKSUM_ENHANCED):
+    """
+    Validate frames stored in a flat byte buffer
+    
+    Args:
+        buffer: bytes-like object or 1-D uint8 array with the captured stream
+        offsets: Start offset of each frame (e.g. from find_headers)
+        data_length: Number of data bytes per frame
+        pid_offset: Offset of the PID from the frame start
+        checksum_model: CHECKSUM_ENHANCED (LIN 2.x) or CHECKSUM_CLASSIC (LIN 1.x)
+    
+    Returns:
+        tuple: (frame_ids, parity_ok, checksum_ok) arrays, one entry per offset
+    
+    Raises:
+        ValueError: If a frame runs past the end of the buffer
+    """
+    raw = np.frombuffer(buffer, dtype=np.uint8) if not isinstance(buffer, np.ndarray) else buffer
+    offsets = np.asarray(offsets, dtype=np.intp)
+    width = pid_offset + data_length + 2
+    if len(offsets) and offsets.max() + width > len(raw):
+        raise ValueError("Frame extends past the end of the buffer")
+    frames = raw[offsets[:, None] + np.arange(width)]
+    return decode_frames(frames, pid_offset, checksum_model)
@@ -2,8 +2,22 @@
 DEFAULT_SERIAL_PORT = '/dev/serial0'
 DEFAULT_BAUD_RATE = 19200
 DEFAULT_WAKEUP_PIN = 18
+DEFAULT_BYTE_TIMEOUT = 0.1
+DEFAULT_FRAME_TIMEOUT = 1.0
+DEFAULT_RESPONSE_TIMEOUT = 0.02
+DEFAULT_INTER_FRAME_SPACE = 0.001
+BUS_SLEEP_TIMEOUT = 4.0  # LIN goes to sleep after 4s of bus inactivity
 
 # LIN Frame constants
 SYNC_BYTE = 0x55
 BREAK_BYTE = 0x00
-MAX_FRAME_DATA_LENGTH = 8
\ No newline at end of file
+MAX_FRAME_DATA_LENGTH = 8
+
+# Checksum models
+CHECKSUM_CLASSIC = 'classic'    # LIN 1.x, data bytes only
+CHECKSUM_ENHANCED = 'enhanced'  # LIN 2.x, PID and data bytes
+
+# Diagnostic frames
+MASTER_REQUEST_FRAME_ID = 0x3C
+SLAVE_RESPONSE_FRAME_ID = 0x3D
+GO_TO_SLEEP_DATA = bytes([0x00] + [0xFF] * 7)
\ No newline at end of file
@@ -1,12 +1,14 @@
-import serial
 import time
-import RPi.GPIO as GPIO
 from .constants import *
 from .exceptions import *
+from .codec import calculate_pid, frame_checksum
+from .transport import wait_readable, open_serial, load_gpio
 
 class LINMaster:
     def __init__(self, serial_port=DEFAULT_SERIAL_PORT, baud_rate=DEFAULT_BAUD_RATE, 
-                 wakeup_pin=DEFAULT_WAKEUP_PIN):
+                 wakeup_pin=DEFAULT_WAKEUP_PIN, inter_frame_space=DEFAULT_INTER_FRAME_SPACE,
+                 bus_sleep_timeout=BUS_SLEEP_TIMEOUT, checksum_model=CHECKSUM_ENHANCED,
+                 transport=None, gpio=None):
         """
         Initialize LIN Master controller
         
@@ -14,17 +16,32 @@ class LINMaster:
             serial_port: Serial port device path
             baud_rate: Communication baud rate
             wakeup_pin: GPIO pin for slave wakeup signal
+            inter_frame_space: Seconds to idle after each frame (0 to disable)
+            bus_sleep_timeout: Seconds of inactivity after which the bus is asleep
+            checksum_model: CHECKSUM_ENHANCED (LIN 2.x) or CHECKSUM_CLASSIC (LIN 1.x)
+            transport: Already opened serial-like object to use instead of serial_port
+            gpio: GPIO module to use instead of RPi.GPIO (e.g. transport.NullGPIO())
         """
-        self.ser = serial.Serial(serial_port, baudrate=baud_rate, timeout=0)
+        if transport is None:
+            transport = open_serial(serial_port, baud_rate, timeout=0)
+        self.ser = transport
+        self.gpio = gpio if gpio is not None else load_gpio()
         self.baud_rate = baud_rate
         self.sleep_time_per_bit = 1.0 / baud_rate
         self.wakeup_pin = wakeup_pin
+        self.inter_frame_space = inter_frame_space
+        self.bus_sleep_timeout = bus_sleep_timeout
+        self.checksum_model = checksum_model
+        self.last_frame_time = None
         
-        # Configure GPIO for slave wakeup
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setup(self.wakeup_pin, GPIO.OUT)
-        GPIO.output(self.wakeup_pin, GPIO.HIGH)
+        # Sync + PID + data + checksum, reused for every frame
+        self._tx_buffer = bytearray(2 + MAX_FRAME_DATA_LENGTH + 1)
         
+        # Configure GPIO for slave wakeup
+        self.gpio.setmode(self.gpio.BCM)
+        self.gpio.setup(self.wakeup_pin, self.gpio.OUT)
+        self.gpio.output(self.wakeup_pin, self.gpio.HIGH)
+    
     def send_break(self):
         """Send LIN break signal (13 bits of dominant + 1 bit recessive)"""
         # Switch to lower baud rate for break
@@ -34,7 +51,7 @@ class LINMaster:
         time.sleep(13 * (1.0 / (self.baud_rate // 4)))
         # Return to normal baud rate
         self.ser.baudrate = self.baud_rate
-        
+    
     @staticmethod
     def calculate_pid(frame_id):
         """
@@ -42,44 +59,68 @@ class LINMaster:
         
         Args:
             frame_id: 6-bit LIN frame ID (0-63)
-            
+        
         Returns:
             byte: PID with parity bits
         """
-        if frame_id > 0x3F:
-            raise ValueError("Frame ID must be 6 bits (0-63)")
-            
-        p0 = (frame_id ^ (frame_id >> 1) ^ (frame_id >> 2) ^ (frame_id >> 4)) & 0x01
-        p1 = ~((frame_id >> 1) ^ (frame_id >> 3) ^ (frame_id >> 4) ^ (frame_id >> 5)) & 0x01
-        return (frame_id & 0x3F) | (p0 << 6) | (p1 << 7)
+        return calculate_pid(frame_id)
     
     @staticmethod
     def calculate_checksum(pid, data):
         """
-        Calculate LIN 2.0 classic checksum
+        Calculate LIN 2.x enhanced checksum (PID included), classic for
+        the diagnostic frames 0x3C/0x3D as on the bus
         
         Args:
             pid: Protected Identifier byte
             data: Data bytes to include in checksum
-            
+        
         Returns:
             byte: Calculated checksum
         """
-        checksum = pid
-        for byte in data:
-            checksum += byte
-            if checksum > 0xFF:
-                checksum -= 0xFF
-        return (0xFF - checksum) & 0xFF
+        return frame_checksum(pid, data)
+    
+    def encode_frame(self, frame_id, data):
+        """
+        Encode sync, PID, data and checksum into the transmit buffer
+        
+        Args:
+            frame_id: 6-bit LIN frame ID (0-63)
+            data: Data bytes to send (max 8 bytes)
+        
+        Returns:
+            memoryview: Encoded frame, valid until the next encode_frame call
+        """
+        pid = calculate_pid(frame_id)
+        buffer = self._tx_buffer
+        buffer[0] = SYNC_BYTE
+        buffer[1] = pid
+        length = 2
+        if data:
+            length += len(data)
+            buffer[2:length] = data
+            buffer[length] = frame_checksum(pid, data, self.checksum_model)
+            length += 1
+        return memoryview(buffer)[:length]
+    
+    def bus_asleep(self):
+        """Return True if no frame was sent within bus_sleep_timeout"""
+        return (self.last_frame_time is None or
+                time.monotonic() - self.last_frame_time >= self.bus_sleep_timeout)
     
-    def send_frame(self, frame_id, data):
+    def send_frame(self, frame_id, data, wakeup=None):
         """
         Send complete LIN frame
         
+        The break is sent on its own (it needs the lower baud rate); sync,
+        PID, data and checksum then go out in a single write and flush.
+        
         Args:
             frame_id: 6-bit LIN frame ID (0-63)
             data: Data bytes to send (max 8 bytes)
-            
+            wakeup: True to always pulse the wakeup pin, False to never,
+                    None to pulse only when the bus is asleep
+        
         Raises:
             ValueError: If frame_id or data is invalid
         """
@@ -89,40 +130,74 @@ class LINMaster:
             raise ValueError(f"Data length exceeds maximum of {MAX_FRAME_DATA_LENGTH} bytes")
         
         # Wake up slave
-        self._wakeup_slave()
+        if wakeup or (wakeup is None and self.bus_asleep()):
+            self._wakeup_slave()
         
         # Send break
         self.send_break()
         
-        # Send sync
-        self.ser.write(bytes([SYNC_BYTE]))
+        # Send sync, PID, data and checksum
+        self.ser.write(self.encode_frame(frame_id, data))
         self.ser.flush()
+        self.last_frame_time = time.monotonic()
         
-        # Send PID
-        pid = self.calculate_pid(frame_id)
-        self.ser.write(bytes([pid]))
-        self.ser.flush()
+        # Inter-frame space
+        if self.inter_frame_space:
+            time.sleep(self.inter_frame_space)
+    
+    def request_frame(self, frame_id, data_length, timeout=DEFAULT_RESPONSE_TIMEOUT, wakeup=None):
+        """
+        Send a header and read the response published by a slave
         
-        # Send data if present
-        if data:
-            self.ser.write(data)
-            self.ser.flush()
-            
-            # Send checksum
-            checksum = self.calculate_checksum(pid, data)
-            self.ser.write(bytes([checksum]))
-            self.ser.flush()
+        Args:
+            frame_id: 6-bit LIN frame ID (0-63)
+            data_length: Number of data bytes the slave responds with
+            timeout: Seconds to wait for the response after the header
+            wakeup: Same as for send_frame
+        
+        Returns:
+            bytes: Response data, None if no complete response arrived
         
-        # Inter-byte space
-        time.sleep(0.001)
+        Raises:
+            ValueError: If frame_id or data_length is invalid
+            LINChecksumError: If the response checksum is wrong
+        """
+        if not 0 < data_length <= MAX_FRAME_DATA_LENGTH:
+            raise ValueError(f"Data length must be 1 to {MAX_FRAME_DATA_LENGTH} bytes")
+        self.ser.reset_input_buffer()
+        self.send_frame(frame_id, b'', wakeup=wakeup)
+        pid = calculate_pid(frame_id)
         
+        # On a single-wire bus our own header is read back before the response
+        echo = bytes([SYNC_BYTE, pid])
+        echo_stripped = False
+        deadline = time.monotonic() + timeout
+        response = bytearray()
+        while True:
+            if not echo_stripped:
+                index = response.find(echo, 0, 3)
+                if index >= 0 and not response[:index].strip(bytes([BREAK_BYTE])):
+                    del response[:index + 2]
+                    echo_stripped = True
+            if len(response) >= data_length + 1:
+                data = bytes(response[:data_length])
+                if frame_checksum(pid, data, self.checksum_model) == response[data_length]:
+                    return data
+            if not wait_readable(self.ser, deadline):
+                break
+            response += self.ser.read(self.ser.in_waiting or 1)
+        
+        if len(response) >= data_length + 1:
+            raise LINChecksumError(f"Response checksum error for frame 0x{frame_id:02X}")
+        return None
+    
     def _wakeup_slave(self, pulse_duration=0.01):
         """Send wakeup pulse to slave"""
-        GPIO.output(self.wakeup_pin, GPIO.LOW)
+        self.gpio.output(self.wakeup_pin, self.gpio.LOW)
         time.sleep(pulse_duration)
-        GPIO.output(self.wakeup_pin, GPIO.HIGH)
-        
+        self.gpio.output(self.wakeup_pin, self.gpio.HIGH)
+    
     def close(self):
         """Clean up resources"""
         self.ser.close()
-        GPIO.cleanup()
\ No newline at end of file
+        self.gpio.cleanup()
\ No newline at end of file
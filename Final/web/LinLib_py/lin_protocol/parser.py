@@ -0,0 +1,97 @@
+from .constants import *
+from .codec import INVALID_PID, PID_TO_ID, frame_checksum
+
+HEADER = bytes([BREAK_BYTE, SYNC_BYTE])
+
+class LINFrameParser:
+    def __init__(self, data_length=3, data_lengths=None, checksum_model=CHECKSUM_ENHANCED):
+        """
+        Streaming LIN frame parser
+        
+        Bytes can be fed in chunks of any size, e.g. the result of one
+        ser.read(ser.in_waiting). A frame split across two chunks is kept
+        until the rest arrives, and after a parity or checksum error the
+        parser resyncs on the next break/sync pair inside the same buffer,
+        so no bytes are dropped.
+        
+        Args:
+            data_length: Number of data bytes for frame IDs not in data_lengths
+            data_lengths: Optional dict of frame_id -> number of data bytes
+            checksum_model: CHECKSUM_ENHANCED (LIN 2.x) or CHECKSUM_CLASSIC (LIN 1.x)
+        """
+        self.data_length = data_length
+        self.data_lengths = dict(data_lengths or {})
+        self.checksum_model = checksum_model
+        self._buffer = bytearray()
+        
+        # Statistics
+        self.frames = 0
+        self.parity_errors = 0
+        self.checksum_errors = 0
+        self.discarded_bytes = 0
+    
+    def data_length_for(self, frame_id):
+        """Return the number of data bytes expected for frame_id"""
+        return self.data_lengths.get(frame_id, self.data_length)
+    
+    def reset(self):
+        """Drop any partially received frame"""
+        self.discarded_bytes += len(self._buffer)
+        self._buffer.clear()
+    
+    def feed(self, chunk):
+        """
+        Feed received bytes into the parser
+        
+        Args:
+            chunk: bytes/bytearray/memoryview read from the bus
+        
+        Returns:
+            list: (frame_id, data) tuples for every complete, valid frame
+        """
+        buffer = self._buffer
+        buffer += chunk
+        size = len(buffer)
+        frames = []
+        pos = 0
+        
+        while True:
+            start = buffer.find(HEADER, pos)
+            if start < 0:
+                # Keep a trailing break byte, its sync may be in the next chunk
+                keep = size - 1 if size and buffer[-1] == BREAK_BYTE else size
+                keep = max(keep, pos)
+                self.discarded_bytes += keep - pos
+                pos = keep
+                break
+            self.discarded_bytes += start - pos
+            if size - start < 3:
+                pos = start
+                break
+            
+            pid = buffer[start + 2]
+            frame_id = PID_TO_ID[pid]
+            if frame_id == INVALID_PID:
+                self.parity_errors += 1
+                pos = start + 1
+                continue
+            
+            data_length = self.data_length_for(frame_id)
+            # Header-only frames (no data) carry no checksum
+            end = start + 3 + data_length + (1 if data_length else 0)
+            if end > size:
+                pos = start
+                break
+            
+            data = bytes(buffer[start + 3:start + 3 + data_length])
+            if data_length and frame_checksum(pid, data, self.checksum_model) != buffer[end - 1]:
+                self.checksum_errors += 1
+                pos = start + 1
+                continue
+            
+            frames.append((frame_id, data))
+            self.frames += 1
+            pos = end
+        
+        del buffer[:pos]
+        return frames
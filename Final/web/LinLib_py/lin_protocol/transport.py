@@ -0,0 +1,165 @@
+"""
+Serial/GPIO backends for LINMaster and LINSlave.
+
+By default the master and slave open a pyserial port and use RPi.GPIO.
+Both can be replaced through the transport= and gpio= arguments, e.g.
+with a virtual bus to run them on a machine without LIN hardware:
+    
+    master_port, slave_port = virtual_serial_pair(19200)
+    master = LINMaster(transport=master_port, gpio=NullGPIO())
+    slave = LINSlave(transport=slave_port, gpio=NullGPIO())
+"""
+import fcntl
+import select
+import socket
+import struct
+import termios
+import time
+from .constants import *
+
+def wait_readable(ser, deadline):
+    """
+    Sleep until the serial port has data or the deadline passes
+    
+    Args:
+        ser: Serial port (anything with in_waiting and fileno())
+        deadline: time.monotonic() value to give up at, None to wait forever
+    
+    Returns:
+        bool: True if data is available, False on timeout
+    """
+    if ser.in_waiting:
+        return True
+    while True:
+        if deadline is None:
+            remaining = None
+        else:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+        try:
+            readable, _, _ = select.select([ser.fileno()], [], [], remaining)
+        except InterruptedError:
+            continue
+        if readable:
+            return True
+
+def open_serial(serial_port, baud_rate, timeout):
+    """Open a pyserial port (imported here so virtual buses don't need it)"""
+    import serial
+    return serial.Serial(serial_port, baudrate=baud_rate, timeout=timeout)
+
+def load_gpio():
+    """Return the RPi.GPIO module (imported here so virtual buses don't need it)"""
+    import RPi.GPIO as GPIO
+    return GPIO
+
+class NullGPIO:
+    """RPi.GPIO stand-in that ignores every call, for use off the Pi"""
+    BCM = 11
+    BOARD = 10
+    OUT = 0
+    IN = 1
+    LOW = 0
+    HIGH = 1
+    PUD_UP = 22
+    PUD_DOWN = 21
+    
+    def setmode(self, mode):
+        pass
+    
+    def setwarnings(self, flag):
+        pass
+    
+    def setup(self, pin, direction, pull_up_down=None, initial=None):
+        pass
+    
+    def output(self, pin, value):
+        pass
+    
+    def input(self, pin):
+        return self.HIGH
+    
+    def cleanup(self, pin=None):
+        pass
+
+class VirtualSerial:
+    def __init__(self, sock, baud_rate=DEFAULT_BAUD_RATE, timeout=None):
+        """
+        One end of a virtual LIN bus with the pyserial calls lin_protocol uses
+        
+        Writes are paced to the baud rate (10 bits per byte) and reach the
+        other end only once they would have left the UART, so timings are
+        close to a real 8N1 line.
+        
+        Args:
+            sock: Connected stream socket (see virtual_serial_pair)
+            baud_rate: Initial baud rate
+            timeout: Read timeout in seconds, None to block, 0 to not wait
+        """
+        self.sock = sock
+        self.sock.setblocking(False)
+        self.baudrate = baud_rate
+        self.timeout = timeout
+        self.is_open = True
+        self.bytes_written = 0
+        self._tx_free_at = 0.0
+    
+    def fileno(self):
+        return self.sock.fileno()
+    
+    @property
+    def in_waiting(self):
+        count = fcntl.ioctl(self.sock.fileno(), termios.FIONREAD, b'\0\0\0\0')
+        return struct.unpack('i', count)[0]
+    
+    def read(self, size=1):
+        """Read up to size bytes, waiting at most timeout for all of them"""
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        data = bytearray()
+        while len(data) < size:
+            try:
+                chunk = self.sock.recv(size - len(data))
+            except BlockingIOError:
+                chunk = None
+            if chunk:
+                data += chunk
+                continue
+            if chunk == b'' or not wait_readable(self, deadline):
+                break
+        return bytes(data)
+    
+    def write(self, data):
+        """Send data after the time it takes to shift it out at the baud rate"""
+        now = time.monotonic()
+        done_at = max(now, self._tx_free_at) + len(data) * 10.0 / self.baudrate
+        if done_at > now:
+            time.sleep(done_at - now)
+        self._tx_free_at = done_at
+        self.sock.sendall(data)
+        self.bytes_written += len(data)
+        return len(data)
+    
+    def flush(self):
+        # write() only returns once the bytes are on the bus
+        pass
+    
+    def reset_input_buffer(self):
+        while self.in_waiting:
+            self.sock.recv(self.in_waiting)
+    
+    def close(self):
+        if self.is_open:
+            self.sock.close()
+            self.is_open = False
+
+def virtual_serial_pair(baud_rate=DEFAULT_BAUD_RATE):
+    """
+    Create a point-to-point virtual LIN bus
+    
+    Returns:
+        tuple: (master_end, slave_end) VirtualSerial objects
+    """
+    master_sock, slave_sock = socket.socketpair()
+    return (VirtualSerial(master_sock, baud_rate, timeout=0),
+            VirtualSerial(slave_sock, baud_rate, timeout=DEFAULT_BYTE_TIMEOUT))
\ No newline at end of file
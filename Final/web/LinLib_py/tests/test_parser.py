@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Behaviour checks for LINFrameParser, no serial port needed.
+
+Run from the LinLib_py directory:
+    python3 -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lin_protocol import LINFrameParser, calculate_pid, frame_checksum
+from lin_protocol.constants import BREAK_BYTE, SYNC_BYTE, CHECKSUM_CLASSIC, CHECKSUM_ENHANCED
+
+def frame(frame_id, data, model=CHECKSUM_ENHANCED):
+    """Bytes of a frame as they arrive on the bus (break, sync, PID, data, checksum)"""
+    pid = calculate_pid(frame_id)
+    checksum = [frame_checksum(pid, data, model)] if data else []
+    return bytes([BREAK_BYTE, SYNC_BYTE, pid]) + bytes(data) + bytes(checksum)
+
+class FeedTest(unittest.TestCase):
+    def setUp(self):
+        self.parser = LINFrameParser(data_length=3)
+
+    def test_whole_frames(self):
+        frames = self.parser.feed(frame(0x10, [1, 2, 3]) + frame(0x20, [4, 5, 6]))
+        self.assertEqual(frames, [(0x10, b'\x01\x02\x03'), (0x20, b'\x04\x05\x06')])
+        self.assertEqual(self.parser.frames, 2)
+        self.assertEqual(self.parser.discarded_bytes, 0)
+
+    def test_frame_split_byte_by_byte(self):
+        raw = frame(0x10, [1, 2, 3])
+        frames = []
+        for i in range(len(raw)):
+            frames += self.parser.feed(raw[i:i + 1])
+        self.assertEqual(frames, [(0x10, b'\x01\x02\x03')])
+
+    def test_break_at_end_of_chunk_is_kept(self):
+        raw = b'\x77' + frame(0x10, [1, 2, 3])
+        self.assertEqual(self.parser.feed(raw[:2]), [])
+        self.assertEqual(self.parser.feed(raw[2:]), [(0x10, b'\x01\x02\x03')])
+        self.assertEqual(self.parser.discarded_bytes, 1)
+
+    def test_resync_after_checksum_error(self):
+        bad = bytearray(frame(0x10, [1, 2, 3]))
+        bad[-1] ^= 0xFF
+        frames = self.parser.feed(bytes(bad) + frame(0x11, [7, 8, 9]))
+        self.assertEqual(frames, [(0x11, b'\x07\x08\x09')])
+        self.assertEqual(self.parser.checksum_errors, 1)
+
+    def test_resync_after_parity_error(self):
+        bad = bytearray(frame(0x10, [1, 2, 3]))
+        bad[2] ^= 0x80  # Flip a parity bit of the PID
+        frames = self.parser.feed(bytes(bad) + frame(0x11, [7, 8, 9]))
+        self.assertEqual(frames, [(0x11, b'\x07\x08\x09')])
+        self.assertEqual(self.parser.parity_errors, 1)
+
+    def test_reset_drops_partial_frame(self):
+        raw = frame(0x10, [1, 2, 3])
+        self.parser.feed(raw[:4])
+        self.parser.reset()
+        self.assertEqual(self.parser.feed(raw[4:]), [])
+        self.assertEqual(self.parser.feed(raw), [(0x10, b'\x01\x02\x03')])
+
+class DataLengthTest(unittest.TestCase):
+    def test_per_frame_id_lengths(self):
+        parser = LINFrameParser(data_length=3, data_lengths={0x3C: 8, 0x05: 0})
+        raw = frame(0x3C, range(8)) + frame(0x05, []) + frame(0x10, [1, 2, 3])
+        self.assertEqual(parser.feed(raw), [(0x3C, bytes(range(8))), (0x05, b''), (0x10, b'\x01\x02\x03')])
+
+    def test_classic_checksum(self):
+        parser = LINFrameParser(data_length=2, checksum_model=CHECKSUM_CLASSIC)
+        self.assertEqual(parser.feed(frame(0x10, [0xF0, 0x20], CHECKSUM_CLASSIC)), [(0x10, b'\xf0\x20')])
+        self.assertEqual(parser.feed(frame(0x10, [0xF0, 0x20], CHECKSUM_ENHANCED)), [])
+        self.assertEqual(parser.checksum_errors, 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Behaviour checks for LINScheduler with a recording master, no serial port needed.
+
+Run from the LinLib_py directory:
+    python3 -m unittest discover tests
+"""
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lin_protocol import LINScheduler, ScheduleSlot, LINFrameError
+
+SLOT = 0.002
+
+class RecordingMaster:
+    """LINMaster stand-in keeping the frames sent, failing the frame_ids in fail"""
+    def __init__(self, responses=None, fail=()):
+        self.sent = []
+        self.responses = dict(responses or {})
+        self.fail = set(fail)
+        self.lock = threading.Lock()
+
+    def send_frame(self, frame_id, data):
+        if frame_id in self.fail:
+            raise LINFrameError(f"frame {frame_id} failed")
+        with self.lock:
+            self.sent.append((frame_id, bytes(data)))
+
+    def request_frame(self, frame_id, length):
+        return self.responses.get(frame_id)
+
+    def frames(self, frame_id):
+        with self.lock:
+            return [data for sent_id, data in self.sent if sent_id == frame_id]
+
+class SchedulerTest(unittest.TestCase):
+    def run_scheduler(self, master, tables, **kwargs):
+        scheduler = LINScheduler(master, tables, **kwargs)
+        scheduler.start()
+        self.addCleanup(scheduler.stop)
+        return scheduler
+
+class PostTest(SchedulerTest):
+    def test_posted_frames_are_all_sent_in_order(self):
+        master = RecordingMaster()
+        scheduler = LINScheduler(master, {'normal': [ScheduleSlot(0x20, SLOT, sporadic=True)]})
+        # Posted faster than the slot runs: none may be replaced by a newer one
+        for i in range(10):
+            scheduler.post(0x20, [i])
+        scheduler.start()
+        self.addCleanup(scheduler.stop)
+        self.assertTrue(scheduler.flush(timeout=1.0))
+        self.assertEqual(master.frames(0x20), [bytes([i]) for i in range(10)])
+
+    def test_sporadic_slot_is_skipped_without_post(self):
+        master = RecordingMaster()
+        slot = ScheduleSlot(0x20, SLOT, sporadic=True)
+        scheduler = self.run_scheduler(master, {'normal': [slot]})
+        self.assertTrue(scheduler.flush(timeout=1.0))
+        threading.Event().wait(10 * SLOT)
+        self.assertEqual(master.sent, [])
+        self.assertGreater(slot.skipped, 0)
+
+    def test_unconditional_slot_repeats_last_posted(self):
+        master = RecordingMaster()
+        scheduler = self.run_scheduler(master, {'normal': [ScheduleSlot(0x10, SLOT, data=b'\x00')]})
+        scheduler.post(0x10, b'\x01')
+        scheduler.post(0x10, b'\x02')
+        self.assertTrue(scheduler.flush(timeout=1.0))
+        threading.Event().wait(10 * SLOT)
+        frames = master.frames(0x10)
+        # Default data until the posts, both posts in order, then the last one repeated
+        start = frames.index(b'\x01')
+        self.assertEqual(set(frames[:start]), {b'\x00'} if start else set())
+        self.assertEqual(frames[start + 1], b'\x02')
+        self.assertEqual(set(frames[start + 1:]), {b'\x02'})
+
+    def test_callable_data(self):
+        master = RecordingMaster()
+        scheduler = self.run_scheduler(master, {'normal': [ScheduleSlot(0x10, SLOT, data=lambda: b'\x05')]})
+        threading.Event().wait(5 * SLOT)
+        scheduler.stop()
+        self.assertTrue(master.frames(0x10))
+        self.assertEqual(set(master.frames(0x10)), {b'\x05'})
+
+    def test_post_rejects_long_data(self):
+        scheduler = LINScheduler(RecordingMaster(), {'normal': []})
+        with self.assertRaises(ValueError):
+            scheduler.post(0x10, bytes(9))
+
+    def test_flush_returns_after_send_error(self):
+        master = RecordingMaster(fail={0x20})
+        slot = ScheduleSlot(0x20, SLOT, sporadic=True)
+        scheduler = self.run_scheduler(master, {'normal': [slot]})
+        scheduler.post(0x20, b'\x01')
+        self.assertTrue(scheduler.flush(timeout=1.0))
+        self.assertEqual(slot.errors, 1)
+        self.assertIsInstance(scheduler.last_error, LINFrameError)
+
+class ResponseTest(SchedulerTest):
+    def test_on_response_and_no_response(self):
+        received = []
+        answered = ScheduleSlot(0x30, SLOT, response_length=2,
+                                on_response=lambda frame_id, data: received.append((frame_id, data)))
+        silent = ScheduleSlot(0x31, SLOT, response_length=2)
+        scheduler = self.run_scheduler(RecordingMaster(responses={0x30: b'\x01\x02'}),
+                                       {'normal': [answered, silent]})
+        threading.Event().wait(10 * SLOT)
+        scheduler.stop()
+        self.assertTrue(received)
+        self.assertEqual(set(received), {(0x30, b'\x01\x02')})
+        self.assertEqual(answered.sent, len(received))
+        self.assertGreater(silent.no_response, 0)
+
+class TableTest(SchedulerTest):
+    def test_switch_table(self):
+        master = RecordingMaster()
+        tables = {'normal': [ScheduleSlot(0x10, SLOT, data=b'\x01')],
+                  'fast': [ScheduleSlot(0x11, SLOT, data=b'\x02')]}
+        scheduler = self.run_scheduler(master, tables)
+        threading.Event().wait(5 * SLOT)
+        scheduler.switch_table('fast')
+        threading.Event().wait(10 * SLOT)
+        scheduler.stop()
+        self.assertEqual(scheduler.current_table, 'fast')
+        self.assertTrue(master.frames(0x11))
+        # Nothing of the old table once the new one started
+        first_fast = next(i for i, (frame_id, _) in enumerate(master.sent) if frame_id == 0x11)
+        self.assertNotIn(0x10, [frame_id for frame_id, _ in master.sent[first_fast:]])
+
+    def test_unknown_table(self):
+        with self.assertRaises(ValueError):
+            LINScheduler(RecordingMaster(), {'normal': []}, initial_table='sleep')
+        scheduler = LINScheduler(RecordingMaster(), {'normal': []})
+        with self.assertRaises(ValueError):
+            scheduler.switch_table('sleep')
+
+if __name__ == "__main__":
+    unittest.main()
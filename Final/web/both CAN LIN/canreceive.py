@@ -1,4 +1,8 @@
 #!/usr/bin/env python3
+import os
+import sys
+# lin_protocol is the library in Final/web/LinLib_py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'LinLib_py'))
 from lin_protocol import LINSlave
 import can
 import RPi.GPIO as GPIO
@@ -1,8 +1,15 @@
 #!/usr/bin/env python3
+import os
+import sys
+# lin_protocol is the library in Final/web/LinLib_py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'LinLib_py'))
 from lin_protocol import LINMaster
 import can
 import time
 from pymongo import MongoClient
+# Modules shared between the scripts live in Final/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from sensor_writer import SensorWriter
 import logging
 import board
 import adafruit_dht
@@ -34,6 +41,8 @@ class WiperController:
         self.db = self.mongo_client.CAN_LIN_wiper777
         self.commands_collection = self.db.commands
         self.sensor_collection = self.db.sensors
+        # Sensor documents are inserted in batches by a background thread
+        self.sensor_writer = SensorWriter(self.sensor_collection)
         self.dht = adafruit_dht.DHT11(board.D17)
         
         # State variables
@@ -102,7 +111,7 @@ class WiperController:
                         'humidity': humidity,
                         'timestamp': datetime.utcnow()
                     }
-                    self.sensor_collection.insert_one(sensor_data)
+                    self.sensor_writer.write(sensor_data)
                     logging.info(f"Sensor data: Temp={temp}C, Humidity={humidity}%")
                     
                     previous_mode = self.is_automatic_mode
@@ -183,6 +192,8 @@ class WiperController:
             self._send_stop_command('CAN')
             self.lin_master.close()
             self.can_bus.shutdown()
+            self.sensor_writer.close()
+            logging.info(f"Sensor writer stats: {self.sensor_writer.stats()}")
             self.mongo_client.close()
             try:
                 self.dht.exit()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+# Benchmark of the button scan loop on a simulated 74HC165 chain: the old
+# unpaced while True loop of check_and_send() against ButtonScanner at
+# SCAN_FREQUENCY, comparing CPU time, scans per second, scan duration,
+# start jitter and how long a press takes to be reported.
+#
+# Run from this directory (no Pi needed):
+#     python3 bench_button_scanner.py
+import threading
+from time import monotonic, process_time, sleep
+from button_scanner import ShiftRegisterReader, SimulatedShiftRegister, ButtonScanner, Histogram
+
+DATA, SHIFT_LOAD_BAR, CLOCK = 31, 16, 18
+DURATION = 2.0
+SCAN_FREQUENCY = 200
+DEBOUNCE_SCANS = 3
+PRESSES = 20
+
+def make_reader():
+    gpio = SimulatedShiftRegister(DATA, SHIFT_LOAD_BAR, CLOCK)
+    return gpio, ShiftRegisterReader(gpio, DATA, SHIFT_LOAD_BAR, CLOCK)
+
+def press_buttons(gpio, pressed_at):
+    """press and release a button every DURATION / PRESSES seconds"""
+    for i in range(PRESSES):
+        sleep(DURATION / PRESSES / 2)
+        pressed_at.append(monotonic())
+        gpio.pressed[i % 40] = 1
+        sleep(DURATION / PRESSES / 2)
+        gpio.pressed[i % 40] = 0
+
+def run_old():
+    gpio, reader = make_reader()
+    pressed_at, reported_at = [], []
+    duration = Histogram([50, 100, 200, 500, 1000, 2000, 5000])
+    presser = threading.Thread(target=press_buttons, args=(gpio, pressed_at))
+    scans = 0
+    cpu = process_time()
+    presser.start()
+    end = monotonic() + DURATION
+    while monotonic() < end:
+        start = monotonic()
+        list_status = reader.read()
+        duration.add(monotonic() - start)
+        scans += 1
+        if 1 in list_status and len(reported_at) < len(pressed_at):
+            reported_at.append(monotonic())
+    cpu = process_time() - cpu
+    presser.join()
+    return scans, cpu, duration, None, pressed_at, reported_at
+
+def run_scanner():
+    gpio, reader = make_reader()
+    pressed_at, reported_at = [], []
+    def on_change(state, edges):
+        if any(value for _, value in edges):
+            reported_at.append(monotonic())
+    scanner = ButtonScanner(reader, frequency=SCAN_FREQUENCY, debounce_scans=DEBOUNCE_SCANS, on_change=on_change)
+    presser = threading.Thread(target=press_buttons, args=(gpio, pressed_at))
+    cpu = process_time()
+    presser.start()
+    threading.Timer(DURATION, scanner.stop).start()
+    scanner.run()
+    cpu = process_time() - cpu
+    presser.join()
+    return scanner.scans, cpu, scanner.scan_duration, scanner.jitter, pressed_at, reported_at
+
+def report(name, scans, cpu, duration, jitter, pressed_at, reported_at):
+    latencies = sorted(r - p for p, r in zip(pressed_at, reported_at))
+    print(f"{name}")
+    print(f"  scans/s {scans / DURATION:10.0f}   CPU {cpu / DURATION * 100:5.1f}% of a core")
+    print(f"  scan duration {duration.summary()}")
+    if jitter is not None:
+        print(f"  jitter        {jitter.summary()}")
+    if latencies:
+        print(f"  press reported after p50 {latencies[len(latencies) // 2] * 1e3:.2f} ms, "
+              f"max {latencies[-1] * 1e3:.2f} ms ({len(latencies)}/{PRESSES} presses)")
+
+def main():
+    report("old while True loop", *run_old())
+    report(f"ButtonScanner {SCAN_FREQUENCY} Hz, debounce {DEBOUNCE_SCANS} scans", *run_scanner())
+
+if __name__ == "__main__":
+    main()
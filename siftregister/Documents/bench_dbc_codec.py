@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# Benchmark of the DBC codec layer against the raw cantools calls that
+# main_program.py used before (get_message_by_name + gather_signals +
+# encode for every slave message on every button press, and
+# db.decode_message for every received frame). The codec side sends through
+# TransmitManager on a virtual bus, like main_program.py does on can0.
+#
+# Run from this directory (needs cantools and python-can, no Pi or CAN bus):
+#     python3 bench_dbc_codec.py
+import os
+import random
+from timeit import timeit
+import can
+import cantools
+from dbc_codec import DBCCodec
+from can_transmit import TransmitManager
+
+DBC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Heni', 'my_can_data_base.dbc')
+ROUNDS = 2000
+
+db = cantools.database.load_file(DBC_PATH)
+codec = DBCCodec(DBC_PATH)
+
+# same selection of slave messages and signals as main_program.py
+slave_message_name = [msg.name for msg in db.messages if msg.name.endswith(("Slave", "Block", "Status"))]
+all_slave_signals = dict()
+for msg in db.messages:
+    if msg.name in slave_message_name:
+        all_slave_signals.update(dict.fromkeys(msg.signal_tree, 0))
+# button signal -> highest value it can take (1 bit switches only take 1)
+button_signals = {signal.name: min(4, 2 ** signal.length - 1)
+                  for msg in db.messages if msg.name in slave_message_name
+                  for signal in msg.signals if 'Switch' in signal.name}
+
+transmitter = TransmitManager(can.interface.Bus('bench', interface='virtual'), codec,
+                              slave_message_name, cycle_time=None)
+
+# one payload of every message to decode
+frames = [(msg.frame_id, msg.encode(dict.fromkeys(msg.signal_tree, 0))) for msg in db.messages]
+
+def press_button():
+    """change one button signal, like update_button_signals does"""
+    name = random.choice(list(button_signals))
+    all_slave_signals[name] = random.randint(1, button_signals[name])
+
+def raw_send():
+    sent = 0
+    for msg_name in slave_message_name:
+        the_message = db.get_message_by_name(msg_name)
+        the_required_signals = the_message.gather_signals(all_slave_signals)
+        the_message.encode(the_required_signals, msg_name)
+        sent += 1
+    return sent
+
+def codec_send():
+    return transmitter.send_changed(all_slave_signals)
+
+def raw_decode():
+    for frame_id, data in frames:
+        db.decode_message(frame_id, data, decode_choices=False)
+
+def codec_decode():
+    for frame_id, data in frames:
+        codec.decode(frame_id, data)
+
+def report(name, seconds, calls, per):
+    print(f"{name:40s} {seconds / calls * 1e6:8.1f} us per {per}")
+
+def main():
+    print(f"{len(slave_message_name)} slave messages, {len(frames)} messages in the DBC\n")
+
+    # button held: the signals do not change between two presses
+    report("send, button held, cantools", timeit(raw_send, number=ROUNDS), ROUNDS, "press")
+    codec_send()
+    report("send, button held, codec", timeit(codec_send, number=ROUNDS), ROUNDS, "press")
+
+    # a different button every press: one message changes
+    random.seed(1)
+    report("send, new button, cantools",
+           timeit(lambda: (press_button(), raw_send()), number=ROUNDS), ROUNDS, "press")
+    random.seed(1)
+    report("send, new button, codec",
+           timeit(lambda: (press_button(), codec_send()), number=ROUNDS), ROUNDS, "press")
+    stats = transmitter.stats()
+    print(f"{'frames sent by the codec':40s} {stats['sent']} of {stats['sent'] + stats['suppressed']} "
+          f"(cantools path sends all)\n")
+
+    report("decode, db.decode_message", timeit(raw_decode, number=ROUNDS), ROUNDS * len(frames), "frame")
+    report("decode, codec", timeit(codec_decode, number=ROUNDS), ROUNDS * len(frames), "frame")
+    transmitter.bus.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+# Paced scanning of the 74HC165 button chain: the shift registers are read
+# at a fixed frequency, every button is debounced and only the changes are
+# handed to the consumer. Scan duration and start jitter are recorded.
+from bisect import bisect_left
+from time import monotonic, sleep
+
+
+class ShiftRegisterReader:
+    """
+    Bit-bang reader of the daisy-chained 74HC165 shift registers.
+
+    Parameters
+    ----------
+    - gpio : module
+        RPi.GPIO or any object with the same output/input functions
+        (see SimulatedShiftRegister).
+    - data : int
+        Pin of the serial data output.
+    - shift_load_bar : int
+        Pin of the Shift/Load Bar.
+    - clock : int
+        Pin of the clock.
+    - width : int, optional
+        Number of buttons in the chain.
+    """
+    def __init__(self, gpio, data: int, shift_load_bar: int, clock: int, width: int = 40):
+        self.gpio = gpio
+        self.data = data
+        self.shift_load_bar = shift_load_bar
+        self.clock = clock
+        self.width = width
+
+    def read(self) -> list[int]:
+        """
+        Read the state of all the buttons.
+
+        Returns
+        -------
+        - list(int)
+            0s and 1s, one per button.
+        """
+        output = self.gpio.output
+        input = self.gpio.input
+        data, clock = self.data, self.clock
+        buttons_state = [0] * self.width
+        # load the inputs, then switch to the shift mode
+        output(self.shift_load_bar, 0)
+        output(self.shift_load_bar, 1)
+        # the MSB comes out first
+        for i in range(self.width - 1, -1, -1):
+            buttons_state[i] = input(data)
+            output(clock, 0)
+            output(clock, 1)
+        return buttons_state
+
+
+class SimulatedShiftRegister:
+    """
+    Stand-in for RPi.GPIO emulating the 74HC165 chain, to run the scanner
+    without hardware.
+
+    Parameters
+    ----------
+    - data, shift_load_bar, clock : int
+        Same pins as given to the ShiftRegisterReader.
+    - width : int, optional
+        Number of buttons in the chain.
+    """
+    def __init__(self, data: int, shift_load_bar: int, clock: int, width: int = 40):
+        self.data = data
+        self.shift_load_bar = shift_load_bar
+        self.clock = clock
+        # state of the buttons, set it to simulate presses
+        self.pressed = [0] * width
+        self._register = []
+        self._position = 0
+        self._clock_level = 0
+
+    def output(self, pin: int, value: int):
+        if pin == self.shift_load_bar and value == 0:
+            # parallel load: the last button is shifted out first
+            self._register = self.pressed[::-1]
+            self._position = 0
+        elif pin == self.clock:
+            if value and not self._clock_level:
+                self._position += 1
+            self._clock_level = value
+
+    def input(self, pin: int) -> int:
+        if self._position < len(self._register):
+            return self._register[self._position]
+        return 0
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram of durations.
+
+    Parameters
+    ----------
+    - bounds_us : list(int)
+        Upper bounds of the buckets in microseconds, the last bucket takes
+        everything above.
+    """
+    def __init__(self, bounds_us: list[int]):
+        self.bounds = [bound / 1e6 for bound in bounds_us]
+        self.bounds_us = list(bounds_us)
+        self.counts = [0] * (len(bounds_us) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float):
+        """Add a duration in seconds."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> float:
+        """Upper bound (seconds) of the bucket holding the p-th percentile."""
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.max
+
+    def summary(self) -> str:
+        buckets = ", ".join(f"<={bound}us: {count}" for bound, count in zip(self.bounds_us, self.counts) if count)
+        if self.counts[-1]:
+            buckets += f", >{self.bounds_us[-1]}us: {self.counts[-1]}"
+        return (f"n={self.count} mean={self.mean() * 1e6:.0f}us p99<={self.percentile(99) * 1e6:.0f}us "
+                f"max={self.max * 1e6:.0f}us [{buckets}]")
+
+
+# bucket bounds in microseconds
+SCAN_DURATION_BUCKETS = [50, 100, 200, 500, 1000, 2000, 5000]
+JITTER_BUCKETS = [10, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class ButtonScanner:
+    """
+    Scan the buttons at a fixed frequency and report the debounced changes.
+
+    Parameters
+    ----------
+    - reader : ShiftRegisterReader
+        Anything with a read() returning a list of 0s and 1s.
+    - frequency : float, optional
+        Scans per second.
+    - debounce_scans : int, optional
+        Consecutive scans a button must read the same new value before the
+        change is accepted.
+    - on_change : callable, optional
+        Called as on_change(state, edges) with the debounced state and the
+        list of (index, value) that changed.
+    """
+    def __init__(self, reader, frequency: float = 200.0, debounce_scans: int = 3, on_change=None):
+        self.reader = reader
+        self.period = 1.0 / frequency
+        self.debounce_scans = debounce_scans
+        self.on_change = on_change
+        self.state = None
+        self._counts = None
+        self._next_scan = None
+        self.running = False
+        # statistics
+        self.scans = 0
+        self.changes = 0
+        self.overruns = 0
+        self.scan_duration = Histogram(SCAN_DURATION_BUCKETS)
+        self.jitter = Histogram(JITTER_BUCKETS)
+
+    def debounce(self, raw: list[int]) -> list[tuple[int, int]]:
+        """
+        Feed one raw reading to the debounce filter.
+
+        Returns
+        -------
+        - list(tuple(int, int))
+            (index, value) of the buttons whose debounced value changed.
+        """
+        if self.state is None:
+            # start with every button released so buttons held at start-up are reported
+            self.state = [0] * len(raw)
+            self._counts = [0] * len(raw)
+        state, counts = self.state, self._counts
+        edges = []
+        for i, value in enumerate(raw):
+            if value == state[i]:
+                counts[i] = 0
+                continue
+            counts[i] += 1
+            if counts[i] >= self.debounce_scans:
+                state[i] = value
+                counts[i] = 0
+                edges.append((i, value))
+        return edges
+
+    def scan(self) -> list[tuple[int, int]]:
+        """
+        Wait for the next scan slot, read the buttons and report the changes.
+
+        Returns
+        -------
+        - list(tuple(int, int))
+            (index, value) of the buttons whose debounced value changed.
+        """
+        now = monotonic()
+        if self._next_scan is None:
+            self._next_scan = now
+        elif now < self._next_scan:
+            sleep(self._next_scan - now)
+            now = monotonic()
+        self.jitter.add(now - self._next_scan)
+        raw = self.reader.read()
+        edges = self.debounce(raw)
+        self.scan_duration.add(monotonic() - now)
+        self.scans += 1
+        self._next_scan += self.period
+        if self._next_scan < monotonic():
+            # the scan slot was missed, start again from now instead of bursting
+            self.overruns += 1
+            self._next_scan = monotonic()
+        if edges:
+            self.changes += len(edges)
+            if self.on_change is not None:
+                self.on_change(list(self.state), edges)
+        return edges
+
+    def run(self, on_scan=None):
+        """
+        Scan until stop() is called.
+
+        Parameters
+        ----------
+        - on_scan : callable, optional
+            Called with no arguments after every scan (e.g. periodic sends).
+        """
+        self.running = True
+        while self.running:
+            self.scan()
+            if on_scan is not None:
+                on_scan()
+
+    def stop(self):
+        self.running = False
+
+    def stats(self) -> dict[str, object]:
+        """Return the scan counters and histogram summaries."""
+        return {'scans': self.scans,
+                'changes': self.changes,
+                'overruns': self.overruns,
+                'scan_duration': self.scan_duration.summary(),
+                'jitter': self.jitter.summary()}
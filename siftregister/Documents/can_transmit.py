@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+# Change-driven transmission of the slave messages: a message is sent when
+# its payload differs from the last one sent, and every message is repeated
+# as a heartbeat once per cycle time so the master still sees the slave.
+from time import monotonic
+import can # import the can module to send the can messages
+
+
+class TransmitManager:
+    """
+    Send the messages whose signals changed, plus periodic heartbeats.
+
+    Parameters
+    ----------
+    - bus : can.BusABC
+        The bus to send on.
+    - codec : dbc_codec.DBCCodec
+        Codec of the loaded DBC file.
+    - message_names : list(str)
+        Names of the messages this node transmits.
+    - cycle_time : float, optional
+        Seconds after which an unchanged message is sent again (None = never).
+    """
+    def __init__(self, bus, codec, message_names: list[str], cycle_time: float = 1.0):
+        self.bus = bus
+        self.codec = codec
+        self.message_names = list(message_names)
+        self.cycle_time = cycle_time
+        # message name -> last payload sent and when it was sent
+        self.last_sent = dict()
+        self.last_sent_time = dict()
+        # counters
+        self.sent = 0
+        self.suppressed = 0
+        self.heartbeats = 0
+        self.errors = 0
+
+    def _send(self, name: str, data: bytes, now: float) -> bool:
+        message = self.codec.by_name[name]
+        msg = can.Message(arbitration_id=message.frame_id, data=data, is_extended_id=False)
+        try:
+            self.bus.send(msg)
+        except can.CanError:
+            # not recorded as sent, so it is retried on the next call
+            self.errors += 1
+            return False
+        self.last_sent[name] = data
+        self.last_sent_time[name] = now
+        return True
+
+    def send_changed(self, signals: dict[str, int]) -> int:
+        """
+        Send every message whose payload differs from the last one sent.
+
+        Parameters
+        ----------
+        - signals : dict(str, int)
+            Values of all the signals.
+
+        Returns
+        -------
+        - int
+            Number of frames sent.
+        """
+        now = monotonic()
+        sent = 0
+        for name in self.message_names:
+            data = self.codec.by_name[name].encode(signals)
+            if self.last_sent.get(name) == data:
+                self.suppressed += 1
+            elif self._send(name, data, now):
+                sent += 1
+        self.sent += sent
+        return sent
+
+    def send_heartbeats(self) -> int:
+        """
+        Send again the messages that were not sent for cycle_time seconds.
+
+        Returns
+        -------
+        - int
+            Number of heartbeat frames sent.
+        """
+        if self.cycle_time is None:
+            return 0
+        now = monotonic()
+        sent = 0
+        for name in self.message_names:
+            if name not in self.last_sent:
+                continue
+            if now - self.last_sent_time[name] >= self.cycle_time:
+                if self._send(name, self.last_sent[name], now):
+                    sent += 1
+        self.heartbeats += sent
+        return sent
+
+    def stats(self) -> dict[str, int]:
+        """Return the transmit counters."""
+        return {'sent': self.sent,
+                'suppressed': self.suppressed,
+                'heartbeats': self.heartbeats,
+                'errors': self.errors}
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# Codec layer for the DBC messages: the DBC is loaded once, every message
+# gets its encoder/decoder prepared up front and the last payload of each
+# message is cached so unchanged messages are not re-encoded. Which frames
+# are sent is decided by can_transmit.TransmitManager.
+from functools import partial
+import cantools # import the cantools module to manipulate the DBC file
+
+
+class MessageCodec:
+    """
+    Prepared encoder/decoder for one DBC message.
+
+    Parameters
+    ----------
+    - message : cantools.database.can.Message
+        The message from the loaded DBC.
+    - strict : bool, optional
+        Check the signal ranges when encoding (only done when the values change).
+    """
+    def __init__(self, message, strict: bool = True):
+        self.message = message
+        self.name = message.name
+        self.frame_id = message.frame_id
+        self.signal_names = tuple(message.signal_tree)
+        # Messages whose signals all have scale 1 and offset 0 skip the scaling step
+        scaling = any(signal.scale != 1 or signal.offset != 0 for signal in message.signals)
+        self._encode = partial(message.encode, scaling=scaling, strict=strict)
+        self._decode = partial(message.decode, decode_choices=False, scaling=scaling)
+        # last encoded values and payload
+        self.last_values = None
+        self.last_data = None
+
+    def encode(self, signals: dict[str, int]) -> bytes:
+        """
+        Encode the message signals taken from a dictionary of all signals.
+
+        Parameters
+        ----------
+        - signals : dict(str, int)
+            Signal values, may contain signals of other messages.
+
+        Returns
+        -------
+        - bytes
+            The payload (the cached one if the values did not change).
+        """
+        values = tuple(signals[name] for name in self.signal_names)
+        if values == self.last_values:
+            return self.last_data
+        self.last_data = self._encode(dict(zip(self.signal_names, values)))
+        self.last_values = values
+        return self.last_data
+
+    def decode(self, data: bytes) -> dict[str, int]:
+        """Decode a payload of this message into a dictionary of signals."""
+        return self._decode(data)
+
+
+class DBCCodec:
+    """
+    All the messages of a DBC file keyed by name and by frame ID.
+
+    Parameters
+    ----------
+    - dbc_path : str
+        Path of the DBC file, loaded once here.
+    - strict : bool, optional
+        Passed to every MessageCodec.
+    """
+    def __init__(self, dbc_path: str, strict: bool = True):
+        self.db = cantools.database.load_file(dbc_path)
+        self.messages = [MessageCodec(message, strict) for message in self.db.messages]
+        self.by_name = {codec.name: codec for codec in self.messages}
+        self.by_frame_id = {codec.frame_id: codec for codec in self.messages}
+        # statistics
+        self.decoded = 0
+        self.unknown = 0
+
+    def decode(self, frame_id: int, data: bytes) -> dict[str, int]:
+        """Decode a received frame, None if its frame ID is not in the DBC."""
+        codec = self.by_frame_id.get(frame_id)
+        if codec is None:
+            self.unknown += 1
+            return None
+        self.decoded += 1
+        return codec.decode(data)
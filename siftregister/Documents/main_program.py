@@ -1,13 +1,14 @@
 # -*- coding: utf-8 -*-
 # import the nessecery library
-from time import sleep # imports the sleep function from the time module
 import RPi.GPIO as GPIO # imports the RPi.GPIO module to use the functions associated with it
-import cantools # import the cantools module to manipulate the DBC file
 import can # import the can module to establishe the can bus to send and recieve can messages
 import subprocess # import the subprocess module to start the can communication
 import threading # import the threading module to parallelize execution 
-from time import sleep
 import logging
+from dbc_codec import DBCCodec # import the codec layer built from the DBC file
+from can_transmit import TransmitManager # import the change-driven transmit manager
+from button_scanner import ShiftRegisterReader, ButtonScanner # import the paced button scanner
+from setup_slave.led_display import LEDDisplay # import the frame-buffered LEDs driver
 
 # Create a logging object
 logger = logging.getLogger('my_can_listener')
@@ -99,8 +100,9 @@ button_names = ['CS_DRW_open_level_2',
 # Create an emtry Dictionary to store all the signals and initialize thier values as 0
 all_slave_signals = dict()
 
-# Loading the DBC file
-db = cantools.database.load_file(r'/home/pi/Desktop/code_RPI_slave/my_can_data_base.dbc') # <-- a Database object
+# Loading the DBC file once, the codec prepares the encoder/decoder of every message
+codec = DBCCodec(r'/home/pi/Desktop/code_RPI_slave/my_can_data_base.dbc')
+db = codec.db # <-- a Database object
 
 # accessing the messages of the Database object
 my_messages = db.messages # <-- a List contain Message objets
@@ -159,8 +161,16 @@ channel = 'can0'
 # setting up the can bus
 bus = can.interface.Bus(channel=channel, bustype=bustype,bitrate=500000)
 
+# the slave messages are sent when their signals change and repeated every
+# HEARTBEAT_CYCLE_TIME seconds even when nothing changed
+HEARTBEAT_CYCLE_TIME = 1.0
+transmitter = TransmitManager(bus, codec, slave_message_name, cycle_time=HEARTBEAT_CYCLE_TIME)
+
 notifier = can.Notifier(bus, [can.Logger('./my_can.txt'), my_message_handler])
 
+# reader of the 74HC165 chain, GPIO can be replaced by a SimulatedShiftRegister
+button_reader = ShiftRegisterReader(GPIO, data, Shift_Load_Bar, Clock, width=40)
+
 # function to get button status
 def button_checker() -> list[int]:
     """
@@ -170,24 +180,8 @@ def button_checker() -> list[int]:
     ------
     list(int): list with  0s and 1s indicating the buttons status.
     """
-    # initialize the Buttons_state as not pressed
-    Buttons_state = [0] * 40
-    # Activate the load mode by putting the Shift_Load_Bar to low
-    # to load the data and shift the first bit (the MSB bit)
-    GPIO.output(Shift_Load_Bar, 0)
-    # sleep(0.005)
-    # Switch to the shift mode by putting the Shift_Load_Bar to high
-    GPIO.output(Shift_Load_Bar ,1)
-    # Start reading and shifting out
-    for i in range(39,-1,-1):
-        # Read the button state "data" and store it in the Buttons_state list
-        Buttons_state[i] = GPIO.input(data)
-        # shift out the next data
-        GPIO.output(Clock, 0)
-        # sleep(0.005)
-        GPIO.output(Clock, 1)
-    # Return the buttons_state
-    return Buttons_state 
+    # the reader does the load + 40 clock pulses on the 74HC165 chain
+    return button_reader.read()
 
 # function to get the indexes of the buttons pressed
 def get_indexes(my_list: list[int], element: int = 1) -> list[int]:
@@ -248,12 +242,8 @@ def update_button_signals(indexes: list[int]):
 
 # function to send the messages
 def send_mesages():
-    for msg_name in slave_message_name:
-        the_message = db.get_message_by_name(msg_name)
-        the_required_signals = the_message.gather_signals(all_slave_signals)
-        data = the_message.encode(the_required_signals, msg_name)
-        msg = can.Message(arbitration_id=the_message.frame_id, data=data, is_extended_id=False)
-        bus.send(msg)
+    # only the messages whose payload differs from the last one sent go on the bus
+    transmitter.send_changed(all_slave_signals)
 """
 from time import time       
 while True:
@@ -273,48 +263,61 @@ while True:
         pass
     
 """
+# the LEDs frame is double-buffered: a frame is only shifted out when it
+# differs from the one latched on the 74HC595 chain
+leds = LEDDisplay(GPIO, Serial_Input, SRClock, Latch, width=40)
+
 # function to display the LEDs based on the LEDs_status
 def display(LEDs_Status: list[int] = [1, 0, 0, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1]):
-    
-    for state in LEDs_Status:
-        GPIO.output(Serial_Input, state)
-        # each loop generate a clock signal 
-        # to shift the Serial input in the shift register
-        GPIO.output(SRClock, 0)
-        GPIO.output(SRClock, 1)
+    # nothing is shifted if the LEDs already show this frame
+    leds.display(LEDs_Status)
 
-    # turn the LEDs
-    GPIO.output(Latch, 0)
-    GPIO.output(Latch, 1)
+# steps of the driver window closing animation, each one is displayed 1 second
+close_driver_window = [[0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0],
+                       [0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0],
+                       [0, 0, 0, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0],
+                       [0, 0, 0, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 0, 0, 0, 0, 0, 0, 0],
+                       [0, 0, 0, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0]]
 
 # function to do action based on the recieved message
 def do_action(encoded: dict[str,int]):
-    close_driver_window = [[0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0],
-                           [0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0],
-                           [0, 0, 0, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0],
-                           [0, 0, 0, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 0, 0, 0, 0, 0, 0, 0],
-                           [0, 0, 0, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0]]
     Driver_msg = {'DriverRear_Window_Movement_Status': 0, 'DriverRear_Window_Movement_Type': 0, 'DriverRear_Window_Movement_Target_Position': 0, 'DriverRear_Window_Short_Long_Drop_Mode': 0, 'DriverRear_Window_Normalization_Mode': 0, 'DriverRear_Window_Movement_Mode': 0}
     # if encoded == Driver_msg:
-    if encoded:   
-        for step in close_driver_window:
-            display(step)
-            sleep(1) 
+    if encoded:
+        # the animation runs on the display thread so the reception is not blocked,
+        # frames received while it is playing do not restart it
+        if not leds.animating():
+            leds.play(close_driver_window, interval=1.0)
         # display()
         
+# function called by the scanner when a debounced button state changed
+def on_buttons_changed(list_status: list[int], edges: list[tuple[int, int]]):
+    if 1 in list_status:
+        update_button_signals(get_indexes(list_status))
+        send_mesages()
+
+# the buttons are scanned SCAN_FREQUENCY times per second and a button must read
+# the same value DEBOUNCE_SCANS scans in a row before the change is reported
+SCAN_FREQUENCY = 200
+DEBOUNCE_SCANS = 3
+scanner = ButtonScanner(button_reader, frequency=SCAN_FREQUENCY, debounce_scans=DEBOUNCE_SCANS,
+                        on_change=on_buttons_changed)
+
 def check_and_send():
-    while True:
-        list_status = button_checker()
-        if 1 in list_status:
-            update_button_signals(get_indexes(list_status))
-            send_mesages()
+    # the first call sends every message once so the master gets the initial state
+    send_mesages()
+    # after every scan, repeat the messages that were not sent during the last cycle
+    scanner.run(on_scan=transmitter.send_heartbeats)
 
 def receive_and_do_action():
     while True:
         try:
             message = bus.recv()
             #encoded = message.data
-            decoded = db.decode_message(message.arbitration_id, message.data, decode_choices=False)
+            decoded = codec.decode(message.arbitration_id, message.data)
+            # frames that are not in the DBC are ignored
+            if decoded is None:
+                continue
             #print(decoded)
             do_action(decoded)
         except can.CanError:
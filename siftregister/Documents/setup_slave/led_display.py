@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+# Frame-buffered driver of the 74HC595 LED chain: frames are composed in a
+# back buffer and only shifted out when they differ from the frame latched on
+# the chain. Animations run on their own thread so the caller never sleeps.
+import threading
+
+
+class LEDDisplay:
+    """
+    Double-buffered display of the LEDs driven by the daisy-chained 74HC595.
+
+    Parameters
+    ----------
+    - gpio : module
+        RPi.GPIO or any object with the same output function.
+    - serial_input : int
+        Pin of the serial input.
+    - clock : int
+        Pin of the shift register clock (SRCLK).
+    - latch : int
+        Pin of the register clock (RCLK).
+    - width : int, optional
+        Number of LEDs in the chain.
+    """
+    def __init__(self, gpio, serial_input: int, clock: int, latch: int, width: int = 40):
+        self.gpio = gpio
+        self.serial_input = serial_input
+        self.clock = clock
+        self.latch = latch
+        self.width = width
+        # back: frame being composed, front: frame latched on the chain (None = unknown)
+        self.back = [0] * width
+        self.front = None
+        self._lock = threading.Lock()
+        self._animation = None
+        self._animation_stop = None
+        # statistics
+        self.shifted = 0
+        self.skipped = 0
+
+    def set(self, index: int, value: int):
+        """Set one LED in the back buffer (shown on the next show())."""
+        with self._lock:
+            self.back[index] = value
+
+    def set_frame(self, frame: list[int]):
+        """Replace the back buffer with a whole frame."""
+        if len(frame) != self.width:
+            raise ValueError(f"frame has {len(frame)} LEDs, expected {self.width}")
+        with self._lock:
+            self.back = list(frame)
+
+    def show(self, force: bool = False) -> bool:
+        """
+        Latch the back buffer on the chain if it differs from the front one.
+
+        Parameters
+        ----------
+        - force : bool, optional
+            Shift the frame out even if it did not change.
+
+        Returns
+        -------
+        - bool
+            Whether the frame was shifted out.
+        """
+        with self._lock:
+            if not force and self.back == self.front:
+                self.skipped += 1
+                return False
+            self._shift_out(self.back)
+            self.front = list(self.back)
+            self.shifted += 1
+            return True
+
+    def display(self, frame: list[int]) -> bool:
+        """Show a whole frame, nothing is shifted if it is already displayed."""
+        self.set_frame(frame)
+        return self.show()
+
+    def _shift_out(self, frame: list[int]):
+        output = self.gpio.output
+        serial_input, clock = self.serial_input, self.clock
+        for state in frame:
+            output(serial_input, state)
+            # each clock pulse shifts the serial input in the shift register
+            output(clock, 0)
+            output(clock, 1)
+        # turn the LEDs
+        output(self.latch, 0)
+        output(self.latch, 1)
+
+    def play(self, steps: list[list[int]], interval: float = 1.0, repeat: int = 1):
+        """
+        Play a sequence of frames on the animation thread and return at once.
+
+        The running animation (if any) is stopped first. The last frame stays
+        displayed when the animation ends.
+
+        Parameters
+        ----------
+        - steps : list(list(int))
+            Frames to display one after the other.
+        - interval : float, optional
+            Seconds each frame is displayed.
+        - repeat : int, optional
+            Number of times the sequence is played (0 = until stopped).
+        """
+        stop = threading.Event()
+        animation = threading.Thread(target=self._animate, args=(list(steps), interval, repeat, stop),
+                                     daemon=True)
+        with self._lock:
+            previous = self._detach_animation()
+            self._animation, self._animation_stop = animation, stop
+        self._join(previous)
+        animation.start()
+
+    def _animate(self, steps: list[list[int]], interval: float, repeat: int, stop: threading.Event):
+        played = 0
+        while not stop.is_set() and (repeat == 0 or played < repeat):
+            for step in steps:
+                self.display(step)
+                # wait returns early when the animation is stopped
+                if stop.wait(interval):
+                    return
+            played += 1
+
+    def _detach_animation(self) -> threading.Thread:
+        """Signal the animation to stop and forget it (called with the lock held)."""
+        animation, stop = self._animation, self._animation_stop
+        self._animation = None
+        self._animation_stop = None
+        if stop is not None:
+            stop.set()
+        return animation
+
+    @staticmethod
+    def _join(animation: threading.Thread):
+        # joined without the lock, the animation thread takes it in display();
+        # one not started yet sees its stop event and returns at once
+        if animation is not None and animation.ident is not None and animation is not threading.current_thread():
+            animation.join()
+
+    def animating(self) -> bool:
+        with self._lock:
+            animation = self._animation
+        return animation is not None and animation.is_alive()
+
+    def stop_animation(self):
+        """Stop the running animation, the current frame stays displayed."""
+        with self._lock:
+            animation = self._detach_animation()
+        self._join(animation)
+
+    def stats(self) -> dict[str, int]:
+        """Return the number of frames shifted out and skipped."""
+        return {'shifted': self.shifted, 'skipped': self.skipped}
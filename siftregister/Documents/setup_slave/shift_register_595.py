@@ -5,6 +5,7 @@ To undrestand how the 74hc595 works you can refer to the python file below
 /test/LEDs.py
 """
 import RPi.GPIO as GPIO
+from .led_display import LEDDisplay
 
 # Define Connections to 74HC595
 Latch = 13 # sets the RCLK (Register Clock / Latch) to the GPIO pin 15
@@ -20,15 +21,9 @@ GPIO.setup(Latch, GPIO.OUT)
 GPIO.setup(Clear, GPIO.OUT)
 GPIO.setup(Serial_Input, GPIO.OUT)
 
+# double-buffered driver: a frame already latched on the chain is not shifted again
+display = LEDDisplay(GPIO, Serial_Input, Clock, Latch, width=40)
+
 def Display(LEDs_status: list[int] = [1, 0, 0, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1]):
     
-    for state in LEDs_status:
-        GPIO.output(Serial_Input, state)
-        # each loop generate a clock signal 
-        # to shift the Serial input in the shift register
-        GPIO.output(Clock, 0)
-        GPIO.output(Clock, 1)
-
-    # turn the LEDs
-    GPIO.output(Latch, 0)
-    GPIO.output(Latch, 1)
\ No newline at end of file
+    display.display(LEDs_status)
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# Behaviour checks of the button scanner on the simulated 74HC165 chain.
+#
+# Run from the siftregister/Documents directory (no Pi needed):
+#     python3 -m unittest discover tests
+import os
+import sys
+import threading
+import unittest
+from time import monotonic
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from button_scanner import ShiftRegisterReader, SimulatedShiftRegister, ButtonScanner, Histogram
+
+DATA, SHIFT_LOAD_BAR, CLOCK = 31, 16, 18
+WIDTH = 40
+
+
+class ScriptedReader:
+    """reader returning the given readings one after the other, then the last one"""
+    def __init__(self, readings: list[list[int]]):
+        self.readings = list(readings)
+
+    def read(self) -> list[int]:
+        return self.readings.pop(0) if len(self.readings) > 1 else self.readings[0]
+
+
+class ShiftRegisterReaderTest(unittest.TestCase):
+    def test_reads_every_button_in_order(self):
+        gpio = SimulatedShiftRegister(DATA, SHIFT_LOAD_BAR, CLOCK, width=WIDTH)
+        reader = ShiftRegisterReader(gpio, DATA, SHIFT_LOAD_BAR, CLOCK, width=WIDTH)
+        self.assertEqual(reader.read(), [0] * WIDTH)
+        gpio.pressed[0] = gpio.pressed[17] = gpio.pressed[WIDTH - 1] = 1
+        self.assertEqual(reader.read(), gpio.pressed)
+
+
+class DebounceTest(unittest.TestCase):
+    def setUp(self):
+        self.scanner = ButtonScanner(None, debounce_scans=3)
+
+    def test_change_accepted_after_debounce_scans(self):
+        self.assertEqual(self.scanner.debounce([0, 1]), [])
+        self.assertEqual(self.scanner.debounce([0, 1]), [])
+        self.assertEqual(self.scanner.debounce([0, 1]), [(1, 1)])
+        self.assertEqual(self.scanner.state, [0, 1])
+        # held: no new edge
+        self.assertEqual(self.scanner.debounce([0, 1]), [])
+
+    def test_bounce_is_ignored(self):
+        for raw in ([1, 0], [0, 0], [1, 0], [1, 0], [0, 0]):
+            self.assertEqual(self.scanner.debounce(raw), [])
+        self.assertEqual(self.scanner.state, [0, 0])
+
+    def test_release_is_reported(self):
+        for _ in range(3):
+            self.scanner.debounce([1])
+        edges = [self.scanner.debounce([0]) for _ in range(3)]
+        self.assertEqual(edges, [[], [], [(0, 0)]])
+
+
+class ScanTest(unittest.TestCase):
+    def test_on_change_gets_state_and_edges(self):
+        changes = []
+        reader = ScriptedReader([[0, 0], [1, 0], [1, 0], [1, 1]])
+        scanner = ButtonScanner(reader, frequency=1000, debounce_scans=2,
+                                on_change=lambda state, edges: changes.append((state, edges)))
+        for _ in range(4):
+            scanner.scan()
+        self.assertEqual(changes, [([1, 0], [(0, 1)])])
+        self.assertEqual((scanner.scans, scanner.changes), (4, 1))
+
+    def test_scans_are_paced(self):
+        scanner = ButtonScanner(ScriptedReader([[0]]), frequency=200)
+        start = monotonic()
+        for _ in range(11):
+            scanner.scan()
+        # the first scan starts at once, the next 10 one period apart
+        self.assertGreaterEqual(monotonic() - start, 10 * scanner.period * 0.95)
+        self.assertEqual(scanner.jitter.count, 11)
+
+    def test_run_until_stopped(self):
+        scanner = ButtonScanner(ScriptedReader([[0]]), frequency=1000)
+        on_scan = threading.Event()
+        thread = threading.Thread(target=scanner.run, args=(on_scan.set,))
+        thread.start()
+        self.assertTrue(on_scan.wait(1.0))
+        scanner.stop()
+        thread.join(1.0)
+        self.assertFalse(thread.is_alive())
+
+
+class HistogramTest(unittest.TestCase):
+    def test_buckets_and_percentile(self):
+        histogram = Histogram([100, 1000])
+        for value in (50e-6, 60e-6, 500e-6, 5e-3):
+            histogram.add(value)
+        self.assertEqual(histogram.counts, [2, 1, 1])
+        self.assertAlmostEqual(histogram.percentile(50), 100e-6)
+        self.assertEqual(histogram.percentile(100), 5e-3)
+        self.assertEqual(histogram.max, 5e-3)
+
+
+if __name__ == "__main__":
+    unittest.main()